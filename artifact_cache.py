@@ -0,0 +1,58 @@
+"""
+Content-Addressed Artifact Cache
+Stores expensive fitted artifacts (vectorizers, sparse matrices, cluster
+models) on disk under a hash of their inputs and parameters, so unchanged
+inputs are loaded instead of refitted
+"""
+
+import os
+import json
+import hashlib
+import joblib
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = '.artifact_cache'
+
+
+def fingerprint(*parts):
+    """Stable hex digest of data and parameters.
+
+    pandas objects hash by content (not by index), numpy arrays by dtype,
+    shape and bytes, and everything else by its sorted JSON form.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (pd.Series, pd.DataFrame)):
+            digest.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        elif isinstance(part, np.ndarray):
+            digest.update(f"{part.dtype}{part.shape}".encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def cached(name, key, compute, cache_dir=CACHE_DIR):
+    """Load artifact `name` stored under `key`, or compute and store it.
+
+    Returns (artifact, from_cache). Files are written to a temporary name and
+    renamed (and removed if writing fails), so an interrupted run never leaves
+    a truncated entry behind.
+    """
+    path = os.path.join(cache_dir, f"{name}-{key[:24]}.joblib")
+    if os.path.exists(path):
+        return joblib.load(path), True
+
+    artifact = compute()
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        joblib.dump(artifact, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return artifact, False
@@ -0,0 +1,199 @@
+"""
+Demand Cohort Tables from Customer Profiles
+Compresses customer_profiles into arrival rates and basket-size distributions
+per (customer_segment, locality, day_type, hour), so the order generator can
+sample from cohorts instead of iterating over every customer
+Customer identity is resolved lazily, only when an order fires
+Outputs: demand_cohorts.csv, demand_cohorts.parquet, demand_cohort_members.npz
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from payload_io import iter_payload, save_payload
+
+DEMAND_COLUMNS = ['customer_segment', 'locality', 'orders_per_month', 'weekend_preference',
+                  'primary_order_hour', 'morning_order_tendency', 'evening_order_tendency',
+                  'avg_basket_value']
+CHUNK_SIZE = 100_000
+OUTPUT_STEM = 'demand_cohorts'
+MEMBERS_FILE = 'demand_cohort_members.npz'
+OUTPUT_FORMATS = ['csv', 'parquet']
+COHORT_CATEGORICALS = ['customer_segment', 'locality', 'day_type']
+
+DAY_TYPES = ['WEEKDAY', 'WEEKEND']
+DAYS_PER_MONTH = 30
+DAY_TYPE_SHARE = {'WEEKDAY': 5 / 7, 'WEEKEND': 2 / 7}
+
+# Time-of-day profile: a fixed share at the customer's primary hour, the rest
+# spread over 6-hour bands weighted by the customer's tendencies
+PRIMARY_HOUR_SHARE = 0.5
+NIGHT_TENDENCY = 0.05   # 00-05
+MIDDAY_TENDENCY = 0.3   # 12-17
+
+BASKET_BINS = np.array([0, 250, 500, 750, 1000, 1500, 2000, 3000, 100000])
+BASKET_COLUMNS = [f"basket_{lo}_{hi}" for lo, hi in zip(BASKET_BINS[:-1], BASKET_BINS[1:])]
+
+
+def hour_weights(primary_hour, morning, evening):
+    """(n, 24) share of each customer's daily orders placed in each hour."""
+    primary_hour = np.asarray(primary_hour, dtype=np.int64)
+    n = len(primary_hour)
+    bands = np.column_stack([np.full(n, NIGHT_TENDENCY), np.asarray(morning, dtype=np.float64),
+                             np.full(n, MIDDAY_TENDENCY), np.asarray(evening, dtype=np.float64)])
+    spread = np.repeat(bands / bands.sum(axis=1, keepdims=True) / 6, 6, axis=1)
+    weights = (1 - PRIMARY_HOUR_SHARE) * spread
+    weights[np.arange(n), primary_hour] += PRIMARY_HOUR_SHARE
+    return weights
+
+
+def day_rates(orders_per_month, weekend_preference):
+    """(n, 2) expected orders per weekday and per weekend day.
+
+    weekend_preference is the share of a customer's orders placed on weekends.
+    """
+    orders_per_month = np.asarray(orders_per_month, dtype=np.float64)
+    weekend_preference = np.asarray(weekend_preference, dtype=np.float64)
+    shares = np.column_stack([1 - weekend_preference, weekend_preference])
+    days = np.array([DAYS_PER_MONTH * DAY_TYPE_SHARE[d] for d in DAY_TYPES])
+    return orders_per_month[:, None] * shares / days
+
+
+def build_cohorts(path, chunk_size=CHUNK_SIZE):
+    """Stream a customer payload into cohort tables.
+
+    Returns (cohorts, members): one row per (segment, locality, day_type, hour)
+    with its arrival rate (expected orders per hour) and basket-size bin
+    probabilities, and the customers of each (segment, locality) group with
+    the per-customer rate terms needed to resolve who placed an order.
+    """
+    group_codes = {}
+    totals = None
+    member_chunks = []
+    position = 0
+
+    for chunk in iter_payload(path, columns=DEMAND_COLUMNS, batch_size=chunk_size):
+        rows = np.arange(position, position + len(chunk))
+        position += len(chunk)
+
+        # Global (segment, locality) group code of every customer
+        keys = pd.MultiIndex.from_arrays([chunk['customer_segment'].astype(str), chunk['locality'].astype(str)])
+        local_codes, uniques = pd.factorize(keys)
+        codes = np.array([group_codes.setdefault(key, len(group_codes)) for key in uniques])[local_codes]
+
+        daily = day_rates(chunk['orders_per_month'], chunk['weekend_preference'])
+        hourly = hour_weights(chunk['primary_order_hour'], chunk['morning_order_tendency'],
+                              chunk['evening_order_tendency'])
+        rates = (daily[:, :, None] * hourly[:, None, :]).reshape(len(chunk), -1)
+
+        frame = pd.DataFrame(rates, columns=pd.MultiIndex.from_product([DAY_TYPES, range(24)],
+                                                                       names=['day_type', 'hour']))
+        frame['group'] = codes
+        frame['basket_bin'] = np.digitize(chunk['avg_basket_value'], BASKET_BINS[1:-1])
+        chunk_totals = frame.groupby(['group', 'basket_bin']).sum()
+        totals = chunk_totals if totals is None else totals.add(chunk_totals, fill_value=0)
+
+        member_chunks.append(pd.DataFrame({
+            'group': codes, 'row': rows,
+            'weekday_rate': daily[:, 0], 'weekend_rate': daily[:, 1],
+            'primary_order_hour': chunk['primary_order_hour'].to_numpy(),
+            'morning_order_tendency': chunk['morning_order_tendency'].to_numpy(),
+            'evening_order_tendency': chunk['evening_order_tendency'].to_numpy(),
+        }))
+
+    groups = pd.DataFrame(list(group_codes), columns=['customer_segment', 'locality'])
+    members = pd.concat(member_chunks, ignore_index=True).sort_values(['group', 'row'], kind='stable')
+    customers = np.bincount(members['group'], minlength=len(groups))
+
+    # (group, basket_bin) x (day_type, hour) -> (group, day_type, hour) x basket_bin
+    by_bin = totals.stack(['day_type', 'hour'], future_stack=True).unstack('basket_bin', fill_value=0.0)
+    by_bin = by_bin.reindex(columns=range(len(BASKET_COLUMNS)), fill_value=0.0)
+    arrival_rate = by_bin.sum(axis=1)
+
+    cohorts = by_bin.index.to_frame(index=False)
+    group = cohorts.pop('group').to_numpy()
+    cohorts.insert(0, 'customer_segment', groups['customer_segment'].to_numpy()[group])
+    cohorts.insert(1, 'locality', groups['locality'].to_numpy()[group])
+    cohorts['customers'] = customers[group]
+    cohorts['arrival_rate'] = arrival_rate.to_numpy()
+    probabilities = by_bin.to_numpy() / arrival_rate.to_numpy()[:, None]
+    for i, col in enumerate(BASKET_COLUMNS):
+        cohorts[col] = probabilities[:, i].round(4)
+
+    cohorts = cohorts.sort_values(['customer_segment', 'locality', 'day_type', 'hour']).reset_index(drop=True)
+    members = {
+        'segment': groups['customer_segment'].to_numpy(dtype=str),
+        'locality': groups['locality'].to_numpy(dtype=str),
+        'offsets': np.concatenate([[0], np.cumsum(customers)]),
+        'row': members['row'].to_numpy(dtype=np.int32),
+        'weekday_rate': members['weekday_rate'].to_numpy(dtype=np.float32),
+        'weekend_rate': members['weekend_rate'].to_numpy(dtype=np.float32),
+        'primary_order_hour': members['primary_order_hour'].to_numpy(dtype=np.int8),
+        'morning_order_tendency': members['morning_order_tendency'].to_numpy(dtype=np.float32),
+        'evening_order_tendency': members['evening_order_tendency'].to_numpy(dtype=np.float32),
+    }
+    return cohorts, members
+
+
+def save_members(members, path=MEMBERS_FILE):
+    np.savez(path, **members)
+
+
+def load_members(path=MEMBERS_FILE):
+    """Load cohort membership, with a (segment, locality) -> group lookup under 'groups'."""
+    with np.load(path) as data:
+        members = {key: data[key] for key in data.files}
+    members['groups'] = {key: i for i, key in enumerate(zip(members['segment'], members['locality']))}
+    return members
+
+
+def resolve_customers(members, segment, locality, day_type, hour, u):
+    """Payload row positions of the customers who placed orders in a cohort.
+
+    Each uniform draw in `u` picks one customer of the (segment, locality)
+    group with probability proportional to their rate for that day type and hour.
+    """
+    group = members['groups'][(segment, locality)]
+    start, end = members['offsets'][group], members['offsets'][group + 1]
+    rate = members['weekday_rate' if day_type == 'WEEKDAY' else 'weekend_rate'][start:end]
+    weights = rate * hour_weights(members['primary_order_hour'][start:end],
+                                  members['morning_order_tendency'][start:end],
+                                  members['evening_order_tendency'][start:end])[:, hour]
+    cumulative = np.cumsum(weights)
+    picks = np.searchsorted(cumulative, np.asarray(u) * cumulative[-1], side='right')
+    return members['row'][start:end][np.minimum(picks, end - start - 1)]
+
+
+def main():
+    # Usage: python build_demand_cohorts.py [customer_profiles.parquet|.csv]
+    input_path = sys.argv[1] if len(sys.argv) > 1 else 'customer_profiles.parquet'
+
+    print("="*70)
+    print(f"BUILDING DEMAND COHORTS FROM {input_path}")
+    print("="*70)
+
+    cohorts, members = build_cohorts(input_path)
+    files = save_payload(cohorts, OUTPUT_STEM, OUTPUT_FORMATS, COHORT_CATEGORICALS,
+                         {'hour': 'int8', 'customers': 'int32'})
+    save_members(members)
+    files.append(MEMBERS_FILE)
+
+    n_groups = len(members['segment'])
+    print(f"\nCustomers: {len(members['row']):,} in {n_groups:,} segment x locality groups")
+    print(f"Cohorts: {len(cohorts):,} ({n_groups:,} groups x {len(DAY_TYPES)} day types x 24 hours)")
+
+    print("\nExpected orders per day:")
+    for day_type in DAY_TYPES:
+        daily_orders = cohorts.loc[cohorts['day_type'] == day_type, 'arrival_rate'].sum()
+        print(f"  {day_type}: {daily_orders:,.0f}")
+
+    print("\nBusiest hours (weekday orders/hour):")
+    weekday = cohorts[cohorts['day_type'] == 'WEEKDAY'].groupby('hour')['arrival_rate'].sum()
+    for hour, rate in weekday.sort_values(ascending=False).head(5).items():
+        print(f"  {hour:02d}:00: {rate:,.0f}")
+
+    print(f"\nSaved: {', '.join(files)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+City Config Loading
+Reads config/<city>.json files (localities, segments, store master path),
+resolving "base" inheritance and config-relative file paths
+Shared by the customer generator, the travel-time builder and the store updater
+"""
+
+import os
+import json
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+DEFAULT_CONFIG = os.path.join(CONFIG_DIR, 'hyderabad.json')
+PATH_KEYS = ['stores']  # config values that are file paths, relative to the config file
+
+
+def _deep_merge(base, overrides):
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_config(path):
+    """Read a city config. A config with a "base" key overrides that (relative) base config.
+
+    Relative paths under PATH_KEYS are resolved against the config file that
+    declares them, so a derived config inherits its base's files unchanged.
+    """
+    with open(path) as f:
+        config = json.load(f)
+    config_dir = os.path.dirname(os.path.abspath(path))
+    for key in PATH_KEYS:
+        if key in config:
+            config[key] = os.path.join(config_dir, config[key])
+    if 'base' in config:
+        base_path = os.path.join(config_dir, config.pop('base'))
+        config = _deep_merge(load_config(base_path), config)
+    return config
@@ -0,0 +1,88 @@
+"""
+Pluggable Clustering Backends for Sparse Product Vectors
+- kmeans: full sklearn KMeans (reference quality, memory grows with the catalog)
+- minibatch: MiniBatchKMeans fed row chunks of the sparse matrix via partial_fit,
+  with chunked parallel label assignment, for multi-million-SKU catalogs
+"""
+
+import numpy as np
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import adjusted_rand_score, normalized_mutual_info_score
+
+CHUNK_ROWS = 50_000
+
+
+def row_chunks(n_rows, chunk_rows=CHUNK_ROWS):
+    return [(start, min(start + chunk_rows, n_rows)) for start in range(0, n_rows, chunk_rows)]
+
+
+def predict_chunked(model, matrix, chunk_rows=CHUNK_ROWS, n_jobs=1):
+    """Nearest-centroid labels, one row chunk per task (threads share the matrix)."""
+    labels = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(model.predict)(matrix[start:end]) for start, end in row_chunks(matrix.shape[0], chunk_rows))
+    return np.concatenate(labels) if labels else np.zeros(0, dtype=np.int32)
+
+
+def inertia(model, matrix, chunk_rows=CHUNK_ROWS, n_jobs=1):
+    """Sum of squared distances to the nearest centroid over the whole matrix."""
+    scores = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(model.score)(matrix[start:end]) for start, end in row_chunks(matrix.shape[0], chunk_rows))
+    return -float(sum(scores))
+
+
+def fit_kmeans(matrix, n_clusters, random_state, n_init=10, n_jobs=1):
+    """Full KMeans on at most n_jobs native (OpenMP/BLAS) threads; -1 or None uses every core."""
+    model = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=n_init)
+    with threadpool_limits(limits=None if n_jobs in (None, -1) else n_jobs):
+        return model, model.fit_predict(matrix)
+
+
+def fit_minibatch(matrix, n_clusters, random_state, n_init=3, batch_size=4096,
+                  chunk_rows=CHUNK_ROWS, passes=3, n_jobs=1):
+    """Streaming MiniBatchKMeans: `passes` sweeps over shuffled row chunks.
+
+    Only one chunk (densified per mini-batch by sklearn) is worked on at a
+    time, so memory is bounded by the chunk size, not the catalog size.
+    """
+    model = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=n_init,
+                            batch_size=batch_size)
+    rng = np.random.default_rng(random_state)
+    chunks = row_chunks(matrix.shape[0], max(chunk_rows, n_clusters))
+    # A short last chunk is merged into the previous one: partial_fit needs >= n_clusters rows
+    if len(chunks) > 1 and chunks[-1][1] - chunks[-1][0] < n_clusters:
+        chunks[-2:] = [(chunks[-2][0], chunks[-1][1])]
+    for _ in range(passes):
+        for i in rng.permutation(len(chunks)):
+            start, end = chunks[i]
+            model.partial_fit(matrix[start:end])
+    return model, predict_chunked(model, matrix, chunk_rows, n_jobs)
+
+
+CLUSTER_BACKENDS = {
+    'kmeans': fit_kmeans,
+    'minibatch': fit_minibatch,
+}
+
+
+def fit_clusters(matrix, backend='kmeans', n_jobs=1, **params):
+    """Fit a clustering backend; returns (model, labels). The model has predict/transform/score."""
+    if backend not in CLUSTER_BACKENDS:
+        raise ValueError(f"Unknown clustering backend {backend!r}; choose from {sorted(CLUSTER_BACKENDS)}")
+    return CLUSTER_BACKENDS[backend](matrix, n_jobs=n_jobs, **params)
+
+
+def quality_report(matrix, model, labels, reference_model, reference_labels, n_jobs=1):
+    """How a backend's clustering compares with a reference (full KMeans) clustering."""
+    model_inertia = inertia(model, matrix, n_jobs=n_jobs)
+    reference_inertia = inertia(reference_model, matrix, n_jobs=n_jobs)
+    return {
+        'rows': int(matrix.shape[0]),
+        'clusters': int(len(np.unique(labels))),
+        'inertia': model_inertia,
+        'reference_inertia': reference_inertia,
+        'inertia_ratio': model_inertia / reference_inertia if reference_inertia else float('nan'),
+        'adjusted_rand_index': float(adjusted_rand_score(reference_labels, labels)),
+        'normalized_mutual_info': float(normalized_mutual_info_score(reference_labels, labels)),
+    }
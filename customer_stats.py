@@ -0,0 +1,76 @@
+"""
+Streaming Statistics for Generated Customers
+Single-pass, mergeable aggregates (counts, histograms, min/max/mean, top-k)
+updated chunk by chunk and merged across shards
+"""
+
+from collections import Counter
+import numpy as np
+
+COUNT_COLUMNS = ['gender', 'community', 'income_bracket', 'customer_segment', 'locality',
+                 'loyalty_tier', 'preferred_payment']
+
+# Numeric columns and their histogram bin edges
+HISTOGRAM_BINS = {
+    'age': np.arange(15, 81, 5),
+    'monthly_income': np.array([0, 15000, 30000, 60000, 150000, 300000, 500001]),
+    'orders_per_month': np.arange(0, 36, 5),
+    'avg_basket_value': np.arange(0, 2751, 250),
+    'lifetime_value': np.array([0, 30000, 75000, 150000, 500000, 5000000]),
+}
+
+
+class CustomerStats:
+    """Aggregates that can be updated with a chunk at a time and merged with each other."""
+
+    def __init__(self, count_columns=COUNT_COLUMNS, histogram_bins=HISTOGRAM_BINS):
+        self.rows = 0
+        self.counts = {col: Counter() for col in count_columns}
+        self.bins = histogram_bins
+        self.histograms = {col: np.zeros(len(edges) - 1, dtype=np.int64) for col, edges in histogram_bins.items()}
+        self.sums = {col: 0.0 for col in histogram_bins}
+        self.mins = {col: np.inf for col in histogram_bins}
+        self.maxs = {col: -np.inf for col in histogram_bins}
+
+    def update(self, df):
+        """Fold one chunk of customers into the aggregates; returns self."""
+        self.rows += len(df)
+        for col, counter in self.counts.items():
+            counter.update(df[col].value_counts().to_dict())
+        for col, edges in self.bins.items():
+            values = df[col].to_numpy()
+            self.histograms[col] += np.histogram(values, bins=edges)[0]
+            if len(values):
+                self.sums[col] += float(values.sum())
+                self.mins[col] = min(self.mins[col], values.min())
+                self.maxs[col] = max(self.maxs[col], values.max())
+        return self
+
+    def merge(self, other):
+        """Combine another shard's aggregates into this one; returns self."""
+        self.rows += other.rows
+        for col, counter in other.counts.items():
+            self.counts[col].update(counter)
+        for col in self.bins:
+            self.histograms[col] += other.histograms[col]
+            self.sums[col] += other.sums[col]
+            self.mins[col] = min(self.mins[col], other.mins[col])
+            self.maxs[col] = max(self.maxs[col], other.maxs[col])
+        return self
+
+    def mean(self, col):
+        return self.sums[col] / self.rows if self.rows else float('nan')
+
+    def share(self, col, value):
+        """(count, percentage) of rows with col == value."""
+        count = self.counts[col].get(value, 0)
+        return count, (count / self.rows * 100 if self.rows else 0.0)
+
+    def top(self, col, k=10):
+        """The k most common values of a count column, as (value, count) pairs."""
+        return self.counts[col].most_common(k)
+
+    def histogram(self, col):
+        """(bin_start, bin_end, count) triples for a numeric column."""
+        edges = self.bins[col]
+        return list(zip(edges[:-1], edges[1:], self.histograms[col]))
@@ -0,0 +1,57 @@
+"""
+Vectorized Random Draws
+Map arrays of uniform draws in [0, 1) (from a Generator or a CounterRNG) onto
+column-wise equivalents of random.choice / choices / randint / uniform, plus
+the flattened lookup tables they index into
+"""
+
+import numpy as np
+
+
+def flatten(tables):
+    """Flatten a list of lists into (values, offsets, sizes) lookup arrays."""
+    sizes = np.array([len(t) for t in tables])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    values = np.array([v for t in tables for v in t], dtype=object)
+    return values, offsets, sizes
+
+
+def uniform_index(u, size):
+    """Map uniform draws in [0, 1) onto equally likely indices below size."""
+    return np.minimum((u * size).astype(np.int64), np.asarray(size) - 1)
+
+
+def weighted_index(u, weights):
+    """Map uniform draws onto option indices, like random.choices(weights=...)."""
+    cum_weights = np.cumsum(weights)
+    return np.minimum(np.searchsorted(cum_weights, u * cum_weights[-1], side='right'),
+                      len(weights) - 1)
+
+
+def banded_weighted_index(u, values, bands):
+    """Weighted choice where the weights depend on which band each value falls in."""
+    result = np.zeros(len(u), dtype=np.int64)
+    assigned = np.zeros(len(u), dtype=bool)
+    for floor, weights in bands:
+        mask = ~assigned & (values > floor)
+        result[mask] = weighted_index(u[mask], weights)
+        assigned |= mask
+    return result
+
+
+def randint(u, low, high):
+    """Vectorized random.randint(low, high) (inclusive) from uniform draws."""
+    return low + uniform_index(u, high - low + 1)
+
+
+def uniform(u, low, high):
+    """Vectorized random.uniform(low, high) from uniform draws."""
+    return low + (high - low) * u
+
+
+TWO_DIGITS = np.array(['%02d' % i for i in range(100)], dtype=object)
+
+
+def to_str(values):
+    """Format an integer array as an object array of decimal strings."""
+    return np.asarray(values).astype(str).astype(object)
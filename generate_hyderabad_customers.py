@@ -2,25 +2,30 @@
 Hyderabad-Specific Customer Profile Generator for Blinkit Simulation
 Based on real market research data
 Target: 1.5 million customers
-Outputs: customer_profiles.csv
+Localities and segments: config/hyderabad.json (other cities/scenarios: pass their configs)
+Each customer's nearest serviceable dark store comes from the config's "stores" master
+Outputs: customer_profiles.csv, customer_profiles.parquet
 """
 
+import os
+import sys
+import functools
+import multiprocessing
+from collections import deque
 import pandas as pd
 import numpy as np
-import hashlib
-import random
-from datetime import datetime, timedelta
 import warnings
+from counter_rng import CounterRNG
+from city_config import DEFAULT_CONFIG, load_config
+from draws import (TWO_DIGITS, banded_weighted_index, flatten, randint, to_str, uniform, uniform_index,
+                   weighted_index)
+from customer_stats import CustomerStats
+from geo import SERVICE_RADIUS_KM, load_stores
+from service_index import ServiceIndex
+from id_allocator import allocate_ids, derive_key, permute_index
+from payload_io import ParquetStreamWriter, to_columnar
 warnings.filterwarnings('ignore')
 
-np.random.seed(42)
-random.seed(42)
-
-print("="*70)
-print("HYDERABAD BLINKIT CUSTOMER PROFILE GENERATOR")
-print("Target: 1.5 Million Users")
-print("="*70)
-
 # =============================================================================
 # HYDERABAD-SPECIFIC NAME DATABASE
 # =============================================================================
@@ -134,678 +139,515 @@ CHRISTIAN_SURNAMES = [
 ]
 
 # =============================================================================
-# HYDERABAD LOCALITIES
+# COLUMNAR GENERATION HELPERS
 # =============================================================================
 
-HYDERABAD_AREAS = {
-    'PREMIUM': [
-        ('Jubilee Hills', 17.4325, 78.4072, 'HIGH'),
-        ('Banjara Hills', 17.4156, 78.4347, 'HIGH'),
-        ('Madhapur', 17.4486, 78.3908, 'UPPER_MIDDLE'),
-        ('Gachibowli', 17.4401, 78.3489, 'UPPER_MIDDLE'),
-        ('Kondapur', 17.4574, 78.3574, 'UPPER_MIDDLE'),
-        ('Manikonda', 17.4043, 78.3835, 'UPPER_MIDDLE'),
-        ('Hitech City', 17.4435, 78.3772, 'UPPER_MIDDLE'),
-        ('Financial District', 17.4213, 78.3411, 'HIGH'),
-        ('Kokapet', 17.4046, 78.3268, 'HIGH'),
-        ('Narsingi', 17.3892, 78.3569, 'UPPER_MIDDLE'),
-    ],
-    'UPPER_MIDDLE': [
-        ('Ameerpet', 17.4375, 78.4483, 'MIDDLE'),
-        ('SR Nagar', 17.4401, 78.4516, 'MIDDLE'),
-        ('Punjagutta', 17.4285, 78.4513, 'UPPER_MIDDLE'),
-        ('Somajiguda', 17.4275, 78.4574, 'UPPER_MIDDLE'),
-        ('Begumpet', 17.4436, 78.4671, 'UPPER_MIDDLE'),
-        ('Secunderabad', 17.4399, 78.4983, 'MIDDLE'),
-        ('Kukatpally', 17.4849, 78.4138, 'MIDDLE'),
-        ('KPHB', 17.4947, 78.3996, 'UPPER_MIDDLE'),
-        ('Miyapur', 17.4937, 78.3540, 'MIDDLE'),
-        ('Chandanagar', 17.4963, 78.3269, 'MIDDLE'),
-        ('Lingampally', 17.4916, 78.3175, 'MIDDLE'),
-        ('Bachupally', 17.5457, 78.3819, 'MIDDLE'),
-        ('Nizampet', 17.5183, 78.3871, 'MIDDLE'),
-        ('Pragathi Nagar', 17.5012, 78.4012, 'MIDDLE'),
-    ],
-    'MIDDLE': [
-        ('Dilsukhnagar', 17.3688, 78.5247, 'LOWER_MIDDLE'),
-        ('LB Nagar', 17.3499, 78.5479, 'MIDDLE'),
-        ('Kothapet', 17.3623, 78.5185, 'LOWER_MIDDLE'),
-        ('Nagole', 17.3939, 78.5581, 'LOWER_MIDDLE'),
-        ('Uppal', 17.4017, 78.5583, 'LOWER_MIDDLE'),
-        ('Habsiguda', 17.4069, 78.5347, 'MIDDLE'),
-        ('Tarnaka', 17.4269, 78.5347, 'MIDDLE'),
-        ('Malkajgiri', 17.4504, 78.5215, 'MIDDLE'),
-        ('AS Rao Nagar', 17.4583, 78.5433, 'LOWER_MIDDLE'),
-        ('ECIL', 17.4697, 78.5658, 'MIDDLE'),
-        ('Kompally', 17.5389, 78.4869, 'MIDDLE'),
-        ('Alwal', 17.5044, 78.5097, 'MIDDLE'),
-        ('Sainikpuri', 17.4858, 78.5558, 'MIDDLE'),
-    ],
-    'LOWER_MIDDLE': [
-        ('Old City', 17.3616, 78.4747, 'LOW'),
-        ('Charminar', 17.3616, 78.4747, 'LOW'),
-        ('Falaknuma', 17.3315, 78.4527, 'LOW'),
-        ('Yakutpura', 17.3583, 78.4873, 'LOW'),
-        ('Malakpet', 17.3758, 78.4966, 'LOWER_MIDDLE'),
-        ('Santosh Nagar', 17.3572, 78.5044, 'LOWER_MIDDLE'),
-        ('Champapet', 17.3499, 78.5333, 'LOWER_MIDDLE'),
-        ('Mehdipatnam', 17.3950, 78.4399, 'MIDDLE'),
-        ('Tolichowki', 17.4008, 78.4266, 'MIDDLE'),
-        ('Attapur', 17.3869, 78.4171, 'LOWER_MIDDLE'),
-        ('Rajendranagar', 17.3244, 78.4180, 'LOWER_MIDDLE'),
-        ('Shamshabad', 17.2403, 78.4294, 'LOWER_MIDDLE'),
-        ('Vanasthalipuram', 17.3339, 78.5469, 'LOWER_MIDDLE'),
-        ('Hayathnagar', 17.3339, 78.5833, 'LOWER_MIDDLE'),
-    ],
+PHONE_PREFIXES = ['98', '97', '96', '95', '94', '93', '91', '90', '89', '88', '87', '86', '85', '84',
+                  '83', '82', '81', '80', '79', '78', '77', '76', '75', '74', '73', '72', '71', '70']
+EMAIL_DOMAINS = ['gmail.com', 'gmail.com', 'gmail.com', 'gmail.com', 'yahoo.com',
+                 'yahoo.co.in', 'hotmail.com', 'outlook.com', 'rediffmail.com']
+
+COMMUNITIES = ['telugu', 'muslim', 'north', 'christian']
+NAME_TABLES = {
+    'telugu': (TELUGU_MALE_NAMES, TELUGU_FEMALE_NAMES, TELUGU_SURNAMES),
+    'muslim': (MUSLIM_MALE_NAMES, MUSLIM_FEMALE_NAMES, MUSLIM_SURNAMES),
+    'north': (NORTH_INDIAN_MALE_NAMES, NORTH_INDIAN_FEMALE_NAMES, NORTH_INDIAN_SURNAMES),
+    'christian': (CHRISTIAN_MALE_NAMES, CHRISTIAN_FEMALE_NAMES, CHRISTIAN_SURNAMES),
 }
 
-# =============================================================================
-# CUSTOMER SEGMENTS (Based on Research Data)
-# =============================================================================
+PAYMENT_METHODS = ['UPI', 'CARD', 'COD', 'WALLET', 'NETBANKING']
+INCOME_PAYMENT_WEIGHTS = [
+    (80000, [0.40, 0.35, 0.08, 0.12, 0.05]),
+    (30000, [0.50, 0.20, 0.15, 0.10, 0.05]),
+    (-1, [0.45, 0.10, 0.30, 0.10, 0.05]),
+]
 
-CUSTOMER_SEGMENTS = {
-    # Students - Major segment per research
-    'STUDENT_COLLEGE': {
-        'age_range': (18, 24),
-        'income_monthly_range': (0, 15000),  # Pocket money
-        'gender_ratio': 0.62,  # 62% male per research
-        'household_size': (1, 4),
-        'lifestyle': 'STUDENT',
-        'brand_preference': 'BUDGET',
-        'cooking_frequency': 'LOW',
-        'health_consciousness': 'LOW',
-        'price_sensitivity': 'HIGH',
-        'tech_savviness': 'HIGH',
-        'impulse_tendency': 0.71,  # From research r=0.71
-        'order_frequency_monthly': (3, 8),
-        'avg_basket_size': (150, 350),
-        'preferred_categories': ['Snacks & Branded Foods', 'Beverages', 'Beauty & Hygiene'],
-        'peak_hours': [12, 13, 21, 22, 23],
-        'weekend_preference': 0.6,
-        'weight': 0.12,
-        'name_distribution': {'telugu': 0.55, 'muslim': 0.20, 'north': 0.15, 'christian': 0.10},
-    },
-    
-    'STUDENT_PG': {
-        'age_range': (22, 28),
-        'income_monthly_range': (15000, 35000),  # Part-time/internship
-        'gender_ratio': 0.65,
-        'household_size': (1, 3),
-        'lifestyle': 'STUDENT',
-        'brand_preference': 'BUDGET',
-        'cooking_frequency': 'LOW',
-        'health_consciousness': 'MEDIUM',
-        'price_sensitivity': 'HIGH',
-        'tech_savviness': 'HIGH',
-        'impulse_tendency': 0.68,
-        'order_frequency_monthly': (5, 12),
-        'avg_basket_size': (200, 450),
-        'preferred_categories': ['Snacks & Branded Foods', 'Beverages', 'Cleaning & Household'],
-        'peak_hours': [20, 21, 22, 23],
-        'weekend_preference': 0.55,
-        'weight': 0.08,
-        'name_distribution': {'telugu': 0.50, 'muslim': 0.15, 'north': 0.25, 'christian': 0.10},
-    },
-    
-    # Young Working Professionals - Major segment
-    'YOUNG_PROFESSIONAL_SINGLE': {
-        'age_range': (23, 32),
-        'income_monthly_range': (25000, 80000),
-        'gender_ratio': 0.60,
-        'household_size': (1, 2),
-        'lifestyle': 'URBAN_FAST',
-        'brand_preference': 'MASS',
-        'cooking_frequency': 'LOW',
-        'health_consciousness': 'MEDIUM',
-        'price_sensitivity': 'MEDIUM',
-        'tech_savviness': 'HIGH',
-        'impulse_tendency': 0.65,
-        'order_frequency_monthly': (8, 18),
-        'avg_basket_size': (300, 700),
-        'preferred_categories': ['Snacks & Branded Foods', 'Beverages', 'Beauty & Hygiene'],
-        'peak_hours': [19, 20, 21, 22],
-        'weekend_preference': 0.45,
-        'weight': 0.18,
-        'name_distribution': {'telugu': 0.50, 'muslim': 0.15, 'north': 0.25, 'christian': 0.10},
-    },
-    
-    'YOUNG_PROFESSIONAL_COUPLE': {
-        'age_range': (25, 35),
-        'income_monthly_range': (60000, 200000),  # Combined
-        'gender_ratio': 0.50,
-        'household_size': (2, 2),
-        'lifestyle': 'URBAN_PREMIUM',
-        'brand_preference': 'PREMIUM',
-        'cooking_frequency': 'MEDIUM',
-        'health_consciousness': 'HIGH',
-        'price_sensitivity': 'LOW',
-        'tech_savviness': 'HIGH',
-        'impulse_tendency': 0.55,
-        'order_frequency_monthly': (10, 22),
-        'avg_basket_size': (500, 1200),
-        'preferred_categories': ['Gourmet & World Food', 'Fruits & Vegetables', 'Beverages'],
-        'peak_hours': [19, 20, 21],
-        'weekend_preference': 0.5,
-        'weight': 0.10,
-        'name_distribution': {'telugu': 0.45, 'muslim': 0.15, 'north': 0.30, 'christian': 0.10},
-    },
-    
-    # Multi-generational Families
-    'NUCLEAR_FAMILY_MIDDLE': {
-        'age_range': (28, 45),
-        'income_monthly_range': (40000, 100000),
-        'gender_ratio': 0.45,  # More female decision makers
-        'household_size': (3, 5),
-        'lifestyle': 'SUBURBAN_BALANCED',
-        'brand_preference': 'MASS',
-        'cooking_frequency': 'HIGH',
-        'health_consciousness': 'MEDIUM',
-        'price_sensitivity': 'HIGH',
-        'tech_savviness': 'MEDIUM',
-        'impulse_tendency': 0.35,
-        'order_frequency_monthly': (12, 25),
-        'avg_basket_size': (500, 1200),
-        'preferred_categories': ['Foodgrains, Oil & Masala', 'Bakery, Cakes & Dairy', 'Fruits & Vegetables'],
-        'peak_hours': [10, 11, 18, 19],
-        'weekend_preference': 0.3,
-        'weight': 0.15,
-        'name_distribution': {'telugu': 0.55, 'muslim': 0.25, 'north': 0.15, 'christian': 0.05},
-    },
-    
-    'NUCLEAR_FAMILY_AFFLUENT': {
-        'age_range': (30, 50),
-        'income_monthly_range': (150000, 500000),
-        'gender_ratio': 0.48,
-        'household_size': (3, 5),
-        'lifestyle': 'URBAN_PREMIUM',
-        'brand_preference': 'PREMIUM',
-        'cooking_frequency': 'MEDIUM',
-        'health_consciousness': 'HIGH',
-        'price_sensitivity': 'LOW',
-        'tech_savviness': 'HIGH',
-        'impulse_tendency': 0.50,
-        'order_frequency_monthly': (15, 30),
-        'avg_basket_size': (800, 2500),
-        'preferred_categories': ['Gourmet & World Food', 'Fruits & Vegetables', 'Baby Care'],
-        'peak_hours': [9, 10, 19, 20],
-        'weekend_preference': 0.35,
-        'weight': 0.06,
-        'name_distribution': {'telugu': 0.50, 'muslim': 0.15, 'north': 0.25, 'christian': 0.10},
-    },
-    
-    'JOINT_FAMILY_TRADITIONAL': {
-        'age_range': (35, 55),
-        'income_monthly_range': (50000, 150000),
-        'gender_ratio': 0.40,
-        'household_size': (5, 10),
-        'lifestyle': 'TRADITIONAL',
-        'brand_preference': 'BUDGET',
-        'cooking_frequency': 'HIGH',
-        'health_consciousness': 'LOW',
-        'price_sensitivity': 'HIGH',
-        'tech_savviness': 'LOW',
-        'impulse_tendency': 0.20,
-        'order_frequency_monthly': (8, 15),
-        'avg_basket_size': (700, 1800),
-        'preferred_categories': ['Foodgrains, Oil & Masala', 'Cleaning & Household', 'Bakery, Cakes & Dairy'],
-        'peak_hours': [9, 10, 11],
-        'weekend_preference': 0.25,
-        'weight': 0.08,
-        'name_distribution': {'telugu': 0.50, 'muslim': 0.35, 'north': 0.10, 'christian': 0.05},
-    },
-    
-    # New Parents
-    'NEW_PARENTS': {
-        'age_range': (25, 38),
-        'income_monthly_range': (50000, 180000),
-        'gender_ratio': 0.40,
-        'household_size': (3, 4),
-        'lifestyle': 'SUBURBAN_BALANCED',
-        'brand_preference': 'PREMIUM',
-        'cooking_frequency': 'MEDIUM',
-        'health_consciousness': 'HIGH',
-        'price_sensitivity': 'MEDIUM',
-        'tech_savviness': 'HIGH',
-        'impulse_tendency': 0.45,
-        'order_frequency_monthly': (15, 30),
-        'avg_basket_size': (600, 1500),
-        'preferred_categories': ['Baby Care', 'Bakery, Cakes & Dairy', 'Fruits & Vegetables'],
-        'peak_hours': [10, 14, 15, 20],
-        'weekend_preference': 0.4,
-        'weight': 0.07,
-        'name_distribution': {'telugu': 0.55, 'muslim': 0.20, 'north': 0.18, 'christian': 0.07},
-    },
-    
-    # IT Professionals (Significant in Hyderabad)
-    'IT_PROFESSIONAL': {
-        'age_range': (24, 40),
-        'income_monthly_range': (60000, 250000),
-        'gender_ratio': 0.68,  # Male dominated
-        'household_size': (1, 4),
-        'lifestyle': 'URBAN_FAST',
-        'brand_preference': 'MASS',
-        'cooking_frequency': 'LOW',
-        'health_consciousness': 'MEDIUM',
-        'price_sensitivity': 'MEDIUM',
-        'tech_savviness': 'HIGH',
-        'impulse_tendency': 0.60,
-        'order_frequency_monthly': (10, 22),
-        'avg_basket_size': (400, 900),
-        'preferred_categories': ['Snacks & Branded Foods', 'Beverages', 'Gourmet & World Food'],
-        'peak_hours': [20, 21, 22, 23],
-        'weekend_preference': 0.5,
-        'weight': 0.12,
-        'name_distribution': {'telugu': 0.45, 'muslim': 0.10, 'north': 0.35, 'christian': 0.10},
-    },
-    
-    # Homemakers
-    'HOMEMAKER': {
-        'age_range': (25, 50),
-        'income_monthly_range': (40000, 150000),  # Household income
-        'gender_ratio': 0.05,  # Almost all female
-        'household_size': (3, 6),
-        'lifestyle': 'TRADITIONAL',
-        'brand_preference': 'MASS',
-        'cooking_frequency': 'HIGH',
-        'health_consciousness': 'MEDIUM',
-        'price_sensitivity': 'HIGH',
-        'tech_savviness': 'MEDIUM',
-        'impulse_tendency': 0.35,
-        'order_frequency_monthly': (15, 30),
-        'avg_basket_size': (450, 1100),
-        'preferred_categories': ['Foodgrains, Oil & Masala', 'Fruits & Vegetables', 'Cleaning & Household'],
-        'peak_hours': [10, 11, 12, 17],
-        'weekend_preference': 0.25,
-        'weight': 0.08,
-        'name_distribution': {'telugu': 0.55, 'muslim': 0.30, 'north': 0.10, 'christian': 0.05},
-    },
-    
-    # Late Night Cravers
-    'LATE_NIGHT_CRAVER': {
-        'age_range': (18, 35),
-        'income_monthly_range': (15000, 100000),
-        'gender_ratio': 0.70,
-        'household_size': (1, 3),
-        'lifestyle': 'URBAN_FAST',
-        'brand_preference': 'MASS',
-        'cooking_frequency': 'LOW',
-        'health_consciousness': 'LOW',
-        'price_sensitivity': 'MEDIUM',
-        'tech_savviness': 'HIGH',
-        'impulse_tendency': 0.85,
-        'order_frequency_monthly': (5, 15),
-        'avg_basket_size': (200, 500),
-        'preferred_categories': ['Snacks & Branded Foods', 'Beverages', 'Bakery, Cakes & Dairy'],
-        'peak_hours': [22, 23, 0, 1],
-        'weekend_preference': 0.7,
-        'weight': 0.04,
-        'name_distribution': {'telugu': 0.45, 'muslim': 0.20, 'north': 0.25, 'christian': 0.10},
-    },
-    
-    # Fitness Enthusiasts
-    'FITNESS_ENTHUSIAST': {
-        'age_range': (22, 42),
-        'income_monthly_range': (40000, 180000),
-        'gender_ratio': 0.55,
-        'household_size': (1, 4),
-        'lifestyle': 'HEALTH_FOCUSED',
-        'brand_preference': 'PREMIUM',
-        'cooking_frequency': 'MEDIUM',
-        'health_consciousness': 'HIGH',
-        'price_sensitivity': 'LOW',
-        'tech_savviness': 'HIGH',
-        'impulse_tendency': 0.30,
-        'order_frequency_monthly': (12, 25),
-        'avg_basket_size': (500, 1100),
-        'preferred_categories': ['Fruits & Vegetables', 'Eggs, Meat & Fish', 'Gourmet & World Food'],
-        'peak_hours': [7, 8, 18, 19],
-        'weekend_preference': 0.45,
-        'weight': 0.04,
-        'name_distribution': {'telugu': 0.45, 'muslim': 0.10, 'north': 0.35, 'christian': 0.10},
-    },
-    
-    # Senior Citizens
-    'SENIOR_CITIZEN': {
-        'age_range': (55, 75),
-        'income_monthly_range': (25000, 80000),  # Pension
-        'gender_ratio': 0.45,
-        'household_size': (1, 3),
-        'lifestyle': 'TRADITIONAL',
-        'brand_preference': 'MASS',
-        'cooking_frequency': 'HIGH',
-        'health_consciousness': 'HIGH',
-        'price_sensitivity': 'MEDIUM',
-        'tech_savviness': 'LOW',
-        'impulse_tendency': 0.15,
-        'order_frequency_monthly': (6, 12),
-        'avg_basket_size': (400, 800),
-        'preferred_categories': ['Foodgrains, Oil & Masala', 'Fruits & Vegetables', 'Beauty & Hygiene'],
-        'peak_hours': [9, 10, 11, 16],
-        'weekend_preference': 0.3,
-        'weight': 0.03,
-        'name_distribution': {'telugu': 0.60, 'muslim': 0.25, 'north': 0.10, 'christian': 0.05},
-    },
-    
-    # Budget Conscious (Low income but 57% spending increase per research)
-    'BUDGET_CONSCIOUS': {
-        'age_range': (22, 45),
-        'income_monthly_range': (10000, 30000),
-        'gender_ratio': 0.55,
-        'household_size': (2, 5),
-        'lifestyle': 'BUDGET_FOCUSED',
-        'brand_preference': 'BUDGET',
-        'cooking_frequency': 'HIGH',
-        'health_consciousness': 'LOW',
-        'price_sensitivity': 'HIGH',
-        'tech_savviness': 'MEDIUM',
-        'impulse_tendency': 0.40,  # Still impulse buy despite budget
-        'order_frequency_monthly': (4, 10),
-        'avg_basket_size': (150, 350),
-        'preferred_categories': ['Foodgrains, Oil & Masala', 'Snacks & Branded Foods', 'Cleaning & Household'],
-        'peak_hours': [11, 12, 18, 19],
-        'weekend_preference': 0.35,
-        'weight': 0.05,
-        'name_distribution': {'telugu': 0.50, 'muslim': 0.35, 'north': 0.10, 'christian': 0.05},
-    },
-}
+DELIVERY_PREFS = ['EXPRESS', 'SCHEDULED', 'NO_PREFERENCE']
+DELIVERY_WEIGHTS = [0.55, 0.15, 0.30]
 
-# =============================================================================
-# HELPER FUNCTIONS
-# =============================================================================
+HEALTH_MAP = {'LOW': 0.25, 'MEDIUM': 0.50, 'HIGH': 0.80}
+PRICE_MAP = {'LOW': 0.25, 'MEDIUM': 0.50, 'HIGH': 0.80}
+TECH_MAP = {'LOW': 0.30, 'MEDIUM': 0.60, 'HIGH': 0.90}
+
+ACCOUNT_START = np.datetime64('2020-06-01')
+SNAPSHOT_DATE = np.datetime64('2024-12-01')
+
+
+# Names indexed by community * 2 + is_female, surnames by community
+FIRST_NAMES, FIRST_NAME_OFFSETS, FIRST_NAME_SIZES = flatten(
+    [NAME_TABLES[c][g] for c in COMMUNITIES for g in (0, 1)])
+SURNAMES, SURNAME_OFFSETS, SURNAME_SIZES = flatten([NAME_TABLES[c][2] for c in COMMUNITIES])
+FIRST_NAMES_LOWER = np.array([n.lower() for n in FIRST_NAMES], dtype=object)
+SURNAMES_LOWER = np.array([n.lower() for n in SURNAMES], dtype=object)
+
+
+def score_with_variance(base, u, variance=0.12):
+    return np.round(np.clip(base + uniform(u, -variance, variance), 0.05, 0.98), 2)
+
+
+def generate_segment(population, segment_name, customer_index, rng):
+    """Generate the customers `customer_index` of one segment as a DataFrame, column by column."""
+    segment = population.segments[segment_name]
+    n = len(customer_index)
+
+    def draw():
+        return rng.random(n)
 
-def generate_customer_id():
-    return f"HYD-{hashlib.md5(str(random.random()).encode()).hexdigest()[:8].upper()}"
-
-def generate_phone():
-    prefixes = ['98', '97', '96', '95', '94', '93', '91', '90', '89', '88', '87', '86', '85', '84', '83', '82', '81', '80', '79', '78', '77', '76', '75', '74', '73', '72', '71', '70']
-    return f"+91{random.choice(prefixes)}{random.randint(10000000, 99999999)}"
-
-def generate_email(first_name, last_name, birth_year):
-    domains = ['gmail.com', 'gmail.com', 'gmail.com', 'gmail.com', 'yahoo.com', 
-               'yahoo.co.in', 'hotmail.com', 'outlook.com', 'rediffmail.com']
-    patterns = [
-        f"{first_name.lower()}.{last_name.lower()}",
-        f"{first_name.lower()}{last_name.lower()}",
-        f"{first_name.lower()}{random.randint(1, 999)}",
-        f"{first_name.lower()}.{last_name.lower()}{str(birth_year)[-2:]}",
-        f"{first_name.lower()}_{last_name.lower()}",
-        f"{last_name.lower()}.{first_name.lower()}",
-    ]
-    return f"{random.choice(patterns)}@{random.choice(domains)}"
-
-def get_name_by_community(gender, community):
-    if community == 'telugu':
-        if gender == 'M':
-            return random.choice(TELUGU_MALE_NAMES), random.choice(TELUGU_SURNAMES)
-        else:
-            return random.choice(TELUGU_FEMALE_NAMES), random.choice(TELUGU_SURNAMES)
-    elif community == 'muslim':
-        if gender == 'M':
-            return random.choice(MUSLIM_MALE_NAMES), random.choice(MUSLIM_SURNAMES)
-        else:
-            return random.choice(MUSLIM_FEMALE_NAMES), random.choice(MUSLIM_SURNAMES)
-    elif community == 'north':
-        if gender == 'M':
-            return random.choice(NORTH_INDIAN_MALE_NAMES), random.choice(NORTH_INDIAN_SURNAMES)
-        else:
-            return random.choice(NORTH_INDIAN_FEMALE_NAMES), random.choice(NORTH_INDIAN_SURNAMES)
-    else:  # christian
-        if gender == 'M':
-            return random.choice(CHRISTIAN_MALE_NAMES), random.choice(CHRISTIAN_SURNAMES)
-        else:
-            return random.choice(CHRISTIAN_FEMALE_NAMES), random.choice(CHRISTIAN_SURNAMES)
-
-def get_location_by_income(income_monthly):
-    if income_monthly > 100000:
-        area_type = random.choices(['PREMIUM', 'UPPER_MIDDLE'], weights=[0.6, 0.4])[0]
-    elif income_monthly > 50000:
-        area_type = random.choices(['UPPER_MIDDLE', 'MIDDLE'], weights=[0.5, 0.5])[0]
-    elif income_monthly > 25000:
-        area_type = random.choices(['MIDDLE', 'LOWER_MIDDLE'], weights=[0.6, 0.4])[0]
-    else:
-        area_type = random.choices(['MIDDLE', 'LOWER_MIDDLE'], weights=[0.3, 0.7])[0]
-    
-    area = random.choice(HYDERABAD_AREAS[area_type])
-    return area
-
-def get_income_bracket(income_monthly):
-    if income_monthly < 15000:
-        return 'LOW'
-    elif income_monthly < 30000:
-        return 'LOWER_MIDDLE'
-    elif income_monthly < 60000:
-        return 'MIDDLE'
-    elif income_monthly < 150000:
-        return 'UPPER_MIDDLE'
-    else:
-        return 'HIGH'
-
-def score_with_variance(base, variance=0.12):
-    return round(np.clip(base + np.random.uniform(-variance, variance), 0.05, 0.98), 2)
-
-def generate_customer(segment_name, segment):
     # Gender based on segment ratio
-    gender = 'M' if random.random() < segment['gender_ratio'] else 'F'
-    
+    is_female = draw() >= segment['gender_ratio']
+    gender = np.where(is_female, 'F', 'M').astype(object)
+
     # Age
-    age = random.randint(*segment['age_range'])
+    age = randint(draw(), *segment['age_range'])
     birth_year = 2024 - age
-    
+
     # Community selection based on segment distribution
     communities = list(segment['name_distribution'].keys())
     weights = list(segment['name_distribution'].values())
-    community = random.choices(communities, weights=weights)[0]
-    
+    community_codes = np.array([COMMUNITIES.index(c) for c in communities])
+    community = community_codes[weighted_index(draw(), weights)]
+
     # Name
-    first_name, last_name = get_name_by_community(gender, community)
-    
+    table = community * 2 + is_female
+    first_idx = FIRST_NAME_OFFSETS[table] + uniform_index(draw(), FIRST_NAME_SIZES[table])
+    last_idx = SURNAME_OFFSETS[community] + uniform_index(draw(), SURNAME_SIZES[community])
+    first_name = FIRST_NAMES[first_idx]
+    last_name = SURNAMES[last_idx]
+
     # Income
-    income_monthly = int(np.random.uniform(*segment['income_monthly_range']))
-    income_monthly = round(income_monthly / 1000) * 1000
+    income_monthly = np.floor(uniform(draw(), *segment['income_monthly_range']))
+    income_monthly = (np.round(income_monthly / 1000) * 1000).astype(np.int64)
     income_annual = income_monthly * 12
-    
+
     # Location
-    area_name, lat, lng, expected_income = get_location_by_income(income_monthly)
-    lat += random.uniform(-0.008, 0.008)
-    lng += random.uniform(-0.008, 0.008)
-    
+    area_type = banded_weighted_index(draw(), income_monthly, population.income_area_weights)
+    area_idx = population.area_offsets[area_type] + uniform_index(draw(), population.area_sizes[area_type])
+    lat = population.area_lats[area_idx] + uniform(draw(), -0.008, 0.008)
+    lng = population.area_lngs[area_idx] + uniform(draw(), -0.008, 0.008)
+    lat, lng = np.round(lat, 6), np.round(lng, 6)
+    store_columns = {}
+    if population.stores is not None:
+        store_id, distance = population.stores.assign(lat, lng, population.service_radius_km)
+        store_columns = {'home_store_id': store_id, 'store_distance_km': distance}
+
     # Household
-    household_size = random.randint(*segment['household_size'])
-    
+    household_size = randint(draw(), *segment['household_size'])
+
     # Behavioral scores
-    health_map = {'LOW': 0.25, 'MEDIUM': 0.50, 'HIGH': 0.80}
-    price_map = {'LOW': 0.25, 'MEDIUM': 0.50, 'HIGH': 0.80}
-    tech_map = {'LOW': 0.30, 'MEDIUM': 0.60, 'HIGH': 0.90}
-    
-    health_consciousness = score_with_variance(health_map[segment['health_consciousness']])
-    price_sensitivity = score_with_variance(price_map[segment['price_sensitivity']])
-    tech_savviness = score_with_variance(tech_map[segment['tech_savviness']])
-    impulse_tendency = score_with_variance(segment['impulse_tendency'])
-    
+    health_consciousness = score_with_variance(HEALTH_MAP[segment['health_consciousness']], draw())
+    price_sensitivity = score_with_variance(PRICE_MAP[segment['price_sensitivity']], draw())
+    tech_savviness = score_with_variance(TECH_MAP[segment['tech_savviness']], draw())
+    impulse_tendency = score_with_variance(segment['impulse_tendency'], draw())
+
     # Order patterns
-    order_freq = random.randint(*segment['order_frequency_monthly'])
-    avg_basket = int(np.random.uniform(*segment['avg_basket_size']))
-    
+    order_freq = randint(draw(), *segment['order_frequency_monthly'])
+    avg_basket = uniform(draw(), *segment['avg_basket_size']).astype(np.int64)
+
     # Account info
-    account_created = datetime(2020, 6, 1) + timedelta(days=random.randint(0, 1600))
-    last_order = datetime(2024, 12, 1) - timedelta(days=random.randint(0, 45))
-    months_active = max(1, (datetime(2024, 12, 1) - account_created).days // 30)
-    total_orders = int(order_freq * months_active * random.uniform(0.6, 1.1))
-    total_orders = max(1, total_orders)
-    
+    account_created = ACCOUNT_START + randint(draw(), 0, 1600)
+    last_order = SNAPSHOT_DATE - randint(draw(), 0, 45)
+    months_active = np.maximum(1, (SNAPSHOT_DATE - account_created).astype(np.int64) // 30)
+    total_orders = (order_freq * months_active * uniform(draw(), 0.6, 1.1)).astype(np.int64)
+    total_orders = np.maximum(1, total_orders)
+
     lifetime_value = total_orders * avg_basket
-    
+
     # Loyalty tier
-    if lifetime_value > 150000:
-        loyalty_tier = 'PLATINUM'
-    elif lifetime_value > 75000:
-        loyalty_tier = 'GOLD'
-    elif lifetime_value > 30000:
-        loyalty_tier = 'SILVER'
-    else:
-        loyalty_tier = 'BRONZE'
-    
+    loyalty_tier = np.select(
+        [lifetime_value > 150000, lifetime_value > 75000, lifetime_value > 30000],
+        ['PLATINUM', 'GOLD', 'SILVER'], default='BRONZE').astype(object)
+
     # App engagement
-    app_sessions_monthly = int(order_freq * random.uniform(2.5, 5))
-    
+    app_sessions_monthly = (order_freq * uniform(draw(), 2.5, 5)).astype(np.int64)
+
     # Payment preference (UPI dominant in India)
-    payment_methods = ['UPI', 'CARD', 'COD', 'WALLET', 'NETBANKING']
-    if income_monthly > 80000:
-        payment_weights = [0.40, 0.35, 0.08, 0.12, 0.05]
-    elif income_monthly > 30000:
-        payment_weights = [0.50, 0.20, 0.15, 0.10, 0.05]
-    else:
-        payment_weights = [0.45, 0.10, 0.30, 0.10, 0.05]
-    preferred_payment = random.choices(payment_methods, weights=payment_weights)[0]
-    
+    preferred_payment = np.array(PAYMENT_METHODS, dtype=object)[
+        banded_weighted_index(draw(), income_monthly, INCOME_PAYMENT_WEIGHTS)]
+
     # Delivery preference
-    delivery_prefs = ['EXPRESS', 'SCHEDULED', 'NO_PREFERENCE']
-    delivery_weights = [0.55, 0.15, 0.30]
-    preferred_delivery = random.choices(delivery_prefs, weights=delivery_weights)[0]
-    
+    preferred_delivery = np.array(DELIVERY_PREFS, dtype=object)[
+        weighted_index(draw(), DELIVERY_WEIGHTS)]
+
     # Subscription
-    has_subscription = random.random() < (0.20 if income_monthly > 60000 else 0.08)
-    
+    has_subscription = draw() < np.where(income_monthly > 60000, 0.20, 0.08)
+
     # Peak hours
-    primary_order_hour = random.choice(segment['peak_hours'])
-    
-    return {
-        'customer_id': generate_customer_id(),
+    peak_hours = np.array(segment['peak_hours'])
+    primary_order_hour = peak_hours[uniform_index(draw(), len(peak_hours))]
+
+    # Contact details
+    customer_id = allocate_ids(population.id_prefix, customer_index, 'customer', population.seed)
+    phone = ('+91' + np.array(PHONE_PREFIXES, dtype=object)[uniform_index(draw(), len(PHONE_PREFIXES))]
+             + to_str(randint(draw(), 10000000, 99999999)))
+
+    first_l = FIRST_NAMES_LOWER[first_idx]
+    last_l = SURNAMES_LOWER[last_idx]
+    email_number = to_str(randint(draw(), 1, 999))
+    email_patterns = [
+        lambda m: first_l[m] + '.' + last_l[m],
+        lambda m: first_l[m] + last_l[m],
+        lambda m: first_l[m] + email_number[m],
+        lambda m: first_l[m] + '.' + last_l[m] + TWO_DIGITS[birth_year[m] % 100],
+        lambda m: first_l[m] + '_' + last_l[m],
+        lambda m: last_l[m] + '.' + first_l[m],
+    ]
+    pattern = uniform_index(draw(), len(email_patterns))
+    email = np.empty(n, dtype=object)
+    for i, build in enumerate(email_patterns):
+        mask = pattern == i
+        email[mask] = build(mask)
+    email = email + '@' + np.array(EMAIL_DOMAINS, dtype=object)[uniform_index(draw(), len(EMAIL_DOMAINS))]
+
+    pincode = population.pincode_prefix + to_str(randint(draw(), *population.pincode_range))
+
+    categories = segment['preferred_categories']
+
+    return pd.DataFrame({
+        'customer_id': customer_id,
         'first_name': first_name,
         'last_name': last_name,
-        'full_name': f"{first_name} {last_name}",
+        'full_name': first_name + ' ' + last_name,
         'gender': gender,
         'age': age,
         'birth_year': birth_year,
-        'community': community.upper(),
-        'phone': generate_phone(),
-        'email': generate_email(first_name, last_name, birth_year),
-        
-        'locality': area_name,
-        'city': 'Hyderabad',
-        'state': 'Telangana',
-        'pincode': f"5000{random.randint(10, 99)}",
-        'latitude': round(lat, 6),
-        'longitude': round(lng, 6),
-        
+        'community': np.array([c.upper() for c in COMMUNITIES], dtype=object)[community],
+        'phone': phone,
+        'email': email,
+
+        'locality': population.area_names[area_idx],
+        'city': population.city,
+        'state': population.state,
+        'pincode': pincode,
+        'latitude': lat,
+        'longitude': lng,
+        **store_columns,
+
         'household_size': household_size,
         'monthly_income': income_monthly,
         'annual_income': income_annual,
-        'income_bracket': get_income_bracket(income_monthly),
-        
+        'income_bracket': np.select(
+            [income_monthly < 15000, income_monthly < 30000, income_monthly < 60000, income_monthly < 150000],
+            ['LOW', 'LOWER_MIDDLE', 'MIDDLE', 'UPPER_MIDDLE'], default='HIGH').astype(object),
+
         'customer_segment': segment_name,
         'lifestyle': segment['lifestyle'],
         'brand_preference': segment['brand_preference'],
         'cooking_frequency': segment['cooking_frequency'],
-        
+
         'health_consciousness': health_consciousness,
         'price_sensitivity': price_sensitivity,
         'tech_savviness': tech_savviness,
         'impulse_tendency': impulse_tendency,
-        'weekend_preference': round(segment['weekend_preference'] + random.uniform(-0.08, 0.08), 2),
-        
+        'weekend_preference': np.round(segment['weekend_preference'] + uniform(draw(), -0.08, 0.08), 2),
+
         'orders_per_month': order_freq,
         'avg_basket_value': avg_basket,
         'primary_order_hour': primary_order_hour,
-        
-        'account_created_date': account_created.strftime('%Y-%m-%d'),
-        'last_order_date': last_order.strftime('%Y-%m-%d'),
+
+        'account_created_date': np.datetime_as_string(account_created, unit='D').astype(object),
+        'last_order_date': np.datetime_as_string(last_order, unit='D').astype(object),
         'total_orders': total_orders,
         'lifetime_value': lifetime_value,
         'loyalty_tier': loyalty_tier,
-        
+
         'app_sessions_monthly': app_sessions_monthly,
         'preferred_payment': preferred_payment,
         'preferred_delivery': preferred_delivery,
         'has_subscription': has_subscription,
-        
-        'preferred_category_1': segment['preferred_categories'][0],
-        'preferred_category_2': segment['preferred_categories'][1] if len(segment['preferred_categories']) > 1 else '',
-        'preferred_category_3': segment['preferred_categories'][2] if len(segment['preferred_categories']) > 2 else '',
-        
-        'avg_items_per_order': max(1, int(avg_basket / 120)),
-        'morning_order_tendency': round(0.7 if primary_order_hour < 12 else 0.3 + random.uniform(-0.1, 0.1), 2),
-        'evening_order_tendency': round(0.7 if primary_order_hour >= 18 else 0.3 + random.uniform(-0.1, 0.1), 2),
-    }
+
+        'preferred_category_1': categories[0],
+        'preferred_category_2': categories[1] if len(categories) > 1 else '',
+        'preferred_category_3': categories[2] if len(categories) > 2 else '',
+
+        'avg_items_per_order': np.maximum(1, avg_basket // 120),
+        'morning_order_tendency': np.where(primary_order_hour < 12, 0.7,
+                                           np.round(0.3 + uniform(draw(), -0.1, 0.1), 2)),
+        'evening_order_tendency': np.where(primary_order_hour >= 18, 0.7,
+                                           np.round(0.3 + uniform(draw(), -0.1, 0.1), 2)),
+    })
 
 # =============================================================================
-# GENERATE 1.5 MILLION CUSTOMERS
+# CITY CONFIGS
 # =============================================================================
 
-NUM_CUSTOMERS = 1_500_000
 BATCH_SIZE = 50000
-
-# Calculate segment counts
-total_weight = sum(s['weight'] for s in CUSTOMER_SEGMENTS.values())
-segment_counts = {
-    name: int(NUM_CUSTOMERS * seg['weight'] / total_weight)
-    for name, seg in CUSTOMER_SEGMENTS.items()
+NUM_WORKERS = os.cpu_count() or 1
+OUTPUT_FORMATS = ['csv', 'parquet']
+
+# Columnar output: dictionary-encoded strings and narrow integer types
+CATEGORICAL_COLUMNS = [
+    'first_name', 'last_name', 'gender', 'community', 'locality', 'city', 'state', 'pincode',
+    'home_store_id', 'income_bracket', 'customer_segment', 'lifestyle', 'brand_preference', 'cooking_frequency',
+    'account_created_date', 'last_order_date', 'loyalty_tier', 'preferred_payment',
+    'preferred_delivery', 'preferred_category_1', 'preferred_category_2', 'preferred_category_3',
+]
+PARQUET_DTYPES = {
+    'age': 'int8', 'birth_year': 'int16', 'household_size': 'int8',
+    'monthly_income': 'int32', 'annual_income': 'int32',
+    'orders_per_month': 'int8', 'avg_basket_value': 'int16', 'primary_order_hour': 'int8',
+    'total_orders': 'int32', 'lifetime_value': 'int32',
+    'app_sessions_monthly': 'int16', 'avg_items_per_order': 'int16', 'store_distance_km': 'float32',
 }
 
-# Adjust to match exact count
-diff = NUM_CUSTOMERS - sum(segment_counts.values())
-largest = max(segment_counts, key=segment_counts.get)
-segment_counts[largest] += diff
-
-print(f"\nGenerating {NUM_CUSTOMERS:,} customers...")
-print("\nSegment distribution:")
-for name, count in sorted(segment_counts.items(), key=lambda x: -x[1]):
-    pct = count / NUM_CUSTOMERS * 100
-    print(f"  {name}: {count:,} ({pct:.1f}%)")
-
-# Generate in batches for memory efficiency
-all_customers = []
-customers_generated = 0
-
-for segment_name, segment in CUSTOMER_SEGMENTS.items():
-    count = segment_counts[segment_name]
-    print(f"\nGenerating {segment_name}: {count:,} customers...")
-    
-    segment_customers = []
-    for i in range(count):
-        customer = generate_customer(segment_name, segment)
-        segment_customers.append(customer)
-        
-        if (i + 1) % 100000 == 0:
-            print(f"  Progress: {i+1:,}/{count:,}")
-    
-    all_customers.extend(segment_customers)
-    customers_generated += count
-    print(f"  Done! Total: {customers_generated:,}/{NUM_CUSTOMERS:,}")
-
-# Convert to DataFrame
-print(f"\nConverting to DataFrame...")
-df = pd.DataFrame(all_customers)
-
-# Shuffle
-print("Shuffling...")
-df = df.sample(frac=1, random_state=42).reset_index(drop=True)
-
-# Save
-output_file = 'customer_profiles.csv'
-print(f"Saving to {output_file}...")
-df.to_csv(output_file, index=False)
-
-print("\n" + "="*70)
-print(f"SUCCESS: Generated {len(df):,} customer profiles")
-print("="*70)
-
-# Statistics
-print(f"\nColumns: {len(df.columns)}")
-print(f"\nGender: M={len(df[df['gender']=='M']):,} ({len(df[df['gender']=='M'])/len(df)*100:.1f}%), F={len(df[df['gender']=='F']):,} ({len(df[df['gender']=='F'])/len(df)*100:.1f}%)")
-print(f"Age: {df['age'].min()}-{df['age'].max()} (mean: {df['age'].mean():.1f})")
-print(f"Monthly Income: ₹{df['monthly_income'].min():,} - ₹{df['monthly_income'].max():,}")
-
-print("\nIncome Distribution:")
-for bracket in ['LOW', 'LOWER_MIDDLE', 'MIDDLE', 'UPPER_MIDDLE', 'HIGH']:
-    count = len(df[df['income_bracket'] == bracket])
-    print(f"  {bracket}: {count:,} ({count/len(df)*100:.1f}%)")
-
-print("\nCommunity Distribution:")
-for comm in df['community'].unique():
-    count = len(df[df['community'] == comm])
-    print(f"  {comm}: {count:,} ({count/len(df)*100:.1f}%)")
-
-print("\nTop 10 Localities:")
-for loc, count in df['locality'].value_counts().head(10).items():
-    print(f"  {loc}: {count:,} ({count/len(df)*100:.1f}%)")
+
+class Population:
+    """A city config compiled into the lookup tables the columnar engine uses."""
+
+    def __init__(self, path, config):
+        self.path = path
+        self.name = config['name']
+        self.city = config['city']
+        self.state = config['state']
+        self.id_prefix = config.get('id_prefix', 'HYD')
+        self.pincode_prefix = config['pincode_prefix']
+        self.pincode_range = tuple(config['pincode_range'])
+        self.num_customers = config['num_customers']
+        self.seed = config['seed']
+        self.output_stem = config.get('output_stem', f"customer_profiles_{self.name}")
+        self.segments = config['segments']
+
+        unknown = {c for seg in self.segments.values() for c in seg['name_distribution']} - set(COMMUNITIES)
+        if unknown:
+            raise ValueError(f"{path}: no name tables for communities {sorted(unknown)}")
+
+        # Localities grouped by area type
+        self.area_types = list(config['areas'])
+        areas = [config['areas'][t] for t in self.area_types]
+        self.area_names, self.area_offsets, self.area_sizes = flatten([[a[0] for a in group] for group in areas])
+        self.area_lats = np.array([a[1] for group in areas for a in group])
+        self.area_lngs = np.array([a[2] for group in areas for a in group])
+
+        # Dark stores customers are assigned to (optional)
+        self.stores = None
+        self.service_radius_km = config.get('service_radius_km', SERVICE_RADIUS_KM)
+        if 'stores' in config:
+            self.stores = ServiceIndex.from_stores(load_stores(config['stores']), self.service_radius_km)
+        self.income_area_weights = [
+            (floor, [weights.get(t, 0.0) for t in self.area_types])
+            for floor, weights in config['income_area_weights']
+        ]
+
+        # Segment counts, adjusted to match the exact total
+        total_weight = sum(s['weight'] for s in self.segments.values())
+        self.segment_counts = {
+            name: int(self.num_customers * seg['weight'] / total_weight)
+            for name, seg in self.segments.items()
+        }
+        diff = self.num_customers - sum(self.segment_counts.values())
+        largest = max(self.segment_counts, key=self.segment_counts.get)
+        self.segment_counts[largest] += diff
+
+        # Segments occupy contiguous customer index ranges, in config order
+        self.segment_starts = np.concatenate([[0], np.cumsum(list(self.segment_counts.values()))])
+
+    def block_ranges(self):
+        """Split the output row range into fixed-size (start, end) blocks."""
+        return [(start, min(start + BATCH_SIZE, self.num_customers))
+                for start in range(0, self.num_customers, BATCH_SIZE)]
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_population(path):
+    return Population(path, load_config(path))
+
+
+def load_population(config_path=DEFAULT_CONFIG):
+    """Compiled population for a config file, parsed once per process."""
+    return _compile_population(os.path.abspath(config_path))
+
+
+def _init_worker(config_paths):
+    for path in config_paths:
+        load_population(path)
+
+# =============================================================================
+# SHARDED STREAMING GENERATION
+# =============================================================================
+
+def get_customers(indices, config_path=DEFAULT_CONFIG):
+    """Materialize customers by customer index, without generating anyone else.
+
+    A customer's profile is derived from (seed, customer index) alone through
+    a counter-based RNG, so the population acts as a virtual table: any batch
+    of indices comes back identical to the matching rows of the full output.
+    """
+    population = load_population(config_path)
+    customer_index = np.asarray(indices, dtype=np.int64)
+    if customer_index.size and (customer_index.min() < 0 or customer_index.max() >= population.num_customers):
+        raise IndexError(f"customer indices must be in [0, {population.num_customers:,})")
+
+    segment_of_row = np.searchsorted(population.segment_starts, customer_index, side='right') - 1
+    order = np.argsort(segment_of_row, kind='stable')
+
+    frames = []
+    for i, segment_name in enumerate(population.segments):
+        in_segment = segment_of_row == i
+        if in_segment.any():
+            rng = CounterRNG(population.seed, customer_index[in_segment])
+            frames.append(generate_segment(population, segment_name, customer_index[in_segment], rng))
+
+    if not frames:  # no indices requested
+        segment_name = next(iter(population.segments))
+        return generate_segment(population, segment_name, customer_index, CounterRNG(population.seed, customer_index))
+
+    # Frames are in segment order; put rows back in request order
+    df = pd.concat(frames, ignore_index=True)
+    return df.iloc[np.argsort(order)].reset_index(drop=True)
+
+
+def generate_block(block, config_path=DEFAULT_CONFIG):
+    """Generate output rows [start, end) of block number `block`.
+
+    Row p holds customer permute_index(p), so the output only depends on the
+    block layout and never on which worker ran the block.
+    """
+    population = load_population(config_path)
+    start, end = population.block_ranges()[block]
+    row_key = derive_key('row_order', population.seed)
+    return get_customers(permute_index(np.arange(start, end), population.num_customers, row_key), config_path)
+
+
+def render_block(config_path, block):
+    """Generate a block and render it for each output format, plus its statistics (runs in workers)."""
+    df = generate_block(block, config_path)
+    rendered = {}
+    if 'csv' in OUTPUT_FORMATS:
+        rendered['csv'] = df.to_csv(index=False, header=(block == 0))
+    if 'parquet' in OUTPUT_FORMATS:
+        rendered['parquet'] = to_columnar(df, CATEGORICAL_COLUMNS, PARQUET_DTYPES)
+    return rendered, CustomerStats().update(df)
+
+
+def iter_rendered_blocks(population, pool=None, num_workers=1):
+    """Yield rendered blocks in order, keeping at most 2 * num_workers in flight."""
+    blocks = range(len(population.block_ranges()))
+    if pool is None:
+        for block in blocks:
+            yield render_block(population.path, block)
+        return
+
+    pending = deque()
+    for block in blocks:
+        pending.append(pool.apply_async(render_block, (population.path, block)))
+        if len(pending) >= 2 * num_workers:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def write_customers(population, pool=None, num_workers=1):
+    """Stream a population to its output_stem.csv/.parquet one block at a time; returns its statistics."""
+    stats = CustomerStats()
+    stem = population.output_stem
+    csv_file = open(f"{stem}.csv", 'w', newline='') if 'csv' in OUTPUT_FORMATS else None
+    parquet_writer = (ParquetStreamWriter(f"{stem}.parquet", CATEGORICAL_COLUMNS, PARQUET_DTYPES)
+                      if 'parquet' in OUTPUT_FORMATS else None)
+    try:
+        for rendered, block_stats in iter_rendered_blocks(population, pool, num_workers):
+            if csv_file is not None:
+                csv_file.write(rendered['csv'])
+            if parquet_writer is not None:
+                parquet_writer.write(rendered['parquet'])
+            stats.merge(block_stats)
+            print(f"  Progress: {stats.rows:,}/{population.num_customers:,}")
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+        if parquet_writer is not None:
+            parquet_writer.close()
+    return stats
+
+
+def generate_cities(config_paths, num_workers=NUM_WORKERS, report=True):
+    """Generate one population per config, sharing a single worker pool.
+
+    Each worker compiles every config once up front and reuses the lookup
+    tables for all blocks of all cities. Returns {population name: stats}.
+    """
+    populations = [load_population(path) for path in config_paths]
+    results = {}
+    pool = None
+    if num_workers > 1:
+        pool = multiprocessing.Pool(num_workers, initializer=_init_worker,
+                                    initargs=([p.path for p in populations],))
+    try:
+        for population in populations:
+            if report:
+                print_header(population, num_workers)
+            results[population.name] = stats = write_customers(population, pool, num_workers)
+            if report:
+                print_report(stats)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return results
+
+
+def generate_population(config_path=DEFAULT_CONFIG, num_workers=NUM_WORKERS, report=True):
+    """Generate and save one city's customers; returns their statistics."""
+    return generate_cities([config_path], num_workers, report)[load_population(config_path).name]
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+def print_header(population, num_workers):
+    print("="*70)
+    print(f"{population.city.upper()} BLINKIT CUSTOMER PROFILE GENERATOR ({population.name})")
+    print(f"Target: {population.num_customers:,} Users")
+    print("="*70)
+
+    print(f"\nGenerating {population.num_customers:,} customers...")
+    print("\nSegment distribution:")
+    for name, count in sorted(population.segment_counts.items(), key=lambda x: -x[1]):
+        pct = count / population.num_customers * 100
+        print(f"  {name}: {count:,} ({pct:.1f}%)")
+
+    output_files = ', '.join(f"{population.output_stem}.{fmt}" for fmt in OUTPUT_FORMATS)
+    n_blocks = len(population.block_ranges())
+    print(f"\nStreaming {n_blocks} blocks of up to {BATCH_SIZE:,} customers to {output_files} "
+          f"on {num_workers} worker(s)...")
+
+
+def print_report(stats):
+    total = stats.rows
+
+    print("\n" + "="*70)
+    print(f"SUCCESS: Generated {total:,} customer profiles")
+    print("="*70)
+
+    # Statistics (aggregated while streaming, no rescans)
+    m_count, m_pct = stats.share('gender', 'M')
+    f_count, f_pct = stats.share('gender', 'F')
+    print(f"\nGender: M={m_count:,} ({m_pct:.1f}%), F={f_count:,} ({f_pct:.1f}%)")
+    print(f"Age: {stats.mins['age']}-{stats.maxs['age']} (mean: {stats.mean('age'):.1f})")
+    print(f"Monthly Income: ₹{stats.mins['monthly_income']:,} - ₹{stats.maxs['monthly_income']:,} "
+          f"(mean: ₹{stats.mean('monthly_income'):,.0f})")
+
+    print("\nIncome Distribution:")
+    for bracket in ['LOW', 'LOWER_MIDDLE', 'MIDDLE', 'UPPER_MIDDLE', 'HIGH']:
+        count, pct = stats.share('income_bracket', bracket)
+        print(f"  {bracket}: {count:,} ({pct:.1f}%)")
+
+    print("\nCommunity Distribution:")
+    for comm, count in stats.top('community', None):
+        print(f"  {comm}: {count:,} ({count/total*100:.1f}%)")
+
+    print("\nAge Histogram:")
+    for low, high, count in stats.histogram('age'):
+        print(f"  {low}-{high}: {count:,} ({count/total*100:.1f}%)")
+
+    print("\nTop 10 Localities:")
+    for loc, count in stats.top('locality', 10):
+        print(f"  {loc}: {count:,} ({count/total*100:.1f}%)")
+
+
+def main():
+    # Usage: python generate_hyderabad_customers.py [config.json ...]
+    config_paths = sys.argv[1:] or [DEFAULT_CONFIG]
+    generate_cities(config_paths)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Geographic Helpers for Stores, Customers and Riders
+- Bulk (broadcasting) haversine distances
+- Nearest serviceable dark store for millions of points through a BallTree
+  with the haversine metric
+- Store x store and store x locality distance matrices, cached as binary arrays
+Output: geo_distances.npz (store_ids, locality_names, store_store_km, store_locality_km)
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371
+SERVICE_RADIUS_KM = 5.0  # a dark store delivers up to this far (straight line)
+DISTANCES_FILE = 'geo_distances.npz'
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; arguments broadcast like numpy arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=float)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def distance_matrix(lat_a, lon_a, lat_b, lon_b):
+    """(len(a), len(b)) float32 matrix of haversine distances in km."""
+    lat_a, lon_a = np.asarray(lat_a, dtype=float)[:, None], np.asarray(lon_a, dtype=float)[:, None]
+    return haversine_km(lat_a, lon_a, lat_b, lon_b).astype(np.float32)
+
+
+def load_stores(path='blinkit_stores_master.csv', store_type='DARK_STORE'):
+    """Rows of the store master of one store_type (None for all), in file order."""
+    stores = pd.read_csv(path)
+    if store_type is not None:
+        stores = stores[stores['store_type'] == store_type].reset_index(drop=True)
+    return stores
+
+
+class StoreLocator:
+    """Nearest-store queries over fixed store coordinates."""
+
+    def __init__(self, store_ids, lats, lons):
+        self.store_ids = np.asarray(store_ids, dtype=object)
+        self.tree = BallTree(np.radians(np.column_stack([lats, lons])), metric='haversine')
+
+    @classmethod
+    def from_stores(cls, stores):
+        return cls(stores['store_id'], stores['latitude'], stores['longitude'])
+
+    def nearest(self, lats, lons, k=1, max_km=None):
+        """Positions (into .store_ids) and km distances of the k nearest stores of every point.
+
+        Both are (n, k), nearest first; stores farther than max_km are -1 / NaN.
+        """
+        points = np.radians(np.column_stack([np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)]))
+        k = min(k, len(self.store_ids))
+        distances, positions = self.tree.query(points, k=k) if len(points) else (np.zeros((0, k)), np.zeros((0, k)))
+        distances = (distances * EARTH_RADIUS_KM).astype(np.float32)
+        positions = positions.astype(np.int32)
+        if max_km is not None:
+            outside = distances > max_km
+            positions[outside], distances[outside] = -1, np.nan
+        return positions, distances
+
+    def assign(self, lats, lons, max_km=SERVICE_RADIUS_KM):
+        """(store_id, distance_km) of the nearest store within max_km; ('', NaN) when none is."""
+        positions, distances = self.nearest(lats, lons, 1, max_km)
+        positions, distances = positions[:, 0], distances[:, 0]
+        ids = np.where(positions >= 0, self.store_ids[np.maximum(positions, 0)], '')
+        return ids.astype(object), np.round(distances, 3)
+
+
+def save_distance_matrices(stores, localities, path=DISTANCES_FILE):
+    """Cache store x store and store x locality distances (km, float32).
+
+    `stores` has store_id/latitude/longitude and `localities` name/latitude/longitude;
+    matrix rows and columns follow their row order.
+    """
+    store_lat, store_lon = stores['latitude'].to_numpy(), stores['longitude'].to_numpy()
+    np.savez(path,
+             store_ids=stores['store_id'].to_numpy(dtype=str),
+             locality_names=localities['name'].to_numpy(dtype=str),
+             store_store_km=distance_matrix(store_lat, store_lon, store_lat, store_lon),
+             store_locality_km=distance_matrix(store_lat, store_lon,
+                                               localities['latitude'], localities['longitude']))
+    return path
+
+
+def load_distance_matrices(path=DISTANCES_FILE):
+    """The cached matrices and their labels as a dict of arrays."""
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
@@ -0,0 +1,64 @@
+"""
+Shared ID Allocator for Customers, Riders and Pickers
+Turns counters into unique, deterministic, opaque-looking IDs in bulk
+Format: PREFIX-XXXXXXXX (8 upper-case hex digits)
+
+Uniqueness guarantee: an ID is a keyed bijection (Feistel network) of its
+counter over the 32-bit ID space, so distinct counters in [0, ID_SPACE)
+always give distinct IDs - no collisions, no lookup table, no retries.
+"""
+
+import hashlib
+import numpy as np
+from counter_rng import mix64
+
+ID_SPACE = 2**32
+
+HEX_BYTES = np.array(['%02X' % i for i in range(256)], dtype=object)
+
+
+def derive_key(namespace, seed):
+    """64-bit permutation key for a (namespace, seed) pair."""
+    digest = hashlib.sha256(f"{namespace}:{seed}".encode()).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+def permute_index(positions, n, key, rounds=6):
+    """Keyed bijection of [0, n) onto itself (Feistel network + cycle walking)."""
+    half_bits = max(1, (int(n - 1).bit_length() + 1) // 2)
+    mask = np.uint64((1 << half_bits) - 1)
+    round_keys = mix64(np.arange(rounds, dtype=np.uint64)
+                       + np.array([key % 2**64], dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15))
+
+    def feistel(x):
+        left, right = x >> np.uint64(half_bits), x & mask
+        for k in round_keys:
+            left, right = right, left ^ (mix64(right ^ k) & mask)
+        return (left << np.uint64(half_bits)) | right
+
+    x = feistel(np.asarray(positions, dtype=np.uint64))
+    outside = x >= np.uint64(n)
+    while outside.any():
+        x[outside] = feistel(x[outside])
+        outside = x >= np.uint64(n)
+    return x.astype(np.int64)
+
+
+def to_hex(values):
+    """Format 32-bit integers as 8-digit upper-case hex strings."""
+    values = np.asarray(values, dtype=np.uint32)
+    return (HEX_BYTES[values >> 24] + HEX_BYTES[(values >> 16) & 0xFF]
+            + HEX_BYTES[(values >> 8) & 0xFF] + HEX_BYTES[values & 0xFF])
+
+
+def allocate_ids(prefix, counters, namespace, seed):
+    """Map counters to IDs like 'HYD-1B8F3FA9'.
+
+    Each namespace (customer, rider, picker, ...) gets its own key, so the same
+    counter gives unrelated-looking IDs in different tables.
+    """
+    counters = np.asarray(counters, dtype=np.int64)
+    if counters.size and (counters.min() < 0 or counters.max() >= ID_SPACE):
+        raise ValueError(f"ID counters must be in [0, {ID_SPACE:,}) for a collision-free allocation")
+    codes = permute_index(counters, ID_SPACE, derive_key(namespace, seed))
+    return f"{prefix}-" + to_hex(codes)
@@ -0,0 +1,113 @@
+"""
+Compiled Keyword Classification
+Compiles a keyword table once into a single trie-shaped regex and classifies a
+whole text column in one overlapping scan, with the same priority rules as a
+loop over the table; the cost per text does not grow with the table size
+"""
+
+import re
+import numpy as np
+import pandas as pd
+
+
+def trie_pattern(keywords):
+    """Regex matching the longest of `keywords` that starts at a position.
+
+    Keywords are merged into a prefix tree, so the engine follows one path of
+    distinct characters instead of trying every keyword in turn.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}  # end of a keyword
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in node.items() if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if '' in node else body  # greedy: continue to a longer keyword when one matches
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Substring keyword table compiled for column-at-a-time classification.
+
+    `groups` is a list of (keywords, value) pairs, or a {keyword: value} dict
+    (one keyword per group). With priority='first' the earliest group with any
+    keyword in the text wins, like `for kws, v in groups: if any(kw in text ...)`.
+    With priority='longest' the longest keyword found wins (ties go to the
+    earlier keyword), like looping over the table sorted by keyword length.
+
+    Texts without any keyword are ruled out by one str.contains. On the rest,
+    a zero-width lookahead finds the longest keyword starting at every
+    position; the keywords found at a position are that keyword and those of
+    its prefixes that are keywords, so each longest match maps to the best
+    rank among them, and a text's winner is the best rank over its positions.
+    """
+
+    def __init__(self, groups, priority='first'):
+        if isinstance(groups, dict):
+            groups = [([keyword], value) for keyword, value in groups.items()]
+        if priority not in ('first', 'longest'):
+            raise ValueError(f"priority must be 'first' or 'longest', not {priority!r}")
+
+        self.values = [value for _, value in groups]
+        entries = [(keyword, g) for g, (keywords, _) in enumerate(groups) for keyword in keywords]
+        if priority == 'longest':
+            entries.sort(key=lambda e: -len(e[0]))
+        else:
+            entries.sort(key=lambda e: e[1])
+
+        rank = {}
+        group_of_rank = []
+        for keyword, g in entries:
+            if keyword not in rank:  # a repeated keyword keeps its best rank
+                rank[keyword] = len(group_of_rank)
+                group_of_rank.append(g)
+        self.group_of_rank = np.array(group_of_rank + [-1])
+        self.best_rank = {keyword: min(r for prefix, r in rank.items() if keyword.startswith(prefix))
+                          for keyword in rank}
+
+        self.alternation = trie_pattern(rank)
+        self.pattern = re.compile(self.alternation)
+
+    def match(self, text):
+        """Index of the winning group for every text, -1 where nothing matches."""
+        # Each distinct text is scanned once (catalog columns repeat a lot)
+        codes, distinct = pd.factorize(pd.Series(text, copy=False))
+        hits = self.contains(distinct)
+        best = np.full(len(distinct) + 1, len(self.group_of_rank) - 1, dtype=np.int64)  # last: missing text
+        best[:-1][hits] = [self._best_rank(t) for t in np.asarray(distinct, dtype=object)[hits]]
+        return self.group_of_rank[best[codes]]
+
+    def _best_rank(self, text):
+        # Restarting the search one character after each match start visits
+        # every position where a keyword starts (matches may overlap)
+        best_rank, search = self.best_rank, self.pattern.search
+        best = len(self.group_of_rank)
+        found = search(text)
+        while found:
+            best = min(best, best_rank[found.group()])
+            found = search(text, found.start() + 1)
+        return best
+
+    def contains(self, text):
+        """Boolean array: which texts contain any keyword of the table."""
+        text = pd.Series(text, copy=False)
+        return text.str.contains(self.alternation, regex=True, na=False).to_numpy(dtype=bool)
+
+    def lookup(self, text, default=None):
+        """Value of the winning group for every text (`default` where nothing matches)."""
+        values = np.empty(len(self.values) + 1, dtype=object)
+        for i, value in enumerate(self.values + [default]):
+            values[i] = value
+        return values[self.match(text)]
+
+
+def keyword_set(keywords):
+    """Matcher for a plain keyword list, used through .contains()."""
+    return KeywordMatcher([(keywords, True)])
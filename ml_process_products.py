@@ -1,112 +1,202 @@
 """
 ML-Enhanced Product CSV Processor for Simulation
 Uses embeddings, clustering, and learned patterns for realistic values
-Outputs: final.csv
+Outputs: final.csv, final.parquet, substitute_index.npz, sku_canonical.csv, sku_canonical.parquet
+Run with --incremental to reprocess only new/changed products (state: final_state.joblib)
+Run with --backend minibatch for large catalogs (--cluster-report compares it with kmeans)
+Run with --dedup merge to keep only canonical SKUs of near-duplicate listings
+Per-stage wall time, rows/sec and peak memory: run_report.json
 """
 
+import os
+import json
+import time
+import argparse
+import multiprocessing
 import pandas as pd
 import numpy as np
-import re
 import hashlib
+import joblib
+import sklearn
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
 from sklearn.preprocessing import LabelEncoder
 import warnings
 warnings.filterwarnings('ignore')
+from payload_io import save_payload
+from keyword_matcher import KeywordMatcher, keyword_set
+from quantity_parser import QuantityParser
+from artifact_cache import CACHE_DIR, cached, fingerprint
+from clustering import fit_clusters, inertia, quality_report
+from substitute_index import INDEX_FILE, build_substitute_index
+from near_duplicates import find_near_duplicates
+from stage_graph import RUN_REPORT_FILE, RunReport, Stage, run_stages
+
+OUTPUT_FORMATS = ['csv', 'parquet']
+CATEGORICAL_COLUMNS = ['category', 'sub_category', 'brand', 'type', 'storage_type', 'brand_tier',
+                       'substitute_group']
+SEED = 42
+
+# Model hyperparameters (part of the artifact cache key)
+TFIDF_PARAMS = {'max_features': 500, 'stop_words': 'english', 'ngram_range': (1, 2)}
+CLUSTER_PARAMS = {
+    'kmeans': {'n_clusters': 50, 'random_state': 42, 'n_init': 10},
+    # Streaming mini-batch backend for multi-million-SKU catalogs
+    'minibatch': {'n_clusters': 50, 'random_state': 42, 'n_init': 3, 'batch_size': 4096,
+                  'chunk_rows': 50_000, 'passes': 3},
+}
+CLUSTER_BACKEND = 'kmeans'
+N_JOBS = os.cpu_count() or 1
+FEATURE_CHUNK_ROWS = 50_000  # rows per task; draws are keyed on product index, so output does not depend on it
+CLUSTER_REPORT_FILE = 'cluster_report.json'
+DUPLICATES_STEM = 'sku_canonical'
 
-# Load the data
-print("Loading data...")
-df = pd.read_csv('products.csv')
-df.columns = df.columns.str.strip()
-
-# Drop empty columns
-df = df.drop(columns=[col for col in df.columns if 'Unnamed' in col], errors='ignore')
 
-print(f"Loaded {len(df)} products")
+def uniform(u, low, high):
+    """np.random.uniform(low, high) from uniform draws u."""
+    return low + u * (high - low)
 
-# =============================================================================
-# ML FEATURE ENGINEERING
-# =============================================================================
 
-print("\n[1/6] Building ML features...")
+def randrange(u, low, high):
+    """random.randrange(low, high) (high exclusive, unlike draws.randint) from uniform draws u."""
+    return (low + np.floor(u * (np.asarray(high) - low))).astype(int)
 
-# Create text features for ML
-df['text_features'] = (
-    df['product'].fillna('') + ' ' + 
-    df['category'].fillna('') + ' ' + 
-    df['sub_category'].fillna('') + ' ' + 
-    df['type'].fillna('') + ' ' +
-    df['brand'].fillna('')
-).str.lower()
 
-# TF-IDF vectorization for product similarity
-print("  - Building TF-IDF vectors...")
-tfidf = TfidfVectorizer(max_features=500, stop_words='english', ngram_range=(1, 2))
-tfidf_matrix = tfidf.fit_transform(df['text_features'])
+# =============================================================================
+# LOADING & ML FEATURE ENGINEERING
+# =============================================================================
 
-# Cluster products into groups for better defaults
-print("  - Clustering products into 50 groups...")
-n_clusters = 50
-kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-df['product_cluster'] = kmeans.fit_predict(tfidf_matrix)
+def load_products(path='products.csv'):
+    """Load the product catalog with the text columns the later stages use."""
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip()
+
+    # Drop empty columns
+    df = df.drop(columns=[col for col in df.columns if 'Unnamed' in col], errors='ignore')
+    return add_text_columns(df)
+
+
+def add_text_columns(df):
+    # Lower-cased text the keyword rules match against, built once per column set
+    df['text_pcst'] = (df['product'].astype(str) + ' ' + df['category'].astype(str) + ' '
+                       + df['sub_category'].astype(str) + ' ' + df['type'].astype(str)).str.lower()
+    df['text_cst'] = (df['category'].astype(str) + ' ' + df['sub_category'].astype(str) + ' '
+                      + df['type'].astype(str)).str.lower()
+    df['text_pst'] = (df['product'].astype(str) + ' ' + df['sub_category'].astype(str) + ' '
+                      + df['type'].astype(str)).str.lower()
+
+    # Create text features for ML
+    df['text_features'] = (
+        df['product'].fillna('') + ' ' + 
+        df['category'].fillna('') + ' ' + 
+        df['sub_category'].fillna('') + ' ' + 
+        df['type'].fillna('') + ' ' +
+        df['brand'].fillna('')
+    ).str.lower()
+    return df
+
+
+def fit_tfidf(df):
+    """TF-IDF vectors for the catalog, cached by content: same text + same hyperparameters -> reuse."""
+    tfidf_key = fingerprint(df['text_features'], TFIDF_PARAMS, sklearn.__version__)
+
+    def fit():
+        tfidf = TfidfVectorizer(**TFIDF_PARAMS)
+        return tfidf, tfidf.fit_transform(df['text_features'])
+
+    print("  - Building TF-IDF vectors...")
+    (tfidf, tfidf_matrix), hit = cached('tfidf', tfidf_key, fit)
+    if hit:
+        print("    (loaded from cache)")
+    return tfidf, tfidf_matrix, tfidf_key
+
+
+def cluster_products(tfidf_matrix, tfidf_key, backend=CLUSTER_BACKEND):
+    """Cluster the TF-IDF vectors with a clustering backend (cached like the vectors).
+
+    Returns (model, labels, fit seconds or None when loaded from cache).
+    """
+    params = CLUSTER_PARAMS[backend]
+    start = time.perf_counter()
+    (model, labels), hit = cached(f"clusters-{backend}", fingerprint(tfidf_key, backend, params),
+                                  lambda: fit_clusters(tfidf_matrix, backend, n_jobs=N_JOBS, **params))
+    if hit:
+        print("    (loaded from cache)")
+    return model, labels, None if hit else time.perf_counter() - start
+
+
+def fit_models(df, backend=CLUSTER_BACKEND):
+    """TF-IDF vectors and product clusters for the catalog.
+
+    Returns (tfidf, tfidf_matrix, cluster model, cluster labels).
+    """
+    tfidf, tfidf_matrix, tfidf_key = fit_tfidf(df)
+
+    # Cluster products into groups for better defaults
+    print(f"  - Clustering products into {CLUSTER_PARAMS[backend]['n_clusters']} groups ({backend})...")
+    model, labels, _ = cluster_products(tfidf_matrix, tfidf_key, backend)
+    return tfidf, tfidf_matrix, model, labels
+
+
+def write_cluster_report(df, backend, path=CLUSTER_REPORT_FILE):
+    """Compare a backend's clusters with full KMeans (inertia, ARI, NMI, fit time) as JSON."""
+    tfidf, tfidf_matrix, tfidf_key = fit_tfidf(df)
+    print(f"  - Fitting {backend} and reference kmeans for the cluster quality report...")
+    model, labels, seconds = cluster_products(tfidf_matrix, tfidf_key, backend)
+    reference, reference_labels, reference_seconds = cluster_products(tfidf_matrix, tfidf_key, 'kmeans')
+
+    report = quality_report(tfidf_matrix, model, labels, reference, reference_labels, n_jobs=N_JOBS)
+    report.update(backend=backend, fit_seconds=seconds, reference_fit_seconds=reference_seconds)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"  - Inertia ratio vs kmeans: {report['inertia_ratio']:.3f}, "
+          f"ARI: {report['adjusted_rand_index']:.3f}, NMI: {report['normalized_mutual_info']:.3f}")
+    print(f"  - Saved: {path}")
+    return report
 
 # =============================================================================
 # REALISTIC WEIGHT EXTRACTION (ML-Enhanced)
 # =============================================================================
 
-print("\n[2/6] Extracting weights with ML enhancement...")
+# Skip weight patterns that are clearly NOT product weight
+# (baby weight ranges, dog weight ranges, etc.)
+WEIGHT_SKIP_PATTERNS = [
+    r'\d+-\d+\s*kg',  # Weight ranges like "6-11 kg" for diapers
+    r'for\s+\d+\s*kg',  # "for 25 kg dogs"
+    r'\d+\s*kg\s*\+',  # Part of combo descriptions
+    r'\d+\s*kg\s*dog',  # Dog weight
+]
 
-def extract_weight_ml(row):
-    """ML-enhanced weight extraction."""
-    name = str(row['product']).lower() if pd.notna(row['product']) else ''
-    category = str(row['category']).lower() if pd.notna(row['category']) else ''
-    sub_cat = str(row['sub_category']).lower() if pd.notna(row['sub_category']) else ''
-    type_col = str(row['type']).lower() if pd.notna(row['type']) else ''
-    
-    # Skip weight patterns that are clearly NOT product weight
-    # (baby weight ranges, dog weight ranges, etc.)
-    skip_patterns = [
-        r'\d+-\d+\s*kg',  # Weight ranges like "6-11 kg" for diapers
-        r'for\s+\d+\s*kg',  # "for 25 kg dogs"
-        r'\d+\s*kg\s*\+',  # Part of combo descriptions
-        r'\d+\s*kg\s*dog',  # Dog weight
-    ]
-    
-    for pattern in skip_patterns:
-        if re.search(pattern, name):
-            name = re.sub(pattern, '', name)
-    
-    # Extract weight with priority order
-    patterns = [
-        # Exact weight patterns
-        (r'(\d+(?:\.\d+)?)\s*kg\b', lambda x: int(float(x) * 1000)),
-        (r'(\d+(?:\.\d+)?)\s*gm?\b', lambda x: int(float(x))),
-        (r'(\d+(?:\.\d+)?)\s*gram', lambda x: int(float(x))),
-        (r'(\d+(?:\.\d+)?)\s*ml\b', lambda x: int(float(x))),  # Approximate
-        (r'(\d+(?:\.\d+)?)\s*l\b(?!a|i|o|u|e)', lambda x: int(float(x) * 1000)),
-        (r'(\d+(?:\.\d+)?)\s*litre', lambda x: int(float(x) * 1000)),
-    ]
-    
-    for pattern, converter in patterns:
-        matches = re.findall(pattern, name)
-        if matches:
-            try:
-                # Take the most reasonable weight (filter out very small/large)
-                weights = [converter(m) for m in matches]
-                valid_weights = [w for w in weights if 5 <= w <= 25000]
-                if valid_weights:
-                    return max(valid_weights)  # Take largest valid weight
-            except:
-                pass
-    
-    return None
+# Weight units in priority order, with their multiplier to grams
+WEIGHT_UNITS = [
+    # Exact weight units
+    (r'kg\b', 1000),
+    (r'gm?\b', 1),
+    (r'gram', 1),
+    (r'ml\b', 1),  # Approximate
+    (r'l\b(?!a|i|o|u|e)', 1000),
+    (r'litre', 1000),
+]
+
+# Noise removed from display names
+NAME_NOISE_PATTERNS = [
+    r'\s*-\s*\d+\s*(?:mg|g|gm|gram|kg|ml|l|litre|liter|pc|pcs|pack)s?\b',
+    r'\s*\d+\s*(?:mg|g|gm|gram|kg|ml|l|litre|liter|pc|pcs|pack)s?\s*$',
+    r'\s*\d+-\d+\s*(?:kg|g)\s*',  # Weight ranges
+    r'\s*(?:vegetarian\s+)?capsule\s*',
+    r'\s*\(pack of \d+\)\s*',
+    r'\s*\(\s*\)',
+]
+
+NAME_PARSER = QuantityParser(WEIGHT_UNITS, WEIGHT_SKIP_PATTERNS, NAME_NOISE_PATTERNS)
 
-# Apply extraction
-df['extracted_weight'] = df.apply(extract_weight_ml, axis=1)
+def parse_product_names(names):
+    """Extracted weight (grams, NaN if none) and clean display name of every product, in one pass."""
+    return NAME_PARSER.parse(names)
 
-# Build category-specific weight distributions from extracted data
-print("  - Learning weight distributions from data...")
-weight_by_cluster = df.groupby('product_cluster')['extracted_weight'].agg(['median', 'mean', 'std']).fillna(0)
+def learn_weight_by_cluster(df):
+    """Build cluster-specific weight distributions from extracted data."""
+    return df.groupby('product_cluster')['extracted_weight'].agg(['median', 'mean', 'std']).fillna(0)
 
 # Realistic category defaults (research-based)
 CATEGORY_WEIGHTS = {
@@ -174,42 +264,35 @@ CATEGORY_WEIGHTS = {
     'dog': (500, 300),
     'cat': (400, 200),
 }
+CATEGORY_WEIGHT_MATCHER = KeywordMatcher(CATEGORY_WEIGHTS)  # first key wins
 
-def get_realistic_weight(row):
+def get_realistic_weight(df, weight_by_cluster, rng):
     """Get realistic weight using ML cluster + category fallback."""
-    # First try extracted weight
-    if pd.notna(row['extracted_weight']) and 10 <= row['extracted_weight'] <= 20000:
-        return int(row['extracted_weight'])
-    
-    # Try cluster median
-    cluster = row['product_cluster']
-    cluster_median = weight_by_cluster.loc[cluster, 'median']
-    if cluster_median > 0:
-        # Add some variance
-        std = weight_by_cluster.loc[cluster, 'std']
-        if std > 0:
-            weight = np.random.normal(cluster_median, std * 0.3)
-            return int(np.clip(weight, 20, 15000))
-    
-    # Category-based fallback
-    text = f"{row['category']} {row['sub_category']} {row['type']}".lower()
-    
-    for key, (mean, std) in CATEGORY_WEIGHTS.items():
-        if key in text:
-            weight = np.random.normal(mean, std * 0.5)
-            return int(np.clip(weight, 20, 15000))
-    
-    # Default
-    return int(np.random.normal(300, 100))
-
-df['weight_g'] = df.apply(get_realistic_weight, axis=1)
+    extracted = df['extracted_weight'].to_numpy()
+    noise = rng.standard_normal(len(df))
+
+    # Cluster median with some variance, where the cluster has a spread
+    cluster_median = df['product_cluster'].map(weight_by_cluster['median']).to_numpy()
+    cluster_std = df['product_cluster'].map(weight_by_cluster['std']).to_numpy()
+    use_cluster = (cluster_median > 0) & (cluster_std > 0)
+
+    # Category-based fallback (first matching key)
+    category_key = CATEGORY_WEIGHT_MATCHER.match(df['text_cst'])
+    category_mean = np.array([m for m, _ in CATEGORY_WEIGHT_MATCHER.values] + [0])[category_key]
+    category_std = np.array([s for _, s in CATEGORY_WEIGHT_MATCHER.values] + [0])[category_key]
+
+    weight = np.select(
+        [(extracted >= 10) & (extracted <= 20000), use_cluster, category_key >= 0],
+        [extracted,
+         np.clip(cluster_median + cluster_std * 0.3 * noise, 20, 15000),
+         np.clip(category_mean + category_std * 0.5 * noise, 20, 15000)],
+        default=300 + 100 * noise)  # Default
+    return weight.astype(int)
 
 # =============================================================================
 # STORAGE TYPE (ML-Enhanced Classification)
 # =============================================================================
 
-print("\n[3/6] Classifying storage types...")
-
 # Training data for storage classification
 FROZEN_KEYWORDS = ['frozen', 'ice cream', 'ice-cream', 'kulfi', 'popsicle', 'gelato', 'sorbet']
 CHILLED_KEYWORDS = ['milk', 'curd', 'yogurt', 'yoghurt', 'cheese', 'paneer', 'butter', 'cream cheese',
@@ -218,45 +301,39 @@ CHILLED_KEYWORDS = ['milk', 'curd', 'yogurt', 'yoghurt', 'cheese', 'paneer', 'bu
                     'salmon', 'tuna', 'crab', 'lobster', 'meat', 'sausage', 'bacon', 'ham', 'salami',
                     'fresh vegetable', 'fresh fruit', 'cut fruit', 'cut vegetable', 'salad',
                     'juice fresh', 'smoothie', 'marinades']
-
-def classify_storage(row):
+LONG_LIFE_KEYWORDS = ['powder', 'masala', 'mix', 'instant', 'uht', 'tetra', 'long life']
+FROZEN_MATCHER = keyword_set(FROZEN_KEYWORDS)
+CHILLED_MATCHER = keyword_set(CHILLED_KEYWORDS)
+LONG_LIFE_MATCHER = keyword_set(LONG_LIFE_KEYWORDS)
+DAIRY_MATCHER = keyword_set(['dairy'])
+MASALA_MATCHER = keyword_set(['masala'])
+GHEE_MATCHER = keyword_set(['ghee'])
+FRESH_SUB_CATEGORIES = ['Fresh Vegetables', 'Fresh Fruits', 'Cuts & Sprouts',
+                        'Exotic Fruits & Veggies', 'Organic Fruits & Vegetables']
+
+def classify_storage(df):
     """ML-enhanced storage classification."""
-    text = f"{row['product']} {row['category']} {row['sub_category']} {row['type']}".lower()
-    
-    # Explicit frozen
-    if any(kw in text for kw in FROZEN_KEYWORDS):
-        return 'FROZEN'
-    
-    # Explicit chilled
-    if any(kw in text for kw in CHILLED_KEYWORDS):
-        # But not if it's a powder or long-life version
-        if any(x in text for x in ['powder', 'masala', 'mix', 'instant', 'uht', 'tetra', 'long life']):
-            return 'AMBIENT'
-        return 'CHILLED'
-    
-    # Category-based
-    if 'dairy' in text and 'masala' not in text:
-        if 'ghee' in text or 'butter' in text.split():
-            return 'AMBIENT'  # Ghee is shelf-stable
-        return 'CHILLED'
-    
-    if row['sub_category'] in ['Fresh Vegetables', 'Fresh Fruits', 'Cuts & Sprouts', 
-                                'Exotic Fruits & Veggies', 'Organic Fruits & Vegetables']:
-        return 'CHILLED'
-    
-    if row['category'] == 'Eggs, Meat & Fish':
-        return 'CHILLED'
-    
-    return 'AMBIENT'
-
-df['storage_type'] = df.apply(classify_storage, axis=1)
+    text = df['text_pcst']
+    chilled = CHILLED_MATCHER.contains(text)
+    dairy = DAIRY_MATCHER.contains(text) & ~MASALA_MATCHER.contains(text)
+    return np.select(
+        [
+            FROZEN_MATCHER.contains(text),  # Explicit frozen
+            chilled & LONG_LIFE_MATCHER.contains(text),  # Powder or long-life version
+            chilled,  # Explicit chilled
+            # Category-based (ghee is shelf-stable)
+            dairy & (GHEE_MATCHER.contains(text) | text.str.contains(r'(?:^|\s)butter(?:\s|$)').to_numpy()),
+            dairy,
+            df['sub_category'].isin(FRESH_SUB_CATEGORIES),
+            df['category'] == 'Eggs, Meat & Fish',
+        ],
+        ['FROZEN', 'AMBIENT', 'CHILLED', 'AMBIENT', 'CHILLED', 'CHILLED', 'CHILLED'],
+        default='AMBIENT')
 
 # =============================================================================
 # SHELF LIFE (Realistic Model)
 # =============================================================================
 
-print("\n[4/6] Calculating shelf life...")
-
 SHELF_LIFE_HOURS = {
     # Ultra-fresh (1-3 days)
     'fresh milk': 72,
@@ -325,181 +402,158 @@ SHELF_LIFE_HOURS = {
     'detergent': 17520,
     'cleaner': 17520,
 }
+SHELF_LIFE_MATCHER = KeywordMatcher(SHELF_LIFE_HOURS, priority='longest')
+
+# Storage-based defaults (hours)
+STORAGE_SHELF_LIFE = {
+    'FROZEN': (1800, 2520),  # 75-105 days
+    'CHILLED': (72, 168),  # 3-7 days
+    'AMBIENT': (2160, 4320),  # 90-180 days
+}
 
-def get_shelf_life(row):
+def get_shelf_life(df, rng):
     """Get realistic shelf life based on product characteristics."""
-    text = f"{row['product']} {row['category']} {row['sub_category']} {row['type']}".lower()
-    storage = row['storage_type']
-    
-    # Check specific patterns first
-    for key, hours in sorted(SHELF_LIFE_HOURS.items(), key=lambda x: -len(x[0])):
-        if key in text:
-            # Add some variance (±20%)
-            variance = np.random.uniform(0.8, 1.2)
-            return int(hours * variance)
-    
-    # Storage-based defaults
-    if storage == 'FROZEN':
-        return int(np.random.uniform(1800, 2520))  # 75-105 days
-    elif storage == 'CHILLED':
-        return int(np.random.uniform(72, 168))  # 3-7 days
-    else:
-        return int(np.random.uniform(2160, 4320))  # 90-180 days
+    u = rng.random(len(df))
+
+    # Check specific patterns first (longest key wins), with some variance (±20%)
+    key = SHELF_LIFE_MATCHER.match(df['text_pcst'])
+    hours = np.array(SHELF_LIFE_MATCHER.values + [0])[key]
 
-df['shelf_life_hours'] = df.apply(get_shelf_life, axis=1)
+    storage = df['storage_type'].to_numpy()
+    low = np.select([storage == s for s in STORAGE_SHELF_LIFE], [lo for lo, _ in STORAGE_SHELF_LIFE.values()])
+    high = np.select([storage == s for s in STORAGE_SHELF_LIFE], [hi for _, hi in STORAGE_SHELF_LIFE.values()])
 
-# Freshness decay is inverse of shelf life
-df['freshness_decay'] = np.clip(1 - (df['shelf_life_hours'] / 8760), 0.05, 0.95).round(2)
+    return np.where(key >= 0, hours * uniform(u, 0.8, 1.2), uniform(u, low, high)).astype(int)
+
+def get_freshness_decay(df):
+    """Freshness decay is inverse of shelf life."""
+    return np.clip(1 - (df['shelf_life_hours'] / 8760), 0.05, 0.95).round(2)
 
 # =============================================================================
 # PHYSICS PROPERTIES
 # =============================================================================
 
-print("\n[5/6] Computing physics properties...")
+# Density multipliers (volume per gram), first matching list wins
+DENSITY_MULTIPLIERS = [
+    (['chips', 'popcorn', 'puff', 'kurkure', 'cheetos'], (7, 10)),  # Very airy
+    (['cereal', 'flakes', 'granola', 'muesli', 'oats'], (4, 6)),  # Airy
+    (['bread', 'bun', 'pav', 'cake', 'muffin'], (2.5, 4)),  # Light
+    (['biscuit', 'cookie', 'wafer', 'rusk'], (2, 3)),  # Medium-light
+    (['oil', 'ghee', 'milk', 'juice', 'water', 'liquid'], (1.0, 1.2)),  # Dense liquid
+    (['rice', 'dal', 'atta', 'flour', 'sugar', 'salt'], (1.3, 1.6)),  # Dense powder/grain
+    (['meat', 'chicken', 'fish', 'mutton'], (1.1, 1.4)),  # Dense solid
+]
+DEFAULT_DENSITY = (1.5, 2.5)
+DENSITY_MATCHER = KeywordMatcher(DENSITY_MULTIPLIERS)
 
 # Volume estimation using product-specific density
-def estimate_volume(row):
+def estimate_volume(df, rng):
     """Estimate volume based on product density characteristics."""
-    text = f"{row['product']} {row['category']} {row['sub_category']} {row['type']}".lower()
-    weight = row['weight_g']
-    
-    # Density multipliers (volume per gram)
-    if any(x in text for x in ['chips', 'popcorn', 'puff', 'kurkure', 'cheetos']):
-        multiplier = np.random.uniform(7, 10)  # Very airy
-    elif any(x in text for x in ['cereal', 'flakes', 'granola', 'muesli', 'oats']):
-        multiplier = np.random.uniform(4, 6)  # Airy
-    elif any(x in text for x in ['bread', 'bun', 'pav', 'cake', 'muffin']):
-        multiplier = np.random.uniform(2.5, 4)  # Light
-    elif any(x in text for x in ['biscuit', 'cookie', 'wafer', 'rusk']):
-        multiplier = np.random.uniform(2, 3)  # Medium-light
-    elif any(x in text for x in ['oil', 'ghee', 'milk', 'juice', 'water', 'liquid']):
-        multiplier = np.random.uniform(1.0, 1.2)  # Dense liquid
-    elif any(x in text for x in ['rice', 'dal', 'atta', 'flour', 'sugar', 'salt']):
-        multiplier = np.random.uniform(1.3, 1.6)  # Dense powder/grain
-    elif any(x in text for x in ['meat', 'chicken', 'fish', 'mutton']):
-        multiplier = np.random.uniform(1.1, 1.4)  # Dense solid
-    else:
-        multiplier = np.random.uniform(1.5, 2.5)  # Default
-    
-    return int(weight * multiplier)
-
-df['volume_cm3'] = df.apply(estimate_volume, axis=1)
+    group = DENSITY_MATCHER.match(df['text_pcst'])
+    ranges = np.array(DENSITY_MATCHER.values + [DEFAULT_DENSITY])[group]
+    multiplier = uniform(rng.random(len(df)), ranges[:, 0], ranges[:, 1])
+    return (df['weight_g'].to_numpy() * multiplier).astype(int)
 
 # Fragility score
-def get_fragility(row):
-    """Calculate fragility score with ML-like inference."""
-    text = f"{row['product']} {row['category']} {row['sub_category']} {row['type']}".lower()
-    
-    fragility_scores = [
-        (['egg', 'glass', 'ceramic', 'crystal', 'crockery', 'porcelain'], 0.95),
-        (['chips', 'wafer', 'crisp', 'papad', 'pappadam', 'kurkure'], 0.85),
-        (['bread', 'cake', 'pastry', 'croissant', 'donut', 'muffin'], 0.75),
-        (['banana', 'tomato', 'grape', 'strawberry', 'berry', 'peach'], 0.70),
-        (['biscuit', 'cookie', 'rusk'], 0.55),
-        (['fruit', 'vegetable'], 0.50),
-        (['bottle', 'jar'], 0.40),
-        (['pouch', 'packet', 'pack', 'sachet'], 0.20),
-        (['can', 'tin', 'canned', 'tinned'], 0.10),
-        (['rice', 'atta', 'dal', 'oil', 'ghee', 'detergent'], 0.10),
-    ]
-    
-    for keywords, score in fragility_scores:
-        if any(kw in text for kw in keywords):
-            return round(score + np.random.uniform(-0.05, 0.05), 2)
-    
-    return round(np.random.uniform(0.25, 0.40), 2)
+FRAGILITY_SCORES = [
+    (['egg', 'glass', 'ceramic', 'crystal', 'crockery', 'porcelain'], 0.95),
+    (['chips', 'wafer', 'crisp', 'papad', 'pappadam', 'kurkure'], 0.85),
+    (['bread', 'cake', 'pastry', 'croissant', 'donut', 'muffin'], 0.75),
+    (['banana', 'tomato', 'grape', 'strawberry', 'berry', 'peach'], 0.70),
+    (['biscuit', 'cookie', 'rusk'], 0.55),
+    (['fruit', 'vegetable'], 0.50),
+    (['bottle', 'jar'], 0.40),
+    (['pouch', 'packet', 'pack', 'sachet'], 0.20),
+    (['can', 'tin', 'canned', 'tinned'], 0.10),
+    (['rice', 'atta', 'dal', 'oil', 'ghee', 'detergent'], 0.10),
+]
+FRAGILITY_MATCHER = KeywordMatcher(FRAGILITY_SCORES)
 
-df['fragility_score'] = df.apply(get_fragility, axis=1)
+def get_fragility(df, rng):
+    """Calculate fragility score with ML-like inference."""
+    u = rng.random(len(df))
+    group = FRAGILITY_MATCHER.match(df['text_pcst'])
+    score = np.array(FRAGILITY_MATCHER.values + [0])[group]
+    return np.where(group >= 0, score + uniform(u, -0.05, 0.05), uniform(u, 0.25, 0.40)).round(2)
 
 # Spill risk
-def get_spill_risk(row):
+LIQUID_KEYWORDS = ['oil', 'liquid', 'juice', 'milk', 'water', 'syrup', 'sauce',
+                   'ketchup', 'shampoo', 'lotion', 'gel', 'wash', 'drink',
+                   'beverage', 'ghee', 'honey', 'pickle', 'squash', 'soup',
+                   'cream', 'yogurt', 'lassi', 'buttermilk']
+# Solid/safe packaging
+SAFE_PACKAGING = ['powder', 'bar', 'tablet', 'capsule', 'can', 'tin', 'tetra']
+LIQUID_MATCHER = keyword_set(LIQUID_KEYWORDS)
+SAFE_PACKAGING_MATCHER = keyword_set(SAFE_PACKAGING)
+
+def get_spill_risk(df):
     """Determine spill risk."""
-    text = f"{row['product']} {row['sub_category']} {row['type']}".lower()
-    
-    liquid_keywords = ['oil', 'liquid', 'juice', 'milk', 'water', 'syrup', 'sauce', 
-                       'ketchup', 'shampoo', 'lotion', 'gel', 'wash', 'drink', 
-                       'beverage', 'ghee', 'honey', 'pickle', 'squash', 'soup',
-                       'cream', 'yogurt', 'lassi', 'buttermilk']
-    
-    # Check if in solid/safe packaging
-    safe_packaging = ['powder', 'bar', 'tablet', 'capsule', 'can', 'tin', 'tetra']
-    
-    if any(kw in text for kw in liquid_keywords):
-        if any(pkg in text for pkg in safe_packaging):
-            return False
-        return True
-    return False
-
-df['spill_risk'] = df.apply(get_spill_risk, axis=1)
+    text = df['text_pst']
+    return LIQUID_MATCHER.contains(text) & ~SAFE_PACKAGING_MATCHER.contains(text)
 
 # Prep time
-def get_prep_time(row):
+FRESH_PRODUCE_MATCHER = keyword_set(['fresh vegetable', 'fresh fruit'])
+CUTS_MATCHER = keyword_set(['cuts & sprouts'])
+MEAT_MATCHER = keyword_set(['meat', 'fish', 'chicken'])
+
+def get_prep_time(df, rng):
     """Estimate picker prep time in seconds."""
-    text = f"{row['category']} {row['sub_category']} {row['type']}".lower()
-    storage = row['storage_type']
-    weight = row['weight_g']
-    
+    text = df['text_cst']
+    storage = df['storage_type'].to_numpy()
     base_time = 8  # Base scan and pick time
-    
-    # Add time for special handling
-    if 'fresh vegetable' in text or 'fresh fruit' in text:
-        base_time += np.random.randint(30, 45)  # Weighing, selection
-    elif 'cuts & sprouts' in text:
-        base_time += np.random.randint(20, 30)
-    elif storage == 'FROZEN':
-        base_time += np.random.randint(10, 20)  # Freezer access
-    elif storage == 'CHILLED':
-        base_time += np.random.randint(5, 12)  # Chiller access
-    elif 'meat' in text or 'fish' in text or 'chicken' in text:
-        base_time += np.random.randint(25, 40)
-    elif weight > 5000:
-        base_time += np.random.randint(8, 15)  # Heavy item
-    
+
+    # Add time for special handling: (low, high) of randrange, first condition wins
+    handling = [
+        (FRESH_PRODUCE_MATCHER.contains(text), (30, 45)),  # Weighing, selection
+        (CUTS_MATCHER.contains(text), (20, 30)),
+        (storage == 'FROZEN', (10, 20)),  # Freezer access
+        (storage == 'CHILLED', (5, 12)),  # Chiller access
+        (MEAT_MATCHER.contains(text), (25, 40)),
+        (df['weight_g'].to_numpy() > 5000, (8, 15)),  # Heavy item
+    ]
+    low = np.select([c for c, _ in handling], [r[0] for _, r in handling])
+    high = np.select([c for c, _ in handling], [r[1] for _, r in handling])
+    handling_time = randrange(rng.random(len(df)), low, high)
+
     # Fragile items need more care
-    if row['fragility_score'] > 0.7:
-        base_time += np.random.randint(5, 10)
-    
-    return int(base_time)
+    care_time = np.where(df['fragility_score'].to_numpy() > 0.7, randrange(rng.random(len(df)), 5, 10), 0)
 
-df['prep_time_sec'] = df.apply(get_prep_time, axis=1)
+    return base_time + handling_time + care_time
 
 # =============================================================================
 # PSYCHOLOGY LAYER (ML-Enhanced)
 # =============================================================================
 
-print("\n[6/6] Computing psychology layer...")
-
 # Brand tier using price percentile within category
-df['price_percentile'] = df.groupby('category')['sale_price'].transform(
-    lambda x: x.rank(pct=True)
-)
+def add_price_percentile(df):
+    df['price_percentile'] = df.groupby('category')['sale_price'].transform(
+        lambda x: x.rank(pct=True)
+    )
+    return df
 
 BUDGET_BRANDS = ['bb royal', 'bb home', 'bb popular', 'fresho', 'super saver', 'value', 
                   'everyday', 'home brand', 'best price']
 PREMIUM_BRANDS = ['organic', 'premium', 'gold', 'signature', 'artisan', 'gourmet',
                    'imported', 'special', 'luxury', 'pro', 'professional']
+BUDGET_BRAND_MATCHER = keyword_set(BUDGET_BRANDS)
+PREMIUM_BRAND_MATCHER = keyword_set(PREMIUM_BRANDS)
 
-def get_brand_tier(row):
+def get_brand_tier(df):
     """Classify brand tier using multiple signals."""
-    brand = str(row['brand']).lower() if pd.notna(row['brand']) else ''
-    product = str(row['product']).lower()
-    price_pct = row['price_percentile']
-    
-    # Explicit brand indicators
-    if any(b in brand for b in BUDGET_BRANDS):
-        return 'BUDGET'
-    if any(p in brand or p in product for p in PREMIUM_BRANDS):
-        return 'PREMIUM'
-    
-    # Price-based
-    if price_pct >= 0.75:
-        return 'PREMIUM'
-    elif price_pct <= 0.25:
-        return 'BUDGET'
-    else:
-        return 'MASS'
-
-df['brand_tier'] = df.apply(get_brand_tier, axis=1)
+    brand = df['brand'].fillna('').astype(str).str.lower()
+    product = df['product'].astype(str).str.lower()
+    price_pct = df['price_percentile'].to_numpy()
+    return np.select(
+        [
+            # Explicit brand indicators
+            BUDGET_BRAND_MATCHER.contains(brand),
+            PREMIUM_BRAND_MATCHER.contains(brand) | PREMIUM_BRAND_MATCHER.contains(product),
+            # Price-based
+            price_pct >= 0.75,
+            price_pct <= 0.25,
+        ],
+        ['BUDGET', 'PREMIUM', 'PREMIUM', 'BUDGET'],
+        default='MASS')
 
 # Impulse score using category + product characteristics
 IMPULSE_CATEGORIES = {
@@ -533,29 +587,22 @@ IMPULSE_CATEGORIES = {
     'salt': 0.05,
     'sugar': 0.10,
 }
+IMPULSE_MATCHER = KeywordMatcher(IMPULSE_CATEGORIES, priority='longest')
 
-def get_impulse_score(row):
+def get_impulse_score(df, rng):
     """Calculate impulse purchase likelihood."""
-    text = f"{row['category']} {row['sub_category']} {row['type']}".lower()
-    
-    for key, score in sorted(IMPULSE_CATEGORIES.items(), key=lambda x: -len(x[0])):
-        if key in text:
-            return round(score + np.random.uniform(-0.05, 0.05), 2)
-    
-    return round(np.random.uniform(0.35, 0.50), 2)
-
-df['impulse_score'] = df.apply(get_impulse_score, axis=1)
-df['impulse_score'] = df['impulse_score'].clip(0, 1)
+    u = rng.random(len(df))
+    key = IMPULSE_MATCHER.match(df['text_cst'])
+    score = np.array(IMPULSE_MATCHER.values + [0])[key]
+    return np.clip(np.where(key >= 0, score + uniform(u, -0.05, 0.05), uniform(u, 0.35, 0.50)).round(2), 0, 1)
 
 # Substitute group - using product clusters + type
-def get_substitute_group(row):
+def get_substitute_group(df):
     """Generate substitute group ID based on ML clustering."""
     # Combine cluster with type for granular grouping
-    cluster = row['product_cluster']
-    type_hash = hashlib.md5(str(row['type']).encode()).hexdigest()[:4]
-    return f"GRP-{cluster:02d}-{type_hash.upper()}"
-
-df['substitute_group'] = df.apply(get_substitute_group, axis=1)
+    types = df['type'].astype(str)
+    type_hash = types.map({t: hashlib.md5(t.encode()).hexdigest()[:4].upper() for t in types.unique()})
+    return 'GRP-' + df['product_cluster'].astype(str).str.zfill(2) + '-' + type_hash
 
 # Time-based demand patterns
 MORNING_HIGH = ['milk', 'bread', 'egg', 'cereal', 'breakfast', 'tea', 'coffee',
@@ -563,42 +610,31 @@ MORNING_HIGH = ['milk', 'bread', 'egg', 'cereal', 'breakfast', 'tea', 'coffee',
 EVENING_HIGH = ['snack', 'chips', 'chocolate', 'ice cream', 'soft drink', 'beer',
                 'wine', 'namkeen', 'frozen', 'ready to eat', 'instant', 'pizza',
                 'burger', 'fries', 'popcorn', 'dessert', 'cake']
+MORNING_MATCHER = keyword_set(MORNING_HIGH)
+EVENING_MATCHER = keyword_set(EVENING_HIGH)
 
-def get_demand_patterns(row):
+def get_demand_patterns(df, rng):
     """Calculate morning and evening demand factors."""
-    text = f"{row['product']} {row['sub_category']} {row['type']}".lower()
-    
-    morning = 0.40
-    evening = 0.50
-    
-    if any(kw in text for kw in MORNING_HIGH):
-        morning = round(np.random.uniform(0.75, 0.95), 2)
-    if any(kw in text for kw in EVENING_HIGH):
-        evening = round(np.random.uniform(0.80, 0.95), 2)
-    
+    text = df['text_pst']
+    u = rng.random((4, len(df)))
+
+    morning = np.where(MORNING_MATCHER.contains(text), uniform(u[0], 0.75, 0.95).round(2), 0.40)
+    evening = np.where(EVENING_MATCHER.contains(text), uniform(u[1], 0.80, 0.95).round(2), 0.50)
+
     # Inverse relationship
-    if morning > 0.7:
-        evening = min(evening, 0.40)
-    if evening > 0.7:
-        morning = min(morning, 0.35)
-    
+    evening = np.where(morning > 0.7, np.minimum(evening, 0.40), evening)
+    morning = np.where(evening > 0.7, np.minimum(morning, 0.35), morning)
+
     # Add small variance
-    morning = round(morning + np.random.uniform(-0.05, 0.05), 2)
-    evening = round(evening + np.random.uniform(-0.05, 0.05), 2)
-    
-    return pd.Series({'morning_demand': np.clip(morning, 0.1, 0.95), 
-                      'evening_demand': np.clip(evening, 0.1, 0.95)})
+    morning = (morning + uniform(u[2], -0.05, 0.05)).round(2)
+    evening = (evening + uniform(u[3], -0.05, 0.05)).round(2)
 
-demand_df = df.apply(get_demand_patterns, axis=1)
-df['morning_demand'] = demand_df['morning_demand']
-df['evening_demand'] = demand_df['evening_demand']
+    return np.clip(morning, 0.1, 0.95), np.clip(evening, 0.1, 0.95)
 
 # =============================================================================
 # CLEANUP COLUMNS
 # =============================================================================
 
-print("\n[7/7] Generating clean IDs and names...")
-
 # SKU ID generation
 CAT_CODES = {
     'beauty & hygiene': 'BEA',
@@ -614,48 +650,22 @@ CAT_CODES = {
     'baby care': 'BAB',
 }
 
-def generate_sku(row):
+def generate_sku(df):
     """Generate clean SKU ID."""
-    cat = str(row['category']).lower().strip()
-    cat_code = CAT_CODES.get(cat, 'OTH')
-    
-    sub = str(row['sub_category']).strip()[:3].upper()
-    sub = ''.join(c for c in sub if c.isalpha()) or 'GEN'
-    
-    return f"{cat_code}-{sub}-{row['index']:05d}"
+    cat_code = df['category'].astype(str).str.lower().str.strip().map(CAT_CODES).fillna('OTH')
 
-df['sku_id'] = df.apply(generate_sku, axis=1)
+    sub = df['sub_category'].astype(str).str.strip().str[:3].str.upper()
+    sub = sub.str.replace(r'[\W\d_]', '', regex=True).replace('', 'GEN')
 
-# Clean product name
-def clean_name(name):
-    """Remove noise from product name."""
-    if pd.isna(name):
-        return ''
-    name = str(name)
-    
-    # Remove common noise patterns
-    patterns = [
-        r'\s*-\s*\d+\s*(?:mg|g|gm|gram|kg|ml|l|litre|liter|pc|pcs|pack)s?\b',
-        r'\s*\d+\s*(?:mg|g|gm|gram|kg|ml|l|litre|liter|pc|pcs|pack)s?\s*$',
-        r'\s*\d+-\d+\s*(?:kg|g)\s*',  # Weight ranges
-        r'\s*(?:vegetarian\s+)?capsule\s*',
-        r'\s*\(pack of \d+\)\s*',
-        r'\s*\(\s*\)',
-    ]
-    
-    for pattern in patterns:
-        name = re.sub(pattern, '', name, flags=re.IGNORECASE)
-    
-    return ' '.join(name.split()).strip()
+    return cat_code + '-' + sub + '-' + df['index'].astype(str).str.zfill(5)
 
-df['product_name_clean'] = df['product'].apply(clean_name)
 
 # =============================================================================
-# FINAL OUTPUT
+# PIPELINE
 # =============================================================================
 
 # Select and order columns
-output_cols = [
+OUTPUT_COLS = [
     'index', 'sku_id', 'product', 'product_name_clean',
     'category', 'sub_category', 'brand', 'type',
     'sale_price', 'market_price', 'rating',
@@ -667,57 +677,310 @@ output_cols = [
     'brand_tier', 'impulse_score', 'substitute_group', 'morning_demand', 'evening_demand'
 ]
 
-df_final = df[output_cols].copy()
-
-# Save
-df_final.to_csv('final.csv', index=False)
-
-print("\n" + "="*70)
-print("✓ SAVED TO final.csv")
-print("="*70)
-print(f"Total products: {len(df_final):,}")
-print(f"Total columns: {len(df_final.columns)}")
-
-print("\n" + "="*70)
-print("VALIDATION SUMMARY")
-print("="*70)
-
-# Storage validation
-print("\nStorage Distribution:")
-print(df_final['storage_type'].value_counts().to_string())
-
-# Weight validation
-print("\nWeight Stats by Category:")
-weight_stats = df_final.groupby('category')['weight_g'].agg(['mean', 'min', 'max']).round(0)
-print(weight_stats.to_string())
-
-# Shelf life validation
-print("\nShelf Life by Storage:")
-shelf_stats = df_final.groupby('storage_type')['shelf_life_hours'].agg(['mean', 'min', 'max']).round(0)
-print(shelf_stats.to_string())
-
-# Brand tier
-print("\nBrand Tier Distribution:")
-print(df_final['brand_tier'].value_counts().to_string())
-
-print("\n" + "="*70)
-print("SPOT CHECKS")
-print("="*70)
-
-# Check specific products
-checks = [
-    ("Milk", df_final[df_final['product'].str.contains('Milk', case=False, na=False) & 
-                       ~df_final['product'].str.contains('Powder|Bikis|Coconut', case=False, na=False)]),
-    ("Eggs", df_final[df_final['sub_category'] == 'Eggs']),
-    ("Ice Cream", df_final[df_final['type'].str.contains('Ice Cream', case=False, na=False)]),
-    ("Chips", df_final[df_final['type'].str.contains('Chips|Nachos', case=False, na=False)]),
-    ("Rice", df_final[df_final['sub_category'].str.contains('Rice', case=False, na=False)]),
+
+# Per-product stages with the columns they read and write; independent stages
+# share a level and may run side by side (see stage_graph.plan)
+FEATURE_STAGES = [
+    # Weights
+    Stage('weight', get_realistic_weight, ['extracted_weight', 'product_cluster', 'text_cst'], ['weight_g'],
+          context=['weight_by_cluster'], random=True),
+    # Storage & shelf life
+    Stage('storage', classify_storage, ['text_pcst', 'sub_category', 'category'], ['storage_type']),
+    Stage('shelf_life', get_shelf_life, ['text_pcst', 'storage_type'], ['shelf_life_hours'], random=True),
+    Stage('freshness', get_freshness_decay, ['shelf_life_hours'], ['freshness_decay']),
+    # Physics
+    Stage('volume', estimate_volume, ['text_pcst', 'weight_g'], ['volume_cm3'], random=True),
+    Stage('fragility', get_fragility, ['text_pcst'], ['fragility_score'], random=True),
+    Stage('spill', get_spill_risk, ['text_pst'], ['spill_risk']),
+    Stage('prep_time', get_prep_time, ['text_cst', 'storage_type', 'weight_g', 'fragility_score'],
+          ['prep_time_sec'], random=True),
+    # Psychology
+    Stage('brand_tier', get_brand_tier, ['brand', 'product', 'price_percentile'], ['brand_tier']),
+    Stage('impulse', get_impulse_score, ['text_cst'], ['impulse_score'], random=True),
+    Stage('substitute_group', get_substitute_group, ['type', 'product_cluster'], ['substitute_group']),
+    Stage('demand', get_demand_patterns, ['text_pst'], ['morning_demand', 'evening_demand'], random=True),
+    # Clean IDs and names
+    Stage('sku', generate_sku, ['category', 'sub_category', 'index'], ['sku_id']),
 ]
 
-for name, subset in checks:
-    if len(subset) > 0:
-        print(f"\n{name} ({len(subset)} items):")
-        print(f"  Storage: {dict(subset['storage_type'].value_counts())}")
-        print(f"  Shelf Life: {subset['shelf_life_hours'].mean():.0f}h avg")
-        print(f"  Morning/Evening Demand: {subset['morning_demand'].mean():.2f} / {subset['evening_demand'].mean():.2f}")
-        print(f"  Weight: {subset['weight_g'].mean():.0f}g avg")
+
+def compute_features(df, weight_by_cluster, seed_sequence, workers=1, cache_dir=None):
+    """Run FEATURE_STAGES on rows with product_cluster, extracted_weight and price_percentile.
+
+    Random draws are keyed on each product's `index`, so a product gets the
+    same values whatever other products are processed with it. Returns (df,
+    stage records). With a cache_dir, stages whose inputs and code are
+    unchanged since an earlier run are loaded from there instead of recomputed.
+    """
+    return run_stages(df, FEATURE_STAGES, {'weight_by_cluster': weight_by_cluster}, seed_sequence, workers,
+                      cache_dir, row_ids=df['index'].to_numpy())
+
+
+def _feature_chunk(df, weight_by_cluster, seed_sequence, cache_dir=None, workers=1):
+    return compute_features(df.copy(), weight_by_cluster, seed_sequence, workers, cache_dir)
+
+
+def compute_features_chunked(df, weight_by_cluster, seed=SEED, num_workers=1, chunk_rows=FEATURE_CHUNK_ROWS,
+                             cache_dir=None):
+    """Run compute_features over fixed-size row chunks, serially or on a process pool.
+
+    Every chunk draws from SeedSequence(seed) keyed on product index and the
+    chunks are concatenated in order, so the output depends on the seed only,
+    never on the chunk size or the number of workers. A single chunk runs its
+    independent stages on threads instead. Returns (df, stage records of every chunk).
+    """
+    print("\n[3/6]-[7/7] Storage, shelf life, physics, psychology and IDs...")
+    bounds = [(start, min(start + chunk_rows, len(df))) for start in range(0, len(df), chunk_rows)]
+    seed_sequence = np.random.SeedSequence(seed)
+    tasks = [(df.iloc[start:end], weight_by_cluster, seed_sequence, cache_dir) for start, end in bounds]
+    print(f"  - {len(df):,} products in {len(tasks)} chunk(s) on {num_workers} worker(s)")
+
+    if num_workers > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(min(num_workers, len(tasks))) as pool:
+            results = pool.starmap(_feature_chunk, tasks)
+    else:
+        results = [_feature_chunk(*task, workers=num_workers) for task in tasks]
+    return pd.concat([chunk for chunk, _ in results]), [r for _, records in results for r in records]
+
+
+def process_full(df, backend=CLUSTER_BACKEND, num_workers=1, report=None, cache_dir=None):
+    """Fit (or load) the models and compute every product; returns (processed df, run state)."""
+    report = report or RunReport()
+    print("\n[1/6] Building ML features...")
+    with report.measure('fit_models', len(df)):
+        tfidf, tfidf_matrix, kmeans, labels = fit_models(df, backend)
+    df['product_cluster'] = labels
+
+    print("\n[2/6] Extracting weights and clean names...")
+    with report.measure('parse_names', len(df)):
+        df['extracted_weight'], df['product_name_clean'] = parse_product_names(df['product'])
+        print("  - Learning weight distributions from data...")
+        weight_by_cluster = learn_weight_by_cluster(df)
+        df = add_price_percentile(df)
+
+    df, records = compute_features_chunked(df, weight_by_cluster, SEED, num_workers, cache_dir=cache_dir)
+    report.add(records)
+    state = {
+        'params': (TFIDF_PARAMS, backend, CLUSTER_PARAMS[backend]),
+        'tfidf': tfidf,
+        'kmeans': kmeans,
+        'weight_by_cluster': weight_by_cluster,
+        'fit_rows': len(df),
+        'fit_mean_distance': inertia(kmeans, tfidf_matrix, n_jobs=N_JOBS) / max(len(df), 1),
+        'changed_since_fit': 0,
+    }
+    return df, state
+
+# =============================================================================
+# INCREMENTAL MODE
+# =============================================================================
+
+STATE_FILE = 'final_state.joblib'
+
+# Columns that feed the output; a change in any of them reprocesses the product
+SOURCE_COLUMNS = ['product', 'category', 'sub_category', 'brand', 'type',
+                  'sale_price', 'market_price', 'rating']
+
+# Re-cluster from scratch once the catalog has drifted this far from the last fit
+DRIFT_MAX_CHANGED = 0.20  # share of products added/changed/removed since the fit
+DRIFT_MAX_DISTANCE_RATIO = 1.5  # new products' mean squared centroid distance vs the fit's
+
+
+def row_hashes(df):
+    """Content hash of each product's source columns, indexed by product index."""
+    hashes = pd.util.hash_pandas_object(df[SOURCE_COLUMNS], index=False).to_numpy()
+    return pd.Series(hashes, index=df['index'].to_numpy())
+
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path)
+
+
+def save_state(df, state, path=STATE_FILE):
+    state = dict(state, output=df[OUTPUT_COLS + ['product_cluster']], row_hash=row_hashes(df))
+    joblib.dump(state, path)
+
+
+def process_incremental(df, state, backend=CLUSTER_BACKEND, num_workers=1, report=None, cache_dir=None):
+    """Recompute only new/changed products against the previous run.
+
+    New and changed products are assigned to the existing clusters with the
+    stored vectorizer and centroids (kmeans.predict); unchanged products keep
+    their previous output. Returns None when a full run is needed instead
+    (model parameters changed, duplicate product indices, or drift past
+    the DRIFT_* thresholds).
+    """
+    if state['params'] != (TFIDF_PARAMS, backend, CLUSTER_PARAMS[backend]) or not df['index'].is_unique:
+        print("  - Model parameters or product indices changed: full re-run")
+        return None
+
+    previous_hash = state['row_hash'].reindex(df['index'].to_numpy()).to_numpy()
+    changed_mask = ~(previous_hash == row_hashes(df).to_numpy())
+    removed = state['row_hash'].index.difference(df['index'])
+    changed = df[changed_mask].copy()
+    print(f"  - {len(changed):,} new/changed, {len(removed):,} removed, "
+          f"{len(df) - len(changed):,} unchanged products")
+
+    changed_since_fit = state['changed_since_fit'] + len(changed) + len(removed)
+    previous = state['output'].set_index('index')
+    if changed.empty:
+        df = previous.loc[df['index']].reset_index()
+        return df, dict(state, changed_since_fit=changed_since_fit)
+
+    report = report or RunReport()
+    print("\n[1/6] Assigning new products to existing clusters...")
+    with report.measure('assign_clusters', len(changed)):
+        matrix = state['tfidf'].transform(changed['text_features'])
+        changed['product_cluster'] = state['kmeans'].predict(matrix)
+
+    drift = changed_since_fit / max(state['fit_rows'], 1)
+    distance = (state['kmeans'].transform(matrix).min(axis=1) ** 2).mean()
+    distance_ratio = distance / state['fit_mean_distance'] if state['fit_mean_distance'] else 0.0
+    print(f"  - Drift since last fit: {drift:.1%} of catalog, distance ratio {distance_ratio:.2f}")
+    if drift > DRIFT_MAX_CHANGED or distance_ratio > DRIFT_MAX_DISTANCE_RATIO:
+        print("  - Drift threshold crossed: full re-cluster")
+        return None
+
+    print("\n[2/6] Extracting weights and clean names...")
+    with report.measure('parse_names', len(changed)):
+        changed['extracted_weight'], changed['product_name_clean'] = parse_product_names(changed['product'])
+        # Price percentiles are relative to the whole current catalog
+        changed['price_percentile'] = add_price_percentile(df[['category', 'sale_price']].copy())['price_percentile']
+    changed, records = compute_features_chunked(changed, state['weight_by_cluster'], SEED, num_workers,
+                                                cache_dir=cache_dir)
+    report.add(records)
+
+    unchanged = previous.loc[df.loc[~changed_mask, 'index']]
+    merged = pd.concat([unchanged, changed.set_index('index')[previous.columns]])
+    df = merged.loc[df['index']].reset_index()
+    return df, dict(state, changed_since_fit=changed_since_fit)
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+def print_summary(df_final, output_files):
+    print("\n" + "="*70)
+    print(f"✓ SAVED TO {', '.join(output_files)}")
+    print("="*70)
+    print(f"Total products: {len(df_final):,}")
+    print(f"Total columns: {len(df_final.columns)}")
+
+    print("\n" + "="*70)
+    print("VALIDATION SUMMARY")
+    print("="*70)
+
+    # Storage validation
+    print("\nStorage Distribution:")
+    print(df_final['storage_type'].value_counts().to_string())
+
+    # Weight validation
+    print("\nWeight Stats by Category:")
+    weight_stats = df_final.groupby('category')['weight_g'].agg(['mean', 'min', 'max']).round(0)
+    print(weight_stats.to_string())
+
+    # Shelf life validation
+    print("\nShelf Life by Storage:")
+    shelf_stats = df_final.groupby('storage_type')['shelf_life_hours'].agg(['mean', 'min', 'max']).round(0)
+    print(shelf_stats.to_string())
+
+    # Brand tier
+    print("\nBrand Tier Distribution:")
+    print(df_final['brand_tier'].value_counts().to_string())
+
+    print("\n" + "="*70)
+    print("SPOT CHECKS")
+    print("="*70)
+
+    # Check specific products
+    checks = [
+        ("Milk", df_final[df_final['product'].str.contains('Milk', case=False, na=False) & 
+                           ~df_final['product'].str.contains('Powder|Bikis|Coconut', case=False, na=False)]),
+        ("Eggs", df_final[df_final['sub_category'] == 'Eggs']),
+        ("Ice Cream", df_final[df_final['type'].str.contains('Ice Cream', case=False, na=False)]),
+        ("Chips", df_final[df_final['type'].str.contains('Chips|Nachos', case=False, na=False)]),
+        ("Rice", df_final[df_final['sub_category'].str.contains('Rice', case=False, na=False)]),
+    ]
+
+    for name, subset in checks:
+        if len(subset) > 0:
+            print(f"\n{name} ({len(subset)} items):")
+            print(f"  Storage: {dict(subset['storage_type'].value_counts())}")
+            print(f"  Shelf Life: {subset['shelf_life_hours'].mean():.0f}h avg")
+            print(f"  Morning/Evening Demand: {subset['morning_demand'].mean():.2f} / {subset['evening_demand'].mean():.2f}")
+            print(f"  Weight: {subset['weight_g'].mean():.0f}g avg")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process products.csv into final.csv/final.parquet")
+    parser.add_argument('--incremental', action='store_true',
+                        help="reprocess only new/changed products against the previous run")
+    parser.add_argument('--backend', choices=sorted(CLUSTER_PARAMS), default=CLUSTER_BACKEND,
+                        help="clustering backend")
+    parser.add_argument('--cluster-report', action='store_true',
+                        help=f"compare the backend with full kmeans and write {CLUSTER_REPORT_FILE}")
+    parser.add_argument('--workers', type=int, default=N_JOBS,
+                        help="processes (or threads, for one chunk) for the per-product feature stages "
+                             "(output does not depend on it)")
+    parser.add_argument('--dedup', choices=['flag', 'merge'], default='flag',
+                        help="flag near-duplicates in the canonical-SKU mapping, or also drop them from the output")
+    parser.add_argument('--stage-cache', action='store_true',
+                        help=f"reuse feature-stage outputs whose inputs and code are unchanged, stored in "
+                             f"{CACHE_DIR}/ (never evicted; delete the directory to clear it)")
+    args = parser.parse_args()
+
+    report = RunReport()
+    print("Loading data...")
+    with report.measure('load') as record:
+        df = products = load_products()
+        record['rows'] = len(df)
+    print(f"Loaded {len(df)} products")
+
+    if args.cluster_report:
+        print("\nCluster quality report...")
+        write_cluster_report(df, args.backend)
+
+    result = None
+    stage_cache = CACHE_DIR if args.stage_cache else None
+    state = load_state() if args.incremental else None
+    if state is not None:
+        print("Incremental run against the previous output...")
+        result = process_incremental(df, state, args.backend, args.workers, report, stage_cache)
+    if result is None:
+        result = process_full(df, args.backend, args.workers, report, stage_cache)
+    df, state = result
+
+    save_state(df, state)
+
+    # Near-duplicate listings (same item, different pack size or wording)
+    print("\nDetecting near-duplicate products...")
+    with report.measure('near_duplicates', len(df)):
+        duplicates = find_near_duplicates(df['product_name_clean'], df['sku_id'], blocks=df['category'])
+    n_groups = duplicates['duplicate_group'].max() + 1
+    print(f"  - {(~duplicates['is_canonical']).sum():,} near-duplicates of {n_groups:,} canonical SKUs")
+    mapping_files = save_payload(duplicates, DUPLICATES_STEM, OUTPUT_FORMATS)
+    if args.dedup == 'merge':
+        keep = duplicates['is_canonical'].to_numpy()
+        df, products = df[keep], products[keep]
+
+    df_final = df[OUTPUT_COLS].copy()
+    with report.measure('save', len(df_final)):
+        output_files = save_payload(df_final, 'final', OUTPUT_FORMATS, CATEGORICAL_COLUMNS) + mapping_files
+
+    # Top-k substitutes per SKU (same category), for stock-out lookups at simulation time
+    print("\nBuilding substitute index...")
+    with report.measure('substitute_index', len(df)):
+        substitutes = build_substitute_index(state['tfidf'].transform(products['text_features']),
+                                             df['sku_id'], df['sale_price'], df['brand_tier'],
+                                             blocks=df['category'])
+        substitutes.save(INDEX_FILE)
+    output_files.append(INDEX_FILE)
+    report.save(RUN_REPORT_FILE)
+    output_files.append(RUN_REPORT_FILE)
+    print_summary(df_final, output_files)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Near-Duplicate Product Detection (MinHash + LSH)
+Finds listings of the same item under slightly different names in roughly
+linear time: character shingles -> MinHash signatures -> banded LSH buckets
+-> candidate pairs verified by estimated Jaccard similarity -> connected groups
+Each group gets a canonical SKU (its first listing in catalog order)
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from counter_rng import mix64, GOLDEN_GAMMA
+
+SHINGLE_SIZE = 5  # characters
+NUM_PERMUTATIONS = 128
+BANDS = 16  # 16 bands x 8 rows: pairs above ~0.7 Jaccard almost always collide
+SIMILARITY_THRESHOLD = 0.8  # minimum estimated Jaccard for a verified near-duplicate
+SEED = 42
+
+
+def normalize_names(names):
+    """Lower-case, alphanumerics and single spaces only."""
+    names = pd.Series(names).fillna('').astype(str).str.lower()
+    names = names.str.replace(r'[^0-9a-z]+', ' ', regex=True).str.strip()
+    return names
+
+
+def shingle_hashes(names, k=SHINGLE_SIZE):
+    """64-bit hashes of every k-character shingle, with the first shingle position of each name.
+
+    All names are concatenated into one byte buffer and the shingle hashes are
+    computed with k vectorized passes over it. Names shorter than k are padded,
+    so every name has at least one shingle.
+    """
+    texts = [name.ljust(k).encode() for name in names]
+    lengths = np.array([len(t) for t in texts], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    buffer = np.frombuffer(b''.join(texts), dtype=np.uint8).astype(np.uint64)
+
+    counts = lengths - k + 1
+    doc_start = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    doc = np.repeat(np.arange(len(texts)), counts)
+    positions = offsets[doc] + (np.arange(counts.sum()) - doc_start[doc])
+
+    hashes = np.zeros(len(positions), dtype=np.uint64)
+    for j in range(k):
+        hashes = hashes * np.uint64(0x100000001B3) + buffer[positions + j]
+    return mix64(hashes), doc_start
+
+
+def minhash_signatures(hashes, doc_start, num_permutations=NUM_PERMUTATIONS, seed=SEED):
+    """(n_docs, num_permutations) MinHash signatures, one permutation at a time.
+
+    Permutation p is x -> a_p * x + b_p (mod 2**64) with odd a_p, a bijection
+    of the already-mixed shingle hashes that costs two array operations.
+    """
+    keys = mix64(np.arange(2 * num_permutations, dtype=np.uint64) * GOLDEN_GAMMA + np.uint64(seed))
+    multipliers, offsets = keys[:num_permutations] | np.uint64(1), keys[num_permutations:]
+    signatures = np.empty((len(doc_start), num_permutations), dtype=np.uint64)
+    for p in range(num_permutations):
+        signatures[:, p] = np.minimum.reduceat(hashes * multipliers[p] + offsets[p], doc_start)
+    return signatures
+
+
+def candidate_pairs(signatures, bands=BANDS, blocks=None):
+    """Pairs of docs that share a band bucket (each doc paired with its bucket's first doc)."""
+    n, num_permutations = signatures.shape
+    rows = num_permutations // bands
+    block_codes = (np.zeros(n, dtype=np.uint64) if blocks is None
+                   else pd.factorize(pd.Series(blocks).astype(str))[0].astype(np.uint64))
+    pairs = []
+    for b in range(bands):
+        key = mix64(block_codes * GOLDEN_GAMMA + np.uint64(b))
+        for r in range(b * rows, (b + 1) * rows):
+            key = mix64(key ^ signatures[:, r])
+        order = np.argsort(key, kind='stable')
+        sorted_key = key[order]
+        new_bucket = np.concatenate([[True], sorted_key[1:] != sorted_key[:-1]])
+        first = order[np.maximum.accumulate(np.where(new_bucket, np.arange(n), 0))]
+        pairs.append(np.column_stack([first[~new_bucket], order[~new_bucket]]))
+    pairs = np.unique(np.concatenate(pairs) @ np.array([n, 1]))  # dedupe across bands as a*n+b
+    return np.column_stack([pairs // n, pairs % n])
+
+
+def find_near_duplicates(names, sku_ids, blocks=None, threshold=SIMILARITY_THRESHOLD):
+    """Group near-duplicate products and map each SKU to its group's canonical SKU.
+
+    Returns a DataFrame aligned with the input: sku_id, canonical_sku_id,
+    duplicate_group (-1 for products without near-duplicates) and
+    is_canonical. Names that normalize to an empty string are never grouped.
+    """
+    names = normalize_names(names)
+    sku_ids = np.asarray(sku_ids)
+    n = len(names)
+    if n == 0:
+        return pd.DataFrame({'sku_id': sku_ids, 'canonical_sku_id': sku_ids,
+                             'duplicate_group': np.zeros(0, dtype=np.int64), 'is_canonical': np.zeros(0, dtype=bool)})
+
+    hashes, doc_start = shingle_hashes(names)
+    signatures = minhash_signatures(hashes, doc_start)
+    pairs = candidate_pairs(signatures, blocks=blocks)
+
+    # Verify candidates by estimated Jaccard similarity
+    if len(pairs):
+        similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+        non_empty = (names.to_numpy() != '')
+        pairs = pairs[(similarity >= threshold) & non_empty[pairs[:, 0]] & non_empty[pairs[:, 1]]]
+
+    graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+    _, component = connected_components(graph, directed=False)
+
+    # Canonical SKU: the first listing (lowest position) of each group
+    first_position = np.full(component.max() + 1 if n else 0, n, dtype=np.int64)
+    np.minimum.at(first_position, component, np.arange(n))
+    size = np.bincount(component, minlength=len(first_position))
+    canonical = first_position[component]
+
+    grouped = size[component] > 1
+    group_ids = np.full(n, -1, dtype=np.int64)
+    group_ids[grouped] = pd.factorize(canonical[grouped])[0]
+    return pd.DataFrame({
+        'sku_id': sku_ids,
+        'canonical_sku_id': sku_ids[canonical],
+        'duplicate_group': group_ids,
+        'is_canonical': canonical == np.arange(n),
+    })
@@ -0,0 +1,120 @@
+"""
+Columnar Payload I/O
+Writes generated payloads as Parquet with dictionary-encoded string columns,
+typed numeric columns and row groups, and loads them back quickly
+Requires: pyarrow (CSV loading works without it)
+"""
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+ROW_GROUP_SIZE = 100_000
+COMPRESSION = 'zstd'
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow")
+
+
+def to_columnar(df, categorical=(), dtypes=None):
+    """Convert low-cardinality string columns to categoricals and apply numeric dtypes."""
+    df = df.copy()
+    for col in categorical:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col, dtype in (dtypes or {}).items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def _table_schema(table):
+    """Schema with int32 dictionary indices, so chunks with more categories still fit."""
+    fields = []
+    for field in table.schema:
+        if pa.types.is_dictionary(field.type):
+            field = field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+        fields.append(field)
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+
+def write_parquet(df, path, categorical=(), dtypes=None, row_group_size=ROW_GROUP_SIZE):
+    """Write a whole DataFrame as dictionary-encoded Parquet."""
+    _require_pyarrow()
+    table = pa.Table.from_pandas(to_columnar(df, categorical, dtypes), preserve_index=False)
+    pq.write_table(table, path, row_group_size=row_group_size, compression=COMPRESSION)
+
+
+def save_payload(df, stem, formats=('csv', 'parquet'), categorical=(), dtypes=None):
+    """Save df as stem.csv and/or stem.parquet; returns the files written."""
+    files = []
+    if 'csv' in formats:
+        df.to_csv(f"{stem}.csv", index=False)
+        files.append(f"{stem}.csv")
+    if 'parquet' in formats:
+        write_parquet(df, f"{stem}.parquet", categorical, dtypes)
+        files.append(f"{stem}.parquet")
+    return files
+
+
+class ParquetStreamWriter:
+    """Append DataFrame chunks to one Parquet file, one row group per chunk.
+
+    The schema is fixed by the first chunk; later chunks are cast to it.
+    """
+
+    def __init__(self, path, categorical=(), dtypes=None):
+        _require_pyarrow()
+        self.path = path
+        self.categorical = categorical
+        self.dtypes = dtypes
+        self.writer = None
+        self.schema = None
+
+    def write(self, df):
+        df = to_columnar(df, self.categorical, self.dtypes)
+        if self.writer is None:
+            self.schema = _table_schema(pa.Table.from_pandas(df, preserve_index=False))
+            self.writer = pq.ParquetWriter(self.path, self.schema, compression=COMPRESSION)
+        self.writer.write_table(pa.Table.from_pandas(df, schema=self.schema, preserve_index=False))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_payload(path, columns=None, categorical=()):
+    """Load a payload written by this module (or its CSV equivalent).
+
+    Parquet files come back with categoricals and their stored dtypes, reading
+    only the requested columns. CSV files are parsed with `categorical`
+    columns as categories.
+    """
+    if str(path).endswith('.parquet'):
+        _require_pyarrow()
+        return pd.read_parquet(path, columns=columns)
+    dtype = {col: 'category' for col in categorical}
+    return pd.read_csv(path, usecols=columns, dtype=dtype)
+
+
+def iter_payload(path, columns=None, batch_size=ROW_GROUP_SIZE):
+    """Yield a payload as DataFrame chunks without loading the whole file."""
+    if str(path).endswith('.parquet'):
+        _require_pyarrow()
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=batch_size)
@@ -0,0 +1,62 @@
+"""
+Compiled Quantity Parser for Product Names
+Reads every quantity token (number + unit) of a name in one regex pass, after
+removing tokens that are not the product's own quantity (skip rules), and
+strips pack-size noise from the display name in the same loop over the
+column, so a catalog is scanned once for both its weights and clean names
+"""
+
+import math
+import re
+import numpy as np
+import pandas as pd
+
+NUMBER = r'(?P<value>\d+(?:\.\d+)?)\s*'
+
+
+class QuantityParser:
+    """Weight + clean name for every name of a column.
+
+    - units: [(unit regex, multiplier to grams), ...] in priority order; the
+      first unit with a valid token wins and, within it, the largest weight
+    - skip_patterns: removed (in order) before tokens are read, e.g. "6-11 kg" diaper ranges
+    - noise_patterns: removed (in order, case-insensitive) from the display name
+    - weights are truncated to whole grams and valid within [min_weight, max_weight]
+    """
+
+    def __init__(self, units, skip_patterns=(), noise_patterns=(), min_weight=5, max_weight=25000):
+        self.multipliers = [multiplier for _, multiplier in units]
+        self.quantity = re.compile(NUMBER + '(?:' + '|'.join(f'(?P<u{i}>{unit})'
+                                                             for i, (unit, _) in enumerate(units)) + ')')
+        self.skip = [re.compile(pattern) for pattern in skip_patterns]
+        self.noise = [re.compile(pattern, re.IGNORECASE) for pattern in noise_patterns]
+        self.min_weight = min_weight
+        self.max_weight = max_weight
+
+    def weight(self, name):
+        """Weight in grams of one (lower-case) name, or NaN."""
+        for pattern in self.skip:
+            name = pattern.sub('', name)
+        best_unit, best = len(self.multipliers), math.nan
+        for match in self.quantity.finditer(name):
+            unit = int(match.lastgroup[1:])
+            if unit > best_unit:
+                continue
+            weight = math.trunc(float(match.group('value')) * self.multipliers[unit])
+            if self.min_weight <= weight <= self.max_weight and (unit < best_unit or weight > best):
+                best_unit, best = unit, weight
+        return best
+
+    def clean(self, name):
+        """Display name without pack-size noise, whitespace collapsed."""
+        for pattern in self.noise:
+            name = pattern.sub('', name)
+        return ' '.join(name.split())
+
+    def parse(self, names):
+        """(weights, clean names) of a column, as Series aligned with it; missing names give (NaN, '')."""
+        names = pd.Series(names)
+        texts = names.fillna('').astype(str).tolist()
+        weights = np.array([self.weight(text.lower()) for text in texts], dtype=float)
+        clean = [self.clean(text) for text in texts]
+        return pd.Series(weights, index=names.index), pd.Series(clean, index=names.index)
@@ -0,0 +1,101 @@
+"""
+Stratified Customer Sampler for Fast Development Runs
+Reduces customer_profiles to a small population (e.g. 1%) stratified by
+customer_segment x locality x income_bracket, with a sample_weight column
+Streams over the Parquet/CSV payload in two passes; never loads the full file
+Outputs: customer_profiles_sample.csv, customer_profiles_sample.parquet
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from counter_rng import CounterRNG
+from payload_io import iter_payload, save_payload
+from generate_hyderabad_customers import CATEGORICAL_COLUMNS, PARQUET_DTYPES
+
+STRATA = ['customer_segment', 'locality', 'income_bracket']
+FRACTION = 0.01
+MIN_PER_STRATUM = 1  # keeps rare strata (e.g. HIGH income in premium areas) represented
+CHUNK_SIZE = 100_000
+SEED = 42
+OUTPUT_FORMATS = ['csv', 'parquet']
+
+
+def count_strata(path, strata=STRATA, chunk_size=CHUNK_SIZE):
+    """Pass 1: population size of every stratum."""
+    counts = None
+    for chunk in iter_payload(path, columns=strata, batch_size=chunk_size):
+        chunk_counts = chunk.astype(str).value_counts(subset=strata, sort=False)
+        counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+    return counts.astype(np.int64)
+
+
+def allocate(counts, fraction=FRACTION, min_per_stratum=MIN_PER_STRATUM):
+    """Proportional allocation with a per-stratum floor, never above the stratum size."""
+    sizes = np.maximum(np.rint(counts * fraction), min_per_stratum)
+    return np.minimum(sizes, counts).astype(np.int64)
+
+
+def stratified_sample(path, fraction=FRACTION, strata=STRATA, seed=SEED, chunk_size=CHUNK_SIZE):
+    """Draw a stratified sample without replacement from a customer payload.
+
+    Every row gets a uniform key from (seed, row position); a stratum's sample
+    is its n_h smallest keys, kept as a running bottom-k so memory stays at
+    one chunk plus the sample. Each sampled customer carries
+    sample_weight = N_h / n_h, so weighted totals match the full population.
+    """
+    counts = count_strata(path, strata, chunk_size)
+    sizes = allocate(counts, fraction)
+    quota = pd.DataFrame({'_population': counts, '_quota': sizes})
+
+    sample = None
+    position = 0
+    for chunk in iter_payload(path, batch_size=chunk_size):
+        rows = np.arange(position, position + len(chunk))
+        position += len(chunk)
+        chunk = chunk.assign(_row=rows, _key=CounterRNG(seed, rows).random(len(rows)))
+        candidates = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+
+        # Keep the smallest keys of each stratum, up to its quota
+        candidates = candidates.sort_values('_key', kind='stable')
+        rank = candidates.groupby([candidates[c].astype(str) for c in strata], sort=False).cumcount()
+        stratum_quota = quota['_quota'].reindex(
+            pd.MultiIndex.from_frame(candidates[strata].astype(str))).to_numpy()
+        sample = candidates[rank.to_numpy() < stratum_quota]
+
+    sample = sample.sort_values('_row').reset_index(drop=True)
+    population = quota['_population'].reindex(pd.MultiIndex.from_frame(sample[strata].astype(str))).to_numpy()
+    quota_size = quota['_quota'].reindex(pd.MultiIndex.from_frame(sample[strata].astype(str))).to_numpy()
+    sample['sample_weight'] = population / quota_size
+    return sample.drop(columns=['_row', '_key'])
+
+
+def main():
+    # Usage: python sample_customers.py [input.parquet|input.csv] [fraction]
+    input_path = sys.argv[1] if len(sys.argv) > 1 else 'customer_profiles.parquet'
+    fraction = float(sys.argv[2]) if len(sys.argv) > 2 else FRACTION
+    output_stem = input_path.rsplit('.', 1)[0] + '_sample'
+
+    print("="*70)
+    print(f"STRATIFIED SAMPLE OF {input_path} ({fraction:.2%})")
+    print(f"Strata: {' x '.join(STRATA)}")
+    print("="*70)
+
+    sample = stratified_sample(input_path, fraction)
+    files = save_payload(sample, output_stem, OUTPUT_FORMATS, CATEGORICAL_COLUMNS, PARQUET_DTYPES)
+
+    n_strata = sample.groupby(STRATA, observed=True).ngroups
+    print(f"\nSampled {len(sample):,} customers from {n_strata:,} strata")
+    print(f"Represented population: {sample['sample_weight'].sum():,.0f}")
+    print(f"Weight range: {sample['sample_weight'].min():.1f} - {sample['sample_weight'].max():.1f}")
+
+    print("\nWeighted segment totals:")
+    for segment, weight in sample.groupby('customer_segment', observed=True)['sample_weight'].sum() \
+            .sort_values(ascending=False).items():
+        print(f"  {segment}: {weight:,.0f}")
+
+    print(f"\nSaved: {', '.join(files)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Grid Serviceability Index
+Maps every fixed lat/lng tile around the dark stores to the stores that can
+serve some point of it (nearest first, with centre distances), so routing an
+order or customer to its dark store is a tile lookup plus a distance check
+against a handful of candidates instead of a search over every store
+Output: service_index.npz
+"""
+
+import numpy as np
+from geo import EARTH_RADIUS_KM, SERVICE_RADIUS_KM, StoreLocator, haversine_km, load_stores
+
+INDEX_FILE = 'service_index.npz'
+TILE_DEG = 0.005  # ~550 m grid tiles
+
+
+class ServiceIndex:
+    """Candidate dark stores of every grid tile within a service radius.
+
+    candidates[r, c] lists the positions (into .store_ids) of the stores within
+    radius_km of some point of tile (r, c), ordered by distance from the tile
+    centre (in centre_km), padded with -1 / NaN. Tiles are floor(coordinate /
+    tile) offset by (row0, col0); points off the grid are beyond every store.
+    """
+
+    def __init__(self, store_ids, store_lats, store_lngs, radius_km, tile, row0, col0, candidates, centre_km):
+        self.store_ids = np.asarray(store_ids, dtype=object)
+        self.store_lats = np.asarray(store_lats, dtype=float)
+        self.store_lngs = np.asarray(store_lngs, dtype=float)
+        self.radius_km = radius_km
+        self.tile = tile
+        self.row0 = row0
+        self.col0 = col0
+        self.candidates = candidates
+        self.centre_km = centre_km
+
+    @classmethod
+    def build(cls, store_ids, store_lats, store_lngs, radius_km=SERVICE_RADIUS_KM, tile=TILE_DEG):
+        store_lats, store_lngs = np.asarray(store_lats, dtype=float), np.asarray(store_lngs, dtype=float)
+        # A point within radius_km of a store lies on a tile whose centre is within radius_km + reach
+        reach = haversine_km(0, 0, tile / 2, tile / 2)
+        margin_lat = np.degrees((radius_km + reach) / EARTH_RADIUS_KM) + tile
+        margin_lng = margin_lat / np.cos(np.radians(np.abs(store_lats).max() + margin_lat))
+        row0 = int(np.floor((store_lats.min() - margin_lat) / tile))
+        col0 = int(np.floor((store_lngs.min() - margin_lng) / tile))
+        n_rows = int(np.floor((store_lats.max() + margin_lat) / tile)) - row0 + 1
+        n_cols = int(np.floor((store_lngs.max() + margin_lng) / tile)) - col0 + 1
+
+        rows, cols = np.divmod(np.arange(n_rows * n_cols), n_cols)
+        positions, distances = StoreLocator(store_ids, store_lats, store_lngs).nearest(
+            (rows + row0 + 0.5) * tile, (cols + col0 + 0.5) * tile, k=len(store_lats), max_km=radius_km + reach)
+        width = max(int((positions >= 0).sum(axis=1).max()), 1)
+        return cls(store_ids, store_lats, store_lngs, radius_km, tile, row0, col0,
+                   positions[:, :width].astype(np.int16).reshape(n_rows, n_cols, width),
+                   distances[:, :width].reshape(n_rows, n_cols, width))
+
+    @classmethod
+    def from_stores(cls, stores, radius_km=SERVICE_RADIUS_KM, tile=TILE_DEG):
+        return cls.build(stores['store_id'], stores['latitude'], stores['longitude'], radius_km, tile)
+
+    def save(self, path=INDEX_FILE):
+        np.savez(path, store_ids=self.store_ids.astype(str), store_lats=self.store_lats, store_lngs=self.store_lngs,
+                 radius_km=self.radius_km, tile=self.tile, row0=self.row0, col0=self.col0,
+                 candidates=self.candidates, centre_km=self.centre_km)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        with np.load(path) as data:
+            return cls(data['store_ids'], data['store_lats'], data['store_lngs'], float(data['radius_km']),
+                       float(data['tile']), int(data['row0']), int(data['col0']),
+                       data['candidates'], data['centre_km'])
+
+    def _tiles(self, lats, lngs):
+        """Flat tile index of every point, -1 off the grid."""
+        rows = np.floor(np.asarray(lats, dtype=float) / self.tile).astype(np.int64) - self.row0
+        cols = np.floor(np.asarray(lngs, dtype=float) / self.tile).astype(np.int64) - self.col0
+        n_rows, n_cols, _ = self.candidates.shape
+        on_grid = (rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols)
+        return np.where(on_grid, rows * n_cols + cols, -1)
+
+    def tile_candidates(self, lats, lngs):
+        """(n, width) candidate store positions and tile-centre km distances of every point."""
+        tiles = self._tiles(lats, lngs)
+        width = self.candidates.shape[2]
+        on_grid = (tiles >= 0)[:, None]
+        positions = self.candidates.reshape(-1, width)[np.maximum(tiles, 0)]
+        distances = self.centre_km.reshape(-1, width)[np.maximum(tiles, 0)]
+        return np.where(on_grid, positions, -1), np.where(on_grid, distances, np.nan)
+
+    def _candidate_counts(self, k, max_km):
+        """Per tile, how many leading candidates can be among a point's k nearest within max_km.
+
+        A point is within `reach` of its tile centre, so a store whose centre
+        distance exceeds the k-th candidate's by more than 2 * reach always has
+        k stores closer to the point.
+        """
+        reach = haversine_km(0, 0, self.tile / 2, self.tile / 2)
+        width = self.candidates.shape[2]
+        kth = self.centre_km[..., k - 1] if k <= width else np.full(self.centre_km.shape[:2], np.nan)
+        bound = np.minimum(np.where(np.isnan(kth), np.inf, kth + 2 * reach), max_km + reach)
+        return ((self.candidates >= 0) & (self.centre_km <= bound[..., None])).sum(axis=2).ravel()
+
+    def nearest(self, lats, lons, k=1, max_km=None):
+        """Positions and km distances of the k nearest serviceable stores, as StoreLocator.nearest.
+
+        Only stores within the index radius are candidates, so max_km may not exceed it.
+        """
+        if max_km is None:
+            max_km = self.radius_km
+        if max_km > self.radius_km:
+            raise ValueError(f"max_km {max_km} exceeds the index radius {self.radius_km}")
+        lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+        tiles = self._tiles(lats, lons)
+        counts = np.where(tiles >= 0, self._candidate_counts(k, max_km)[np.maximum(tiles, 0)], 0)
+        width = max(int(counts.max()) if len(counts) else 0, 1)
+        positions = self.candidates.reshape(-1, self.candidates.shape[2])[np.maximum(tiles, 0), :width]
+        positions = np.where(np.arange(width) < counts[:, None], positions, -1)
+
+        # Exact distances for the remaining candidates only
+        distances = np.full(positions.shape, np.inf, dtype=np.float32)
+        point, slot = np.nonzero(positions >= 0)
+        store = positions[point, slot]
+        distances[point, slot] = haversine_km(lats[point], lons[point], self.store_lats[store], self.store_lngs[store])
+        distances[distances > max_km] = np.inf
+        k = min(k, len(self.store_ids))
+        if width < k:  # fewer candidates than requested: pad with out-of-radius slots
+            positions = np.pad(positions, ((0, 0), (0, k - width)), constant_values=-1)
+            distances = np.pad(distances, ((0, 0), (0, k - width)), constant_values=np.inf)
+        order = np.argsort(distances, axis=1, kind='stable')[:, :k]
+        distances = np.take_along_axis(distances, order, axis=1)
+        positions = np.take_along_axis(positions, order, axis=1).astype(np.int32)
+        outside = ~np.isfinite(distances)
+        positions[outside], distances[outside] = -1, np.nan
+        return positions, distances
+
+    def assign(self, lats, lons, max_km=SERVICE_RADIUS_KM):
+        """(store_id, distance_km) of the nearest store within max_km; ('', NaN) when none is."""
+        positions, distances = self.nearest(lats, lons, 1, max_km)
+        positions, distances = positions[:, 0], distances[:, 0]
+        ids = np.where(positions >= 0, self.store_ids[np.maximum(positions, 0)], '')
+        return ids.astype(object), np.round(distances, 3)
+
+
+def main():
+    print("="*70)
+    print("BUILDING DARK-STORE SERVICEABILITY INDEX")
+    print("="*70)
+
+    index = ServiceIndex.from_stores(load_stores('blinkit_stores_master.csv'))
+    index.save(INDEX_FILE)
+
+    n_rows, n_cols, width = index.candidates.shape
+    counts = (index.candidates >= 0).sum(axis=2)
+    print(f"\nStores: {len(index.store_ids)}, radius: {index.radius_km} km, "
+          f"tiles: {n_rows} x {n_cols} ({index.tile} deg)")
+    print(f"Candidates per tile: max {width}, mean {counts[counts > 0].mean():.1f} on "
+          f"{(counts > 0).sum():,} serviceable tiles")
+    print(f"\nSaved: {INDEX_FILE}")
+
+
+if __name__ == '__main__':
+    main()
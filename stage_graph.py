@@ -0,0 +1,254 @@
+"""
+Declarative Stage Graph with Run Instrumentation
+Pipeline stages declare the columns they read and write. The graph orders
+them into levels of mutually independent stages, runs each level (optionally
+on threads), optionally skips stages whose inputs and code are unchanged since
+an earlier run (their outputs come from the artifact cache), and records wall
+time, rows/sec and peak memory per stage for a machine-readable run report
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import functools
+import inspect
+import resource
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from artifact_cache import cached, fingerprint
+from counter_rng import CounterRNG
+
+RUN_REPORT_FILE = 'run_report.json'
+
+
+class Stage:
+    """One pipeline step: func(df[inputs], **context values, rng=...) -> outputs.
+
+    - inputs / outputs: column names read and written (one array per output)
+    - context: names of non-column arguments (e.g. fitted tables), part of the cache key
+    - random: pass a CounterRNG keyed on the run seed, the stage name and each
+      row's id, so a row draws the same numbers whatever runs before or beside
+      the stage and whatever other rows are in the frame
+    - version: part of the cache key; bump it when the stage's results change
+      through anything other than its inputs and the code of the project
+      modules it uses (data files, environment...)
+    """
+
+    def __init__(self, name, func, inputs, outputs, context=(), random=False, version=None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.context = list(context)
+        self.random = random
+        self.version = version
+
+    def rng(self, seed_sequence, row_ids):
+        stage_key = zlib.crc32(self.name.encode())
+        stage_seed = np.random.SeedSequence(seed_sequence.entropy, spawn_key=seed_sequence.spawn_key + (stage_key,))
+        return CounterRNG(int(stage_seed.generate_state(1, np.uint64)[0]), row_ids)
+
+    def compute(self, frame, context, seed_sequence, row_ids):
+        kwargs = {name: context[name] for name in self.context}
+        if self.random:
+            kwargs['rng'] = self.rng(seed_sequence, row_ids)
+        values = self.func(frame, **kwargs)
+        return (values,) if len(self.outputs) == 1 else tuple(values)
+
+
+def plan(stages, columns):
+    """Group stages into levels; every stage only reads columns from `columns` or earlier levels.
+
+    Raises ValueError for a column written twice or an input nobody provides
+    (which includes dependency cycles).
+    """
+    producer = {}
+    for stage in stages:
+        for column in stage.outputs:
+            if column in producer or column in columns:
+                raise ValueError(f"Column {column!r} of stage {stage.name!r} is already provided")
+            producer[column] = stage
+
+    levels, level_of, pending = [], {}, list(stages)
+    while pending:
+        ready = [s for s in pending
+                 if all(c in columns or (c in producer and producer[c].name in level_of) for c in s.inputs)]
+        if not ready:
+            missing = sorted({c for s in pending for c in s.inputs if c not in columns and c not in producer})
+            raise ValueError(f"Stages {[s.name for s in pending]} cannot run: "
+                             f"missing columns {missing} or a dependency cycle")
+        for stage in ready:
+            level_of[stage.name] = len(levels)
+        levels.append(ready)
+        pending = [s for s in pending if s.name not in level_of]
+    return levels
+
+
+@functools.lru_cache(maxsize=None)
+def _source_key(path):
+    with open(path, 'rb') as f:
+        return fingerprint(f.read().decode('utf-8', 'replace'))
+
+
+def _project_modules(module):
+    """`module` and every module beside it (same directory) that it uses, directly or not.
+
+    A module uses another when one of its globals is that module, or a
+    function, class or instance defined there.
+    """
+    root = os.path.dirname(os.path.abspath(module.__file__))
+    found, pending = {module.__name__: module}, [module]
+    while pending:
+        for value in list(vars(pending.pop()).values()):
+            used = value if inspect.ismodule(value) else sys.modules.get(
+                getattr(value, '__module__', None) or type(value).__module__)
+            path = getattr(used, '__file__', None)
+            if (used is not None and used.__name__ not in found and path
+                    and os.path.dirname(os.path.abspath(path)) == root):
+                found[used.__name__] = used
+                pending.append(used)
+    return sorted(found.values(), key=lambda m: m.__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def _code_key(func):
+    """Fingerprint of the source of func's module and the project modules it uses."""
+    modules = _project_modules(inspect.getmodule(func))
+    return fingerprint([(m.__name__, _source_key(inspect.getsourcefile(m))) for m in modules])
+
+
+def _context_part(value):
+    # fingerprint() hashes pandas objects without their index; a lookup table's index is data
+    return value.reset_index() if isinstance(value, (pd.Series, pd.DataFrame)) else value
+
+
+def _run_stage(stage, df, context, seed_sequence, row_ids, cache_dir):
+    frame = df[stage.inputs]
+    compute = functools.partial(stage.compute, frame, context, seed_sequence, row_ids)
+    if cache_dir is None:
+        return compute(), False
+    key = fingerprint(stage.name, stage.inputs, stage.outputs, stage.version, _code_key(stage.func),
+                      frame, [_context_part(context[name]) for name in stage.context],
+                      [seed_sequence.entropy, list(seed_sequence.spawn_key), row_ids] if stage.random else None)
+    return cached(f"stage-{stage.name}", key, compute, cache_dir)
+
+
+def _reset_peak_rss():
+    """Restart the process's resident-memory high-water mark (Linux only; elsewhere it keeps growing)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+def run_stages(df, stages, context=None, seed_sequence=None, workers=1, cache_dir=None, row_ids=None):
+    """Run `stages` over `df` level by level; returns (df with the outputs added, stage records).
+
+    Random stages draw per row from the seed and row_ids (stable row ids,
+    default: row positions), so any subset of rows gets the values it gets
+    in the whole frame.
+
+    Stages within a level run on up to `workers` threads; stages run one at a
+    time otherwise. A record's peak_rss_mb is the process's peak resident
+    memory while the stage ran (shared by stages that ran side by side).
+
+    With a cache_dir, a stage whose inputs, context, seed, version and code
+    (its module and the project modules it uses) match an earlier run loads
+    its outputs from there instead of running. Each stage run on each row
+    chunk stores one file and nothing is evicted: delete the directory to
+    clear it.
+    """
+    context = context or {}
+    seed_sequence = seed_sequence or np.random.SeedSequence(0)
+    row_ids = np.arange(len(df)) if row_ids is None else np.asarray(row_ids)
+
+    def timed(stage):
+        start = time.perf_counter()
+        values, hit = _run_stage(stage, df, context, seed_sequence, row_ids, cache_dir)
+        return values, hit, time.perf_counter() - start
+
+    records = []
+    for level, level_stages in enumerate(plan(stages, set(df.columns))):
+        if workers > 1 and len(level_stages) > 1:
+            _reset_peak_rss()
+            with ThreadPoolExecutor(min(workers, len(level_stages))) as pool:
+                results = list(pool.map(timed, level_stages))
+            peaks = [_peak_rss_mb()] * len(level_stages)
+        else:
+            results, peaks = [], []
+            for stage in level_stages:
+                _reset_peak_rss()
+                results.append(timed(stage))
+                peaks.append(_peak_rss_mb())
+
+        for stage, (values, hit, elapsed), peak in zip(level_stages, results, peaks):
+            for column, value in zip(stage.outputs, values):
+                df[column] = value
+            records.append({'stage': stage.name, 'level': level, 'rows': len(df),
+                            'wall_time_sec': elapsed, 'peak_rss_mb': peak,
+                            'chunks': 1, 'cached_chunks': int(hit)})
+    return df, records
+
+
+class RunReport:
+    """Per-stage wall time, rows/sec and peak memory for one run, written as JSON.
+
+    Records of the same stage (e.g. one per row chunk) are merged: times and
+    rows add up, the peak is the largest seen.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, records):
+        for record in records:
+            merged = self.stages.setdefault(record['stage'], dict(record, rows=0, wall_time_sec=0.0,
+                                                                  peak_rss_mb=0.0, chunks=0, cached_chunks=0))
+            for field in ('rows', 'wall_time_sec', 'chunks', 'cached_chunks'):
+                merged[field] += record[field]
+            merged['peak_rss_mb'] = max(merged['peak_rss_mb'], record['peak_rss_mb'])
+
+    @contextmanager
+    def measure(self, name, rows=0):
+        """Record a block of code that is not a Stage (model fitting, saving...).
+
+        Yields a dict whose 'rows' a block that only learns its row count inside can set.
+        """
+        record = {'rows': rows}
+        _reset_peak_rss()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self.add([{'stage': name, 'level': None, 'rows': record['rows'],
+                       'wall_time_sec': time.perf_counter() - start, 'peak_rss_mb': _peak_rss_mb(),
+                       'chunks': 1, 'cached_chunks': 0}])
+
+    def to_dict(self):
+        stages = []
+        for record in self.stages.values():
+            wall = record['wall_time_sec']
+            stages.append(dict(record, wall_time_sec=round(wall, 4), peak_rss_mb=round(record['peak_rss_mb'], 1),
+                               rows_per_sec=round(record['rows'] / wall, 1) if wall > 0 else None))
+        return {'stages': stages}
+
+    def save(self, path=RUN_REPORT_FILE):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
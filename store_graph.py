@@ -0,0 +1,137 @@
+"""
+Dark-Store Road Graph and All-Pairs Route Tables
+Merges blinkit_darkstores_edges.csv, blinkit_transit_map.csv and
+blinkit_warehouse_connections.csv (which list the same roads several times)
+into one undirected CSR graph over the master warehouse and dark stores, and
+precomputes all-pairs shortest distances with their predecessor matrix, so
+inter-store transfers and replenishment routes are table lookups, not searches
+Output: store_routes.npz
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import shortest_path
+
+ROUTES_FILE = 'store_routes.npz'
+
+# Road lists: path -> (from node column, to node column, distance column)
+EDGE_FILES = {
+    'blinkit_darkstores_edges.csv': ('From_Node_ID', 'To_Node_ID', 'Distance_KM'),
+    'blinkit_transit_map.csv': ('Node_ID', 'Connected_To', 'Distance_KM'),
+    'blinkit_warehouse_connections.csv': ('from_node_id', 'to_node_id', 'distance_km'),
+}
+
+
+def load_edges(edge_files=EDGE_FILES):
+    """One row per undirected road (from_node < to_node); a road listed twice keeps its shortest distance."""
+    frames = []
+    for path, (from_col, to_col, distance_col) in edge_files.items():
+        roads = pd.read_csv(path, usecols=[from_col, to_col, distance_col])
+        frames.append(pd.DataFrame({
+            'from_node': np.minimum(roads[from_col], roads[to_col]),
+            'to_node': np.maximum(roads[from_col], roads[to_col]),
+            'distance_km': roads[distance_col],
+        }))
+    edges = pd.concat(frames, ignore_index=True)
+    edges = edges[edges['from_node'] != edges['to_node']]
+    return edges.groupby(['from_node', 'to_node'], as_index=False)['distance_km'].min()
+
+
+def build_graph(edges):
+    """(sorted node ids, symmetric CSR matrix of road distances between node positions)."""
+    node_ids = np.union1d(edges['from_node'], edges['to_node'])
+    a = np.searchsorted(node_ids, edges['from_node'].to_numpy())
+    b = np.searchsorted(node_ids, edges['to_node'].to_numpy())
+    distance = edges['distance_km'].to_numpy(dtype=np.float32)
+    graph = csr_matrix((np.concatenate([distance, distance]), (np.concatenate([a, b]), np.concatenate([b, a]))),
+                       shape=(len(node_ids), len(node_ids)))
+    return node_ids, graph
+
+
+class RouteTable:
+    """All-pairs shortest road distances and routes between node ids.
+
+    distances[i, j] is the shortest distance (km, inf if unreachable) between
+    node positions i and j; predecessors[i, j] is the node position before j
+    on that route (-1 for i == j or unreachable).
+    """
+
+    def __init__(self, node_ids, graph, distances, predecessors):
+        self.node_ids = node_ids
+        self.graph = graph
+        self.distances = distances
+        self.predecessors = predecessors
+        self.position = np.full(node_ids.max() + 1 if len(node_ids) else 0, -1, dtype=np.int32)
+        self.position[node_ids] = np.arange(len(node_ids))
+
+    @classmethod
+    def build(cls, edges):
+        node_ids, graph = build_graph(edges)
+        distances, predecessors = shortest_path(graph, method='D', directed=False, return_predecessors=True)
+        predecessors[predecessors < 0] = -1
+        return cls(node_ids, graph, distances.astype(np.float32), predecessors.astype(np.int16))
+
+    def save(self, path=ROUTES_FILE):
+        np.savez(path, node_ids=self.node_ids, indptr=self.graph.indptr, indices=self.graph.indices,
+                 weights=self.graph.data, distances=self.distances, predecessors=self.predecessors)
+
+    @classmethod
+    def load(cls, path=ROUTES_FILE):
+        with np.load(path) as data:
+            n = len(data['node_ids'])
+            graph = csr_matrix((data['weights'], data['indices'], data['indptr']), shape=(n, n))
+            return cls(data['node_ids'], graph, data['distances'], data['predecessors'])
+
+    def positions(self, nodes):
+        nodes = np.asarray(nodes)
+        known = (nodes >= 0) & (nodes < len(self.position))
+        positions = np.where(known, self.position[np.where(known, nodes, 0)], -1)
+        if (positions < 0).any():
+            raise KeyError(f"Unknown node ids: {np.unique(nodes[positions < 0]).tolist()}")
+        return positions
+
+    def distance(self, from_node, to_node):
+        """Shortest road distance in km between two node ids."""
+        return float(self.distances[self.positions(from_node), self.positions(to_node)])
+
+    def distances_between(self, from_nodes, to_nodes):
+        """Shortest road distances for many (from, to) node id pairs at once."""
+        return self.distances[self.positions(from_nodes), self.positions(to_nodes)]
+
+    def route(self, from_node, to_node):
+        """Node ids along the shortest route, both ends included ([] if unreachable)."""
+        origin, position = int(self.positions(from_node)), int(self.positions(to_node))
+        if not np.isfinite(self.distances[origin, position]):
+            return []
+        route = [position]
+        while position != origin:
+            position = self.predecessors[origin, position]
+            route.append(position)
+        return self.node_ids[route[::-1]].tolist()
+
+
+def main():
+    print("="*70)
+    print("BUILDING DARK-STORE ROUTE TABLES")
+    print("="*70)
+
+    edges = load_edges()
+    routes = RouteTable.build(edges)
+    routes.save(ROUTES_FILE)
+
+    reachable = np.isfinite(routes.distances)
+    print(f"\nNodes: {len(routes.node_ids)}, roads: {len(edges)} (from {len(EDGE_FILES)} files)")
+    print(f"Connected pairs: {reachable.sum():,} of {reachable.size:,}")
+    print(f"Longest shortest route: {routes.distances[reachable].max():.1f} km")
+
+    # Replenishment route to the farthest dark store by road
+    warehouse = routes.node_ids[0]
+    farthest = routes.node_ids[np.argmax(np.where(reachable[0], routes.distances[0], -1))]
+    print(f"Warehouse {warehouse} -> farthest store {farthest}: "
+          f"{routes.distance(warehouse, farthest):.1f} km via {routes.route(warehouse, farthest)}")
+    print(f"\nSaved: {ROUTES_FILE}")
+
+
+if __name__ == '__main__':
+    main()
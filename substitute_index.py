@@ -0,0 +1,126 @@
+"""
+Nearest-Neighbour Substitute Index
+Precomputes, for every SKU, its most similar SKUs by cosine similarity of the
+TF-IDF product vectors (within the same block, e.g. category), and persists
+them with price and brand tier so stock-out substitution at simulation time
+is an array lookup plus a filter, never a similarity computation
+Output: substitute_index.npz
+"""
+
+import numpy as np
+
+INDEX_FILE = 'substitute_index.npz'
+CANDIDATES = 50  # neighbours stored per SKU; queries filter and truncate these
+MAX_CHUNK_CELLS = 2**24  # bound on each dense similarity block (rows x block size)
+
+
+def _top_candidates(matrix, rows, candidates):
+    """Top-`candidates` most similar rows (positions in `matrix`) for each of `rows`."""
+    block = matrix[rows]
+    n = len(rows)
+    neighbors = np.full((n, candidates), -1, dtype=np.int32)
+    scores = np.zeros((n, candidates), dtype=np.float32)
+    k = min(candidates, n - 1)
+    if k <= 0:
+        return neighbors, scores
+
+    chunk_rows = max(1, MAX_CHUNK_CELLS // n)
+    for start in range(0, n, chunk_rows):
+        end = min(start + chunk_rows, n)
+        similarity = (block[start:end] @ block.T).toarray()
+        similarity[np.arange(end - start), np.arange(start, end)] = -np.inf  # not your own substitute
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarity, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        neighbors[start:end, :k] = rows[np.take_along_axis(top, order, axis=1)]
+        scores[start:end, :k] = np.take_along_axis(top_scores, order, axis=1)
+    return neighbors, scores
+
+
+def build_substitute_index(matrix, sku_ids, prices, brand_tiers, blocks=None, candidates=CANDIDATES):
+    """Build the index from L2-normalized TF-IDF rows (dot product = cosine similarity).
+
+    Neighbours are only searched within the same `blocks` value (e.g. category),
+    which keeps the build near-linear in the number of blocks and keeps
+    substitutes in the shopper's category.
+    """
+    matrix = matrix.tocsr().astype(np.float32)
+    n = matrix.shape[0]
+    block_codes = np.zeros(n, dtype=np.int64) if blocks is None else np.unique(np.asarray(blocks, dtype=str),
+                                                                              return_inverse=True)[1]
+    neighbors = np.full((n, candidates), -1, dtype=np.int32)
+    scores = np.zeros((n, candidates), dtype=np.float32)
+    for code in np.unique(block_codes):
+        rows = np.flatnonzero(block_codes == code)
+        neighbors[rows], scores[rows] = _top_candidates(matrix, rows, candidates)
+
+    tier_names, tier_codes = np.unique(np.asarray(brand_tiers, dtype=str), return_inverse=True)
+    return SubstituteIndex(np.asarray(sku_ids, dtype=str), np.asarray(prices, dtype=np.float32),
+                           tier_codes.astype(np.int8), tier_names, neighbors, scores)
+
+
+class SubstituteIndex:
+    """Top-k substitute lookups over precomputed neighbour lists.
+
+    Filters (applied to the stored candidates, which are sorted by similarity):
+    - min_price_ratio / max_price_ratio: candidate price relative to the SKU's price
+    - brand_tiers: allowed brand tiers, or same_tier=True for the SKU's own tier
+    """
+
+    def __init__(self, sku_ids, prices, tier_codes, tier_names, neighbors, scores):
+        self.sku_ids = sku_ids
+        self.prices = prices
+        self.tier_codes = tier_codes
+        self.tier_names = tier_names
+        self.neighbors = neighbors
+        self.scores = scores
+        self.position = {sku: i for i, sku in enumerate(sku_ids)}
+
+    def save(self, path=INDEX_FILE):
+        np.savez(path, sku_ids=self.sku_ids, prices=self.prices, tier_codes=self.tier_codes,
+                 tier_names=self.tier_names, neighbors=self.neighbors, scores=self.scores)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        with np.load(path) as data:
+            return cls(data['sku_ids'], data['prices'], data['tier_codes'], data['tier_names'],
+                       data['neighbors'], data['scores'])
+
+    def _candidate_mask(self, rows, min_price_ratio, max_price_ratio, brand_tiers, same_tier):
+        neighbors = self.neighbors[rows]
+        valid = neighbors >= 0
+        candidates = np.where(valid, neighbors, 0)
+        if min_price_ratio is not None or max_price_ratio is not None:
+            ratio = self.prices[candidates] / self.prices[rows][:, None]
+            if min_price_ratio is not None:
+                valid &= ratio >= min_price_ratio
+            if max_price_ratio is not None:
+                valid &= ratio <= max_price_ratio
+        if brand_tiers is not None:
+            allowed = np.isin(self.tier_names, list(brand_tiers))
+            valid &= allowed[self.tier_codes[candidates]]
+        if same_tier:
+            valid &= self.tier_codes[candidates] == self.tier_codes[rows][:, None]
+        return neighbors, valid
+
+    def query_batch(self, sku_ids, k=5, min_price_ratio=None, max_price_ratio=None,
+                    brand_tiers=None, same_tier=False):
+        """Top-k substitutes for many SKUs at once.
+
+        Returns (substitute positions, scores), both (len(sku_ids), k), padded
+        with -1 / 0.0 where fewer than k candidates pass the filters. Positions
+        index into .sku_ids.
+        """
+        rows = np.array([self.position[sku] for sku in sku_ids], dtype=np.int64)
+        neighbors, valid = self._candidate_mask(rows, min_price_ratio, max_price_ratio, brand_tiers, same_tier)
+        # Passing candidates first, keeping similarity order
+        order = np.argsort(~valid, axis=1, kind='stable')[:, :k]
+        keep = np.take_along_axis(valid, order, axis=1)
+        positions = np.where(keep, np.take_along_axis(neighbors, order, axis=1), -1)
+        scores = np.where(keep, np.take_along_axis(self.scores[rows], order, axis=1), 0.0)
+        return positions, scores
+
+    def query(self, sku_id, k=5, **filters):
+        """Top-k substitutes for one SKU as [(sku_id, similarity), ...]."""
+        positions, scores = self.query_batch([sku_id], k, **filters)
+        return [(self.sku_ids[p], float(s)) for p, s in zip(positions[0], scores[0]) if p >= 0]
@@ -0,0 +1,55 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import artifact_cache
+from artifact_cache import cached, fingerprint
+
+
+def test_hit_on_identical_key_and_miss_after_param_change(tmp_path):
+    data = pd.Series(['amul milk 500 ml', 'tata salt 1 kg'])
+    calls = []
+
+    def compute(value):
+        def run():
+            calls.append(value)
+            return {'value': value}
+        return run
+
+    key = fingerprint(data, {'max_features': 100})
+    assert cached('vectorizer', key, compute(1), str(tmp_path)) == ({'value': 1}, False)
+    # Same content under a different index is the same key
+    same = fingerprint(data.set_axis([10, 11]), {'max_features': 100})
+    assert cached('vectorizer', same, compute(2), str(tmp_path)) == ({'value': 1}, True)
+    changed = fingerprint(data, {'max_features': 200})
+    assert changed != key
+    assert cached('vectorizer', changed, compute(3), str(tmp_path)) == ({'value': 3}, False)
+    assert calls == [1, 3]
+
+
+def test_fingerprint_distinguishes_array_dtype_and_shape():
+    values = np.arange(6, dtype=np.int64)
+    assert fingerprint(values) == fingerprint(values.copy())
+    assert fingerprint(values) != fingerprint(values.astype(np.int32))
+    assert fingerprint(values) != fingerprint(values.reshape(2, 3))
+
+
+def test_failures_leave_no_partial_entry(tmp_path, monkeypatch):
+    def fail():
+        raise RuntimeError('fit failed')
+
+    with pytest.raises(RuntimeError):
+        cached('model', fingerprint('a'), fail, str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+    def truncated_dump(artifact, path):
+        with open(path, 'wb') as f:
+            f.write(b'partial')
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(artifact_cache.joblib, 'dump', truncated_dump)
+    with pytest.raises(KeyboardInterrupt):
+        cached('model', fingerprint('a'), lambda: 1, str(tmp_path))
+    assert os.listdir(tmp_path) == []
+    monkeypatch.undo()
+    assert cached('model', fingerprint('a'), lambda: 2, str(tmp_path)) == (2, False)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from build_demand_cohorts import (BASKET_COLUMNS, DAY_TYPES, build_cohorts, day_rates, hour_weights,
+                                  load_members, resolve_customers, save_members)
+
+N = 300
+
+
+@pytest.fixture(scope='module')
+def profiles(tmp_path_factory):
+    rng = np.random.default_rng(3)
+    morning = rng.random(N)
+    df = pd.DataFrame({
+        'customer_segment': rng.choice(['YOUNG_PROFESSIONAL', 'FAMILY', 'STUDENT'], N),
+        'locality': rng.choice(['Gachibowli', 'Kondapur', 'Madhapur', 'Ameerpet'], N),
+        'orders_per_month': rng.integers(1, 30, N),
+        'weekend_preference': rng.random(N).round(2),
+        'primary_order_hour': rng.integers(0, 24, N),
+        'morning_order_tendency': morning.round(2),
+        'evening_order_tendency': (1 - morning).round(2),
+        'avg_basket_value': rng.uniform(100, 4000, N).round(0),
+    })
+    path = tmp_path_factory.mktemp('cohorts') / 'customer_profiles.csv'
+    df.to_csv(path, index=False)
+    return df, str(path)
+
+
+def test_cohort_rates_sum_to_segment_totals(profiles):
+    df, path = profiles
+    cohorts, _ = build_cohorts(path, chunk_size=37)
+    assert len(cohorts) == df.groupby(['customer_segment', 'locality']).ngroups * len(DAY_TYPES) * 24
+    np.testing.assert_allclose(cohorts[BASKET_COLUMNS].sum(axis=1), 1, atol=1e-3)
+
+    daily = pd.DataFrame(day_rates(df['orders_per_month'], df['weekend_preference']), columns=DAY_TYPES)
+    keys = ['customer_segment', 'locality']
+    expected = daily.groupby([df[k] for k in keys]).sum().stack()
+    actual = cohorts.groupby(keys + ['day_type'])['arrival_rate'].sum()
+    pd.testing.assert_series_equal(actual.sort_index(), expected.rename_axis(keys + ['day_type']).sort_index(),
+                                   check_names=False)
+    customers = cohorts.groupby(keys)['customers'].first()
+    pd.testing.assert_series_equal(customers, df.groupby(keys).size().astype(customers.dtype), check_names=False)
+
+
+def test_chunk_size_does_not_change_cohorts(profiles):
+    _, path = profiles
+    pd.testing.assert_frame_equal(build_cohorts(path, chunk_size=37)[0], build_cohorts(path, chunk_size=N)[0])
+
+
+def test_resolve_customers_round_trip(profiles, tmp_path):
+    df, path = profiles
+    _, members = build_cohorts(path, chunk_size=37)
+    save_members(members, tmp_path / 'members.npz')
+    members = load_members(tmp_path / 'members.npz')
+
+    segment, locality, hour = 'FAMILY', 'Kondapur', 19
+    group = df[(df['customer_segment'] == segment) & (df['locality'] == locality)]
+    u = np.random.default_rng(0).random(20_000)
+    rows = resolve_customers(members, segment, locality, 'WEEKEND', hour, u)
+    assert set(rows) <= set(group.index)
+
+    # Each member is picked in proportion to their weekend rate at that hour
+    weights = (day_rates(group['orders_per_month'], group['weekend_preference'])[:, 1]
+               * hour_weights(group['primary_order_hour'], group['morning_order_tendency'],
+                              group['evening_order_tendency'])[:, hour])
+    picked = pd.Series(rows).value_counts(normalize=True).reindex(group.index, fill_value=0)
+    np.testing.assert_allclose(picked.to_numpy(), weights / weights.sum(), atol=0.02)
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from threadpoolctl import threadpool_info
+from clustering import fit_clusters, fit_kmeans
+
+
+@pytest.fixture(scope='module')
+def matrix():
+    rng = np.random.default_rng(0)
+    centres = rng.random((4, 20)) * 5
+    return sparse.csr_matrix(centres[rng.integers(0, 4, 600)] + rng.random((600, 20)))
+
+
+def test_kmeans_thread_limit(matrix, monkeypatch):
+    seen = []
+    real_fit = fit_kmeans.__globals__['KMeans'].fit_predict
+
+    def fit_predict(model, X):
+        seen.append({info['user_api']: info['num_threads'] for info in threadpool_info()})
+        return real_fit(model, X)
+
+    monkeypatch.setattr(fit_kmeans.__globals__['KMeans'], 'fit_predict', fit_predict)
+    _, labels = fit_kmeans(matrix, 4, random_state=0, n_init=2, n_jobs=1)
+    assert seen[0] and all(n == 1 for n in seen[0].values())
+    _, all_cores = fit_kmeans(matrix, 4, random_state=0, n_init=2, n_jobs=-1)
+    assert (labels == all_cores).all()
+
+
+@pytest.mark.parametrize('backend', ['kmeans', 'minibatch'])
+def test_backends_label_every_row(matrix, backend):
+    model, labels = fit_clusters(matrix, backend, n_clusters=4, random_state=0)
+    assert len(labels) == matrix.shape[0] and len(np.unique(labels)) == 4
+    assert (model.predict(matrix) == labels).all()
@@ -0,0 +1,27 @@
+import warnings
+import numpy as np
+import pytest
+from counter_rng import CounterRNG
+
+
+def test_draws_depend_only_on_seed_and_index():
+    full = CounterRNG(42, np.arange(1000))
+    part = CounterRNG(42, np.arange(1000)[::-7])
+    for _ in range(3):
+        assert (part.random(len(part.index)) == full.random(1000)[::-7]).all()
+    assert not (CounterRNG(43, np.arange(1000)).random(1000) == CounterRNG(42, np.arange(1000)).random(1000)).any()
+
+
+def test_uniform_range_and_size_check():
+    u = CounterRNG(7, np.arange(100_000)).random(100_000)
+    assert u.min() >= 0 and u.max() < 1 and abs(u.mean() - 0.5) < 0.01
+    with pytest.raises(ValueError):
+        CounterRNG(7, np.arange(3)).random(4)
+
+
+def test_no_overflow_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        rng = CounterRNG(2**64 + 42, np.arange(10))
+        rng.random(10)
+        rng.random(10)
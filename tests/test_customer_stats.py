@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from customer_stats import COUNT_COLUMNS, HISTOGRAM_BINS, CustomerStats
+
+N = 2000
+
+
+@pytest.fixture(scope='module')
+def customers():
+    rng = np.random.default_rng(11)
+    df = pd.DataFrame({col: rng.choice([f"{col}_{i}" for i in range(6)], N, p=[.3, .25, .2, .1, .1, .05])
+                       for col in COUNT_COLUMNS})
+    df['age'] = rng.integers(18, 75, N)
+    df['monthly_income'] = rng.integers(8000, 400000, N)
+    df['orders_per_month'] = rng.integers(1, 30, N)
+    df['avg_basket_value'] = rng.integers(150, 2700, N)
+    df['lifetime_value'] = rng.integers(0, 1_000_000, N)
+    return df
+
+
+def ranked(pairs):
+    return sorted(pairs, key=lambda pair: (-pair[1], pair[0]))
+
+
+def test_merged_blocks_equal_one_pass(customers):
+    whole = CustomerStats().update(customers)
+    merged = CustomerStats()
+    for start, end in [(0, 0), (0, 1), (1, 700), (700, 1500), (1500, N)]:
+        merged.merge(CustomerStats().update(customers.iloc[start:end]))
+
+    assert merged.rows == whole.rows == N
+    for col in HISTOGRAM_BINS:
+        assert merged.mean(col) == pytest.approx(whole.mean(col))
+        assert merged.mean(col) == pytest.approx(customers[col].mean())
+        assert (merged.mins[col], merged.maxs[col]) == (customers[col].min(), customers[col].max())
+        assert merged.histogram(col) == whole.histogram(col)
+        np.testing.assert_array_equal([c for _, _, c in merged.histogram(col)],
+                                      np.histogram(customers[col], bins=HISTOGRAM_BINS[col])[0])
+    for col in COUNT_COLUMNS:
+        # Ties may be listed in either order, so compare full rankings
+        assert ranked(merged.top(col, k=None)) == ranked(whole.top(col, k=None))
+        assert merged.top(col, 1) == whole.top(col, 1)
+        for value in customers[col].unique():
+            count = (customers[col] == value).sum()
+            assert merged.share(col, value) == whole.share(col, value) == (count, pytest.approx(count / N * 100))
+
+
+def test_empty_stats():
+    stats = CustomerStats().merge(CustomerStats())
+    assert stats.rows == 0 and np.isnan(stats.mean('age'))
+    assert stats.share('gender', 'F') == (0, 0.0) and stats.top('gender') == []
@@ -0,0 +1,65 @@
+import json
+import os
+import numpy as np
+import pytest
+from conftest import ROOT
+import generate_hyderabad_customers as customers
+from city_config import DEFAULT_CONFIG, load_config
+from generate_hyderabad_customers import generate_population, get_customers
+from id_allocator import derive_key, permute_index
+
+
+@pytest.fixture
+def small_config(tmp_path, monkeypatch):
+    """A 3,000-customer Hyderabad config writing into tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'small.json'
+    path.write_text(json.dumps({'base': DEFAULT_CONFIG, 'name': 'small', 'num_customers': 3000,
+                                'output_stem': 'small'}))
+    return str(path)
+
+
+def read_output(tmp_path):
+    with open(tmp_path / 'small.csv') as f:
+        return f.read()
+
+
+def test_config_paths_resolve_against_declaring_file(tmp_path):
+    # A derived config in another directory inherits the base's store file unchanged
+    derived = tmp_path / 'derived' / 'surge.json'
+    derived.parent.mkdir()
+    derived.write_text(json.dumps({'base': os.path.relpath(DEFAULT_CONFIG, derived.parent), 'name': 'surge'}))
+    config = load_config(str(derived))
+    assert config['name'] == 'surge'
+    assert os.path.samefile(config['stores'], os.path.join(ROOT, 'payload', 'blinkit_stores_master.csv'))
+
+    # ...unless it declares its own, relative to itself
+    derived.write_text(json.dumps({'base': os.path.relpath(DEFAULT_CONFIG, derived.parent),
+                                   'stores': 'stores.csv'}))
+    assert load_config(str(derived))['stores'] == str(derived.parent / 'stores.csv')
+
+
+def test_output_independent_of_workers_and_block_size(small_config, tmp_path, monkeypatch):
+    outputs = []
+    for num_workers, block_size in [(1, 3000), (1, 700), (2, 1000)]:
+        monkeypatch.setattr(customers, 'BATCH_SIZE', block_size)
+        stats = generate_population(small_config, num_workers, report=False)
+        assert stats.rows == 3000
+        outputs.append(read_output(tmp_path))
+    assert outputs[0].count('\n') == 3001
+    assert outputs[1] == outputs[0] and outputs[2] == outputs[0]
+
+
+def test_get_customers_matches_written_rows(small_config, tmp_path):
+    generate_population(small_config, 1, report=False)
+    lines = read_output(tmp_path).splitlines(keepends=True)
+
+    # Output row p holds customer permute_index(p), requested here in an arbitrary order
+    rows = np.random.default_rng(0).choice(3000, 500, replace=False)
+    customer_index = permute_index(rows, 3000, derive_key('row_order', 42))
+    df = get_customers(customer_index, small_config)
+    assert df.to_csv(index=False).splitlines(keepends=True) == [lines[0]] + [lines[p + 1] for p in rows]
+
+    assert len(get_customers([], small_config)) == 0
+    with pytest.raises(IndexError):
+        get_customers([3000], small_config)
@@ -0,0 +1,48 @@
+import os
+import numpy as np
+import pytest
+from conftest import PAYLOAD
+from geo import StoreLocator, distance_matrix, haversine_km, load_stores
+
+
+@pytest.fixture(scope='module')
+def stores():
+    return load_stores(os.path.join(PAYLOAD, 'blinkit_stores_master.csv'))
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(21)
+    return rng.uniform(17.2, 17.7, 2000), rng.uniform(78.2, 78.7, 2000)
+
+
+def test_nearest_matches_brute_force(stores, points):
+    lats, lons = points
+    km = distance_matrix(lats, lons, stores['latitude'], stores['longitude'])
+    order = np.argsort(km, axis=1, kind='stable')[:, :3]
+    positions, distances = StoreLocator.from_stores(stores).nearest(lats, lons, k=3)
+    np.testing.assert_array_equal(positions, order)
+    np.testing.assert_allclose(distances, np.take_along_axis(km, order, axis=1), rtol=1e-5)
+    assert positions.dtype == np.int32 and distances.dtype == np.float32
+
+
+def test_max_km_and_assign(stores, points):
+    lats, lons = points
+    locator = StoreLocator.from_stores(stores)
+    km = haversine_km(lats[:, None], lons[:, None], stores['latitude'].to_numpy(), stores['longitude'].to_numpy())
+    nearest = km.argmin(axis=1)
+    inside = km.min(axis=1) <= 5.0
+    assert inside.any() and not inside.all()
+
+    positions, distances = locator.nearest(lats, lons, max_km=5.0)
+    np.testing.assert_array_equal(positions[:, 0], np.where(inside, nearest, -1))
+    assert np.isnan(distances[~inside, 0]).all()
+
+    ids, store_km = locator.assign(lats, lons)
+    np.testing.assert_array_equal(ids, np.where(inside, stores['store_id'].to_numpy()[nearest], ''))
+    np.testing.assert_allclose(store_km[inside], km.min(axis=1)[inside], atol=1e-3)
+
+
+def test_no_points():
+    positions, distances = StoreLocator(['S1', 'S2'], [17.4, 17.5], [78.4, 78.5]).nearest([], [], k=5)
+    assert positions.shape == distances.shape == (0, 2)
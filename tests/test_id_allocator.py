@@ -0,0 +1,34 @@
+import re
+import numpy as np
+import pytest
+from id_allocator import ID_SPACE, allocate_ids, derive_key, permute_index
+
+
+@pytest.mark.parametrize('n', [1, 2, 7, 1000, 2**16 + 3, 1_000_003])
+def test_permute_index_is_a_bijection(n):
+    permuted = permute_index(np.arange(n), n, derive_key('test', 42))
+    assert (np.sort(permuted) == np.arange(n)).all()
+    assert (permute_index(np.arange(n), n, derive_key('test', 42)) == permuted).all()  # deterministic
+
+
+def test_keys_give_different_permutations():
+    a = permute_index(np.arange(1000), 1000, derive_key('customer', 42))
+    b = permute_index(np.arange(1000), 1000, derive_key('rider', 42))
+    c = permute_index(np.arange(1000), 1000, derive_key('customer', 43))
+    assert (a != b).mean() > 0.9 and (a != c).mean() > 0.9
+
+
+def test_allocated_ids_are_unique():
+    # Consecutive counters, and counters spread over the whole 32-bit space
+    counters = np.concatenate([np.arange(200_000), np.linspace(200_000, ID_SPACE - 1, 200_000, dtype=np.int64)])
+    ids = allocate_ids('HYD', counters, 'customer', 42)
+    assert len(np.unique(ids)) == len(counters)
+    assert all(re.fullmatch(r'HYD-[0-9A-F]{8}', i) for i in ids[:1000])
+    assert (allocate_ids('HYD', counters[:10], 'customer', 42) == ids[:10]).all()
+
+
+def test_counters_outside_the_id_space():
+    with pytest.raises(ValueError):
+        allocate_ids('HYD', [ID_SPACE], 'customer', 42)
+    with pytest.raises(ValueError):
+        allocate_ids('HYD', [-1], 'customer', 42)
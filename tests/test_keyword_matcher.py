@@ -0,0 +1,60 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from keyword_matcher import KeywordMatcher, keyword_set
+
+GROUPS = [(['milk powder', 'powder'], 'dry'), (['milk', 'curd'], 'chilled'), (['ice cream'], 'frozen'),
+          (['cream'], 'chilled'), (['milk'], 'repeat'), (['cream cheese', 'ice'], 'deli')]
+TEXTS = pd.Series(['skimmed milk powder', 'fresh milk', 'ice cream cone', 'cream cheese', 'curd rice',
+                   'masala powder', 'washing liquid', '', np.nan, 'milkmilk curd powder', 'creamy ice cream',
+                   'ice cream cheese', 'rice', 'fresh milk'])
+
+
+def first_loop(text, groups):
+    for g, (keywords, _) in enumerate(groups):
+        if any(keyword in text for keyword in keywords):
+            return g
+    return -1
+
+
+def longest_loop(text, groups):
+    entries = sorted(((k, g) for g, (keywords, _) in enumerate(groups) for k in keywords), key=lambda e: -len(e[0]))
+    return next((g for k, g in entries if k in text), -1)
+
+
+@pytest.mark.parametrize('priority, loop', [('first', first_loop), ('longest', longest_loop)])
+def test_match_equals_loop(priority, loop):
+    expected = [loop(t, GROUPS) if isinstance(t, str) else -1 for t in TEXTS]
+    assert KeywordMatcher(GROUPS, priority).match(TEXTS).tolist() == expected
+
+
+def test_dict_table_and_lookup():
+    matcher = KeywordMatcher({'ice cream': 'frozen', 'cream': 'chilled', 'powder': 'dry'})
+    assert matcher.lookup(TEXTS, 'ambient').tolist() == [
+        'dry', 'ambient', 'frozen', 'chilled', 'ambient', 'dry', 'ambient', 'ambient', 'ambient', 'dry', 'frozen', 'frozen', 'ambient', 'ambient']
+
+
+def test_contains():
+    keywords = ['milk', 'cream', 'a.b']  # regex metacharacters match literally
+    expected = [isinstance(t, str) and any(k in t for k in keywords) for t in TEXTS]
+    assert keyword_set(keywords).contains(TEXTS).tolist() == expected
+    assert not keyword_set(keywords).contains(pd.Series(['axb'])).any()
+
+
+def test_cost_does_not_grow_with_table_size():
+    rng = np.random.default_rng(0)
+    words = np.array(['fresh', 'milk', 'cream', 'ice', 'powder', 'masala', 'rice', 'curd', 'cheese', 'oil'])
+    texts = pd.Series([' '.join(rng.choice(words, 8)) + f' {i}' for i in range(20_000)])
+    filler = [''.join(rng.choice(list('qxzjvwk'), 7)) for _ in range(2000)]
+
+    def seconds(n_filler):
+        matcher = KeywordMatcher(GROUPS + [([keyword], 'filler') for keyword in filler[:n_filler]], 'longest')
+        best = np.inf
+        for _ in range(3):
+            start = time.perf_counter()
+            matcher.match(texts)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    assert seconds(2000) < 2 * seconds(0)
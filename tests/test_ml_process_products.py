@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+import ml_process_products as products
+from ml_process_products import (FEATURE_STAGES, OUTPUT_COLS, add_price_percentile, compute_features_chunked,
+                                 learn_weight_by_cluster, load_products, load_state, parse_product_names,
+                                 process_full, process_incremental, save_state)
+
+TYPES = [('Dairy & Breakfast', 'Milk', 'Milk'), ('Beverages', 'Fruit Juices & Drinks', 'Juice'),
+         ('Snacks & Branded Foods', 'Chips & Namkeen', 'Chips'), ('Ice Creams & Frozen', 'Ice Cream', 'Ice Cream'),
+         ('Fruits & Vegetables', 'Fresh Vegetables', 'Vegetables'),
+         ('Cleaning & Household', 'All Purpose Cleaners', 'Floor Cleaner'),
+         ('Beauty & Hygiene', 'Skin Care', 'Lotion'), ('Eggs, Meat & Fish', 'Eggs', 'Farm Eggs'),
+         ('Foodgrains, Oil & Masala', 'Rice & Rice Products', 'Rice'), ('Baby Care', 'Diapers & Wipes', 'Diapers')]
+WORDS = ['Fresh', 'Organic', 'Crunchy', 'Spicy', 'Classic', 'Family', 'Golden', 'Natural', 'Masala', 'Cream']
+BRANDS = ['Amul', 'Tata', 'Fresho', 'Organic Tattva', 'Premium Gold', 'BB Royal']
+QUANTITIES = ['500 ml', '1 L', '200 g', '1 kg', '5 kg', '75 g', '2 x 100 g', '(Pack of 4)', '']
+
+
+def make_catalog(n, seed=0):
+    rng = np.random.default_rng(seed)
+    kind = rng.integers(0, len(TYPES), n)
+    words = np.array(WORDS)[rng.integers(0, len(WORDS), (2, n))]
+    price = rng.integers(20, 900, n).astype(float)
+    return pd.DataFrame({
+        'index': np.arange(1, n + 1),
+        'product': [f"{a} {b} {TYPES[k][2]} {q}".strip()
+                    for a, b, k, q in zip(words[0], words[1], kind, np.array(QUANTITIES)[rng.integers(0, 9, n)])],
+        'category': [TYPES[k][0] for k in kind],
+        'sub_category': [TYPES[k][1] for k in kind],
+        'brand': np.array(BRANDS)[rng.integers(0, len(BRANDS), n)],
+        'sale_price': price,
+        'market_price': price * 1.1,
+        'type': [TYPES[k][2] for k in kind],
+        'rating': np.where(rng.random(n) < 0.1, np.nan, rng.integers(10, 50, n) / 10),
+        'description': 'x',
+    })
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """A 600-product catalog in tmp_path (the working directory, so caches land there too)."""
+    monkeypatch.chdir(tmp_path)
+    make_catalog(600).to_csv('products.csv', index=False)
+    return tmp_path / 'products.csv'
+
+
+def test_incremental_equals_full_rerun(catalog, monkeypatch):
+    monkeypatch.setattr(products, 'DRIFT_MAX_DISTANCE_RATIO', np.inf)  # new words move products off-centre
+    full, state = process_full(load_products(catalog), num_workers=1)
+    save_state(full, state)
+
+    # Nothing changed: the incremental run reproduces the full run exactly
+    unchanged, _ = process_incremental(load_products(catalog), load_state(), num_workers=1)
+    pd.testing.assert_frame_equal(unchanged[OUTPUT_COLS], full[OUTPUT_COLS])
+
+    # Renamed products are recomputed; everyone else keeps the previous output
+    modified = pd.read_csv(catalog)
+    renamed = modified.index[::40]
+    modified.loc[renamed, 'product'] = 'Classic Golden ' + modified.loc[renamed, 'product'] + ' 250 g'
+    modified.to_csv(catalog, index=False)
+    incremental, _ = process_incremental(load_products(catalog), load_state(), num_workers=1)
+    kept = ~modified.index.isin(renamed)
+    pd.testing.assert_frame_equal(incremental.loc[kept, OUTPUT_COLS], full.loc[kept, OUTPUT_COLS])
+
+    # ...and match a full rerun of the modified catalog against the stored models, random draws included
+    rerun = load_products(catalog)
+    rerun['product_cluster'] = state['kmeans'].predict(state['tfidf'].transform(rerun['text_features']))
+    rerun['extracted_weight'], rerun['product_name_clean'] = parse_product_names(rerun['product'])
+    rerun, _ = compute_features_chunked(add_price_percentile(rerun), state['weight_by_cluster'], chunk_rows=100)
+    columns = OUTPUT_COLS + ['product_cluster']
+    pd.testing.assert_frame_equal(incremental[columns], rerun[columns].reset_index(drop=True))
+    assert (incremental.loc[renamed, 'product_name_clean'] != full.loc[renamed, 'product_name_clean']).all()
+
+
+def test_drift_forces_full_run(catalog, monkeypatch):
+    full, state = process_full(load_products(catalog), num_workers=1)
+    save_state(full, state)
+    monkeypatch.setattr(products, 'DRIFT_MAX_CHANGED', 0.01)
+    modified = pd.read_csv(catalog)
+    modified.loc[::20, 'sale_price'] += 1
+    modified.to_csv(catalog, index=False)
+    assert process_incremental(load_products(catalog), load_state(), num_workers=1) is None
+
+
+def test_features_independent_of_workers_and_chunks(catalog):
+    df = load_products(catalog)
+    df['product_cluster'] = df['index'] % 7
+    df['extracted_weight'], df['product_name_clean'] = parse_product_names(df['product'])
+    weight_by_cluster = learn_weight_by_cluster(df)
+    df = add_price_percentile(df)
+
+    # Several chunks on a process pool, and one chunk with its stages on threads
+    serial, _ = compute_features_chunked(df, weight_by_cluster, num_workers=1, chunk_rows=150)
+    pooled, records = compute_features_chunked(df, weight_by_cluster, num_workers=3, chunk_rows=150)
+    pd.testing.assert_frame_equal(pooled, serial)
+    assert len(records) == 4 * len(FEATURE_STAGES)
+
+    one_chunk, _ = compute_features_chunked(df, weight_by_cluster, num_workers=1)
+    threaded, _ = compute_features_chunked(df, weight_by_cluster, num_workers=4)
+    pd.testing.assert_frame_equal(threaded, one_chunk)
+    pd.testing.assert_frame_equal(serial, one_chunk)
+
+    # A product's draws do not depend on the other products processed with it
+    subset, _ = compute_features_chunked(df.iloc[::-3], weight_by_cluster)
+    pd.testing.assert_frame_equal(subset, one_chunk.iloc[::-3])
+
+
+def test_randrange_excludes_high():
+    u = np.array([0.0, 0.5, np.nextafter(1.0, 0)])
+    np.testing.assert_array_equal(products.randrange(u, 5, 10), [5, 7, 9])
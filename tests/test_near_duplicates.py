@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+from near_duplicates import find_near_duplicates
+
+NAMES = ['Amul Taaza Toned Milk 500 ml', 'Tata Salt Iodised 1 kg', 'Amul Taaza Toned Milk - 500ml',
+         'Fortune Sunflower Oil 1 L', 'AMUL TAAZA TONED MILK 500 ML', 'Tata Salt, Iodised - 1 kg', '', None, '!!!',
+         'Lays Classic Salted Chips 52 g']
+
+
+def test_near_identical_names_group_under_first_listing():
+    skus = np.array([f"SKU-{i}" for i in range(len(NAMES))])
+    result = find_near_duplicates(NAMES, skus)
+    assert result['sku_id'].tolist() == skus.tolist()
+
+    milk = result.iloc[[0, 2, 4]]
+    assert milk['duplicate_group'].nunique() == 1 and (milk['duplicate_group'] >= 0).all()
+    assert (milk['canonical_sku_id'] == 'SKU-0').all()
+    assert milk['is_canonical'].tolist() == [True, False, False]
+
+    salt = result.iloc[[1, 5]]
+    assert salt['duplicate_group'].nunique() == 1 and (salt['canonical_sku_id'] == 'SKU-1').all()
+    assert salt['duplicate_group'].iloc[0] != milk['duplicate_group'].iloc[0]
+
+    # Distinct items and empty names stay on their own
+    alone = result.iloc[[3, 6, 7, 8, 9]]
+    assert (alone['duplicate_group'] == -1).all() and alone['is_canonical'].all()
+    assert (alone['canonical_sku_id'] == alone['sku_id']).all()
+
+
+def test_groups_do_not_cross_blocks():
+    names = ['Amul Taaza Toned Milk 500 ml'] * 4
+    blocks = ['Dairy', 'Beverages', 'Dairy', 'Beverages']
+    result = find_near_duplicates(names, ['a', 'b', 'c', 'd'], blocks=blocks)
+    assert result['canonical_sku_id'].tolist() == ['a', 'b', 'a', 'b']
+    assert result['duplicate_group'].nunique() == 2
+
+
+def test_empty_catalog():
+    result = find_near_duplicates(pd.Series([], dtype=object), np.array([], dtype=object))
+    assert len(result) == 0
+    assert list(result.columns) == ['sku_id', 'canonical_sku_id', 'duplicate_group', 'is_canonical']
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from payload_io import ParquetStreamWriter, iter_payload, load_payload, save_payload, to_columnar
+
+CATEGORICAL = ['locality', 'tier']
+DTYPES = {'age': 'int8', 'spend': 'float32'}
+
+
+def make_block(start, n, localities):
+    rng = np.random.default_rng(start)
+    return pd.DataFrame({
+        'customer_id': [f"CUST-{i:06d}" for i in range(start, start + n)],
+        'locality': rng.choice(localities, n),
+        'tier': rng.choice(['GOLD', 'SILVER'], n),
+        'age': rng.integers(18, 80, n),
+        'spend': rng.uniform(0, 5000, n).round(2),
+    })
+
+
+@pytest.fixture
+def blocks():
+    # Later blocks bring categories the first block (which fixes the schema) never saw
+    return [make_block(0, 50, ['Kondapur', 'Madhapur']), make_block(50, 40, ['Ameerpet', 'Kondapur']),
+            make_block(90, 30, [f"Area {i}" for i in range(300)])]
+
+
+def as_plain(df):
+    """Compare categoricals by value: each block's dictionary may order categories differently."""
+    return df.astype({col: str for col in CATEGORICAL if col in df.columns})
+
+
+def test_stream_round_trip(blocks, tmp_path):
+    path = str(tmp_path / 'payload.parquet')
+    with ParquetStreamWriter(path, CATEGORICAL, DTYPES) as writer:
+        for block in blocks:
+            writer.write(block)
+    expected = to_columnar(pd.concat(blocks, ignore_index=True), CATEGORICAL, DTYPES)
+
+    loaded = load_payload(path)
+    assert all(isinstance(loaded[col].dtype, pd.CategoricalDtype) for col in CATEGORICAL)
+    pd.testing.assert_frame_equal(as_plain(loaded), as_plain(expected))
+
+    chunks = list(iter_payload(path, columns=['customer_id', 'locality', 'age'], batch_size=25))
+    assert sum(map(len, chunks)) == len(expected) and max(map(len, chunks)) <= 25
+    pd.testing.assert_frame_equal(as_plain(pd.concat(chunks, ignore_index=True)),
+                                  as_plain(expected)[['customer_id', 'locality', 'age']])
+
+
+def test_save_payload_csv_and_parquet_agree(blocks, tmp_path):
+    df = pd.concat(blocks, ignore_index=True)
+    stem = str(tmp_path / 'payload')
+    assert save_payload(df, stem, categorical=CATEGORICAL, dtypes=DTYPES) == [f"{stem}.csv", f"{stem}.parquet"]
+    from_csv = load_payload(f"{stem}.csv", categorical=CATEGORICAL)
+    from_parquet = load_payload(f"{stem}.parquet", columns=['customer_id', 'locality', 'tier'])
+    pd.testing.assert_frame_equal(as_plain(from_csv[from_parquet.columns]), as_plain(from_parquet))
+    assert from_csv['locality'].dtype == 'category'
+    assert load_payload(f"{stem}.parquet")['age'].dtype == np.int8
@@ -0,0 +1,77 @@
+import re
+import numpy as np
+import pandas as pd
+import pytest
+from ml_process_products import parse_product_names
+
+# The column-at-a-time functions parse_product_names replaced, kept as the reference
+OLD_SKIP_PATTERNS = [r'\d+-\d+\s*kg', r'for\s+\d+\s*kg', r'\d+\s*kg\s*\+', r'\d+\s*kg\s*dog']
+OLD_WEIGHT_PATTERNS = [
+    (r'(\d+(?:\.\d+)?)\s*kg\b', 1000),
+    (r'(\d+(?:\.\d+)?)\s*gm?\b', 1),
+    (r'(\d+(?:\.\d+)?)\s*gram', 1),
+    (r'(\d+(?:\.\d+)?)\s*ml\b', 1),
+    (r'(\d+(?:\.\d+)?)\s*l\b(?!a|i|o|u|e)', 1000),
+    (r'(\d+(?:\.\d+)?)\s*litre', 1000),
+]
+OLD_NOISE_PATTERNS = [
+    r'\s*-\s*\d+\s*(?:mg|g|gm|gram|kg|ml|l|litre|liter|pc|pcs|pack)s?\b',
+    r'\s*\d+\s*(?:mg|g|gm|gram|kg|ml|l|litre|liter|pc|pcs|pack)s?\s*$',
+    r'\s*\d+-\d+\s*(?:kg|g)\s*',
+    r'\s*(?:vegetarian\s+)?capsule\s*',
+    r'\s*\(pack of \d+\)\s*',
+    r'\s*\(\s*\)',
+]
+
+
+def old_extract_weight_ml(names):
+    names = names.fillna('').astype(str).str.lower()
+    for pattern in OLD_SKIP_PATTERNS:
+        names = names.str.replace(pattern, '', regex=True)
+    weight = pd.Series(np.nan, index=names.index)
+    for pattern, multiplier in OLD_WEIGHT_PATTERNS:
+        matches = names.str.extractall(pattern)[0].astype(float)
+        weights = np.trunc(matches * multiplier)
+        weights = weights[(weights >= 5) & (weights <= 25000)]
+        weight = weight.fillna(weights.groupby(level=0).max())
+    return weight
+
+
+def old_clean_name(name):
+    if pd.isna(name):
+        return ''
+    name = str(name)
+    for pattern in OLD_NOISE_PATTERNS:
+        name = re.sub(pattern, '', name, flags=re.IGNORECASE)
+    return ' '.join(name.split()).strip()
+
+
+NAMES = [
+    'Amul Taaza Toned Milk 500 ml', 'Aashirvaad Atta 5 kg', 'Fortune Oil 1 L', 'Sunfeast Biscuits 2 x 75 g',
+    'Pampers Diapers (6-11 kg) - 42 pcs', 'Pedigree Dog Food for 25 kg dogs 3 kg', 'Tata Salt 1kg + 200 g Free',
+    'Bisleri Water 1 Litre', 'Lays Chips 52g', 'Himalaya Capsule 60 Vegetarian Capsule', 'Maggi Noodles (Pack of 4)',
+    'Dettol Soap 125 gm - 3 pcs', 'Rice 0.5 kg', 'Ghee 1 ltr', 'Curd 400 grams', 'Lemon 250g-500g', 'Paneer 200 G',
+    'Onion 1.5 Kg', 'Coke 2.25 l', 'Sugar 30 kg', 'Cardamom 2 g', 'Jam ()', 'Chocolate 0.004 kg', 'Shampoo 1 lakh',
+    'Milk 1 l, Curd 1 kg', '  Spaced   Name  10 ml ', '', None, float('nan'),
+]
+
+
+def token_corpus(n=5000, seed=0):
+    """Fixed randomized names mixing numbers, units, ranges and noise tokens."""
+    rng = np.random.default_rng(seed)
+    tokens = ['milk', 'for', 'dog', '+', '-', '(pack of 3)', '()', 'capsule', 'vegetarian', 'x', 'pcs', 'pack',
+              'kg', 'g', 'gm', 'gram', 'grams', 'ml', 'l', 'la', 'litre', 'liter', 'mg', 'KG', 'L']
+    numbers = ['1', '5', '10', '0.5', '2.25', '500', '6-11', '25', '30000', '1.5']
+    names = []
+    for _ in range(n):
+        parts = rng.choice(tokens + numbers, size=rng.integers(1, 8))
+        names.append(''.join(p + rng.choice(['', ' ', '  ']) for p in parts))
+    return names
+
+
+@pytest.mark.parametrize('names', [NAMES, token_corpus()], ids=['catalog', 'tokens'])
+def test_parser_matches_old_functions(names):
+    names = pd.Series(names, dtype=object)
+    weights, clean = parse_product_names(names)
+    pd.testing.assert_series_equal(weights, old_extract_weight_ml(names), check_names=False)
+    assert clean.tolist() == names.apply(old_clean_name).tolist()
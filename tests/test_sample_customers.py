@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from counter_rng import CounterRNG
+from sample_customers import STRATA, allocate, count_strata, stratified_sample
+
+N = 3000
+FRACTION = 0.05
+
+
+@pytest.fixture(scope='module')
+def payload(tmp_path_factory):
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({
+        'customer_id': [f"CUST-{i:05d}" for i in range(N)],
+        'customer_segment': rng.choice(['STUDENT', 'FAMILY', 'YOUNG_PROFESSIONAL'], N, p=[.2, .5, .3]),
+        'locality': rng.choice(['Gachibowli', 'Kondapur', 'Banjara Hills'], N, p=[.45, .45, .1]),
+        'income_bracket': rng.choice(['LOW', 'MEDIUM', 'HIGH'], N, p=[.3, .6, .1]),
+        'age': rng.integers(18, 70, N),
+    })
+    path = tmp_path_factory.mktemp('sample') / 'customer_profiles.csv'
+    df.to_csv(path, index=False)
+    return df, str(path)
+
+
+def test_sample_is_deterministic_and_independent_of_chunking(payload):
+    _, path = payload
+    sample = stratified_sample(path, FRACTION, seed=7, chunk_size=211)
+    pd.testing.assert_frame_equal(sample, stratified_sample(path, FRACTION, seed=7, chunk_size=211))
+    pd.testing.assert_frame_equal(sample, stratified_sample(path, FRACTION, seed=7, chunk_size=N))
+    assert not sample['customer_id'].equals(stratified_sample(path, FRACTION, seed=8, chunk_size=211)['customer_id'])
+
+
+def test_strata_sizes_and_weights(payload):
+    df, path = payload
+    sample = stratified_sample(path, FRACTION, seed=7, chunk_size=211)
+    population = df.groupby(STRATA).size()
+    sizes = sample.groupby(STRATA).size()
+    expected_sizes = allocate(count_strata(path, chunk_size=211), FRACTION)
+    pd.testing.assert_series_equal(sizes, expected_sizes.reindex(sizes.index), check_names=False)
+    assert len(sizes) == len(population)  # every stratum, however small, is represented
+    weights = sample.groupby(STRATA)['sample_weight'].sum()
+    pd.testing.assert_series_equal(weights, population.astype(float), check_names=False)
+    assert sample['sample_weight'].sum() == pytest.approx(N)
+
+
+def test_sample_is_bottom_k_of_row_keys(payload):
+    df, path = payload
+    sample = stratified_sample(path, FRACTION, seed=7, chunk_size=211)
+    keys = df.assign(_key=CounterRNG(7, np.arange(N)).random(N)).sort_values('_key', kind='stable')
+    sizes = allocate(count_strata(path), FRACTION)
+    rank = keys.groupby(STRATA).cumcount()
+    quota = sizes.reindex(pd.MultiIndex.from_frame(keys[STRATA])).to_numpy()
+    expected = keys[rank.to_numpy() < quota].sort_index()
+    assert sample['customer_id'].tolist() == expected['customer_id'].tolist()
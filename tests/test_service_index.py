@@ -0,0 +1,53 @@
+import os
+import numpy as np
+import pytest
+from conftest import PAYLOAD
+from geo import StoreLocator, load_stores
+from service_index import ServiceIndex
+
+
+@pytest.fixture(scope='module')
+def stores():
+    return load_stores(os.path.join(PAYLOAD, 'blinkit_stores_master.csv'))
+
+
+@pytest.fixture(scope='module')
+def index(stores):
+    return ServiceIndex.from_stores(stores)
+
+
+@pytest.fixture(scope='module')
+def points(stores):
+    """Points around and between the stores, some beyond every store, and the stores themselves."""
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(stores['latitude'].min() - 0.15, stores['latitude'].max() + 0.15, 100_000)
+    lngs = rng.uniform(stores['longitude'].min() - 0.15, stores['longitude'].max() + 0.15, 100_000)
+    return (np.concatenate([lats, stores['latitude'], [0.0, 17.4]]),
+            np.concatenate([lngs, stores['longitude'], [0.0, 80.0]]))
+
+
+@pytest.mark.parametrize('k, max_km', [(1, None), (1, 2.0), (3, None), (3, 0.5), (60, None)])
+def test_nearest_equals_store_locator(stores, index, points, k, max_km):
+    positions, distances = index.nearest(*points, k=k, max_km=max_km)
+    expected_positions, expected_distances = StoreLocator.from_stores(stores).nearest(
+        *points, k=k, max_km=index.radius_km if max_km is None else max_km)
+    assert (positions == expected_positions).all()
+    np.testing.assert_allclose(distances, expected_distances, rtol=1e-5, atol=1e-6)
+    assert (positions >= 0).any() and (positions < 0).any()
+
+
+def test_assign_and_round_trip(stores, index, points, tmp_path):
+    store_ids, distances = index.assign(*points)
+    expected_ids, expected_distances = StoreLocator.from_stores(stores).assign(*points)
+    assert (store_ids == expected_ids).all()
+    np.testing.assert_allclose(distances, expected_distances, atol=1e-3)
+
+    path = str(tmp_path / 'index.npz')
+    index.save(path)
+    loaded = ServiceIndex.load(path)
+    assert (loaded.assign(*points)[0] == store_ids).all()
+
+
+def test_max_km_beyond_index_radius(index):
+    with pytest.raises(ValueError):
+        index.nearest([17.4], [78.4], max_km=index.radius_km + 1)
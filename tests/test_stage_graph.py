@@ -0,0 +1,68 @@
+import importlib
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+import stage_graph
+from stage_graph import Stage, plan, run_stages
+
+STAGES_SOURCE = '''
+import helper
+
+
+def double(frame):
+    return helper.scale(frame['x'].to_numpy())
+'''
+
+
+@pytest.fixture
+def stage_module(tmp_path, monkeypatch):
+    """A stage function whose result depends on a helper module beside it."""
+    (tmp_path / 'helper.py').write_text('def scale(x):\n    return x * 2\n')
+    (tmp_path / 'stages_mod.py').write_text(STAGES_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+    for name in ('helper', 'stages_mod'):
+        sys.modules.pop(name, None)
+    stage_graph._code_key.cache_clear()
+    stage_graph._source_key.cache_clear()
+
+
+def run(cache_dir, version=None):
+    stages_mod = importlib.import_module('stages_mod')
+    df = pd.DataFrame({'x': np.arange(5)})
+    return run_stages(df, [Stage('double', stages_mod.double, ['x'], ['y'], version=version)],
+                      cache_dir=cache_dir)
+
+
+def test_plan_levels():
+    stages = [Stage('c', None, ['b'], ['c']), Stage('b', None, ['a'], ['b']), Stage('d', None, ['a'], ['d'])]
+    assert [[s.name for s in level] for level in plan(stages, {'a'})] == [['b', 'd'], ['c']]
+    with pytest.raises(ValueError):
+        plan([Stage('e', None, ['missing'], ['e'])], {'a'})
+
+
+def test_no_cache_by_default(stage_module, monkeypatch):
+    monkeypatch.chdir(stage_module)
+    df, records = run_stages(pd.DataFrame({'x': np.arange(5)}),
+                             [Stage('double', importlib.import_module('stages_mod').double, ['x'], ['y'])])
+    assert records[0]['cached_chunks'] == 0
+    assert not any(name.startswith('.') for name in os.listdir(stage_module))
+
+
+def test_cache_tracks_helper_modules_and_version(stage_module):
+    cache_dir = str(stage_module / 'cache')
+    assert run(cache_dir)[1][0]['cached_chunks'] == 0
+    df, records = run(cache_dir)
+    assert records[0]['cached_chunks'] == 1 and df['y'].tolist() == [0, 2, 4, 6, 8]
+    assert run(cache_dir, version=2)[1][0]['cached_chunks'] == 0
+
+    # Editing the helper (not the stage's own module) invalidates the cached outputs
+    (stage_module / 'helper.py').write_text('def scale(x):\n    return x * 3\n')
+    sys.modules.pop('helper')
+    importlib.reload(sys.modules['stages_mod'])
+    stage_graph._code_key.cache_clear()
+    stage_graph._source_key.cache_clear()
+    df, records = run(cache_dir)
+    assert records[0]['cached_chunks'] == 0 and df['y'].tolist() == [0, 3, 6, 9, 12]
@@ -0,0 +1,52 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import PAYLOAD
+from store_graph import EDGE_FILES, RouteTable, load_edges
+
+
+@pytest.fixture(scope='module')
+def edges():
+    return load_edges({os.path.join(PAYLOAD, path): columns for path, columns in EDGE_FILES.items()})
+
+
+@pytest.fixture(scope='module')
+def routes(edges):
+    return RouteTable.build(edges)
+
+
+def test_routes_follow_roads_and_add_up_to_distance(edges, routes):
+    road = {(a, b): d for a, b, d in edges.itertuples(index=False)}
+    road.update({(b, a): d for (a, b), d in list(road.items())})
+    for origin in routes.node_ids:
+        for destination in routes.node_ids:
+            route = routes.route(origin, destination)
+            assert route[0] == origin and route[-1] == destination
+            assert len(set(route)) == len(route)
+            length = sum(road[pair] for pair in zip(route, route[1:]))
+            assert length == pytest.approx(routes.distance(origin, destination), rel=1e-5, abs=1e-5)
+
+
+def test_distances_are_shortest(edges, routes):
+    d = routes.distances_between(routes.node_ids[:, None], routes.node_ids[None, :])
+    assert (np.diag(d) == 0).all() and np.allclose(d, d.T)
+    # No road is a shortcut, and no detour through a third node is either
+    assert (routes.distances_between(edges['from_node'], edges['to_node']) <= edges['distance_km'] + 1e-4).all()
+    assert (d[:, None, :] <= d[:, :, None] + d[None, :, :] + 1e-3).all()
+
+
+def test_unreachable_and_unknown_nodes():
+    routes = RouteTable.build(pd.DataFrame({'from_node': [1, 3], 'to_node': [2, 4], 'distance_km': [1.5, 2.0]}))
+    assert routes.route(1, 2) == [1, 2] and routes.route(2, 2) == [2]
+    assert routes.route(1, 4) == [] and np.isinf(routes.distance(1, 4))
+    with pytest.raises(KeyError):
+        routes.distance(1, 99)
+
+
+def test_save_load_round_trip(routes, tmp_path):
+    path = str(tmp_path / 'routes.npz')
+    routes.save(path)
+    loaded = RouteTable.load(path)
+    a, b = routes.node_ids[0], routes.node_ids[-1]
+    assert loaded.route(a, b) == routes.route(a, b) and loaded.distance(a, b) == routes.distance(a, b)
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from scipy import sparse
+import substitute_index
+from substitute_index import SubstituteIndex, build_substitute_index
+
+N = 80
+TIERS = np.array(['BUDGET', 'MID', 'PREMIUM'])
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    rng = np.random.default_rng(0)
+    dense = rng.random((N, 40)) * (rng.random((N, 40)) < 0.3)
+    dense[0] = 0  # a product with no terms
+    norms = np.linalg.norm(dense, axis=1, keepdims=True)
+    dense = np.divide(dense, norms, out=np.zeros_like(dense), where=norms > 0)
+    blocks = np.where(np.arange(N) < 3, 'tiny', np.where(np.arange(N) % 2, 'odd', 'even'))
+    return {'matrix': sparse.csr_matrix(dense), 'dense': dense.astype(np.float32), 'blocks': blocks,
+            'skus': np.array([f"SKU-{i:03d}" for i in range(N)]),
+            'prices': rng.integers(20, 500, N).astype(np.float32), 'tiers': TIERS[rng.integers(0, 3, N)]}
+
+
+@pytest.fixture(scope='module', params=[2**24, 500], ids=['one-block', 'chunked'])
+def index(catalog, request):
+    original = substitute_index.MAX_CHUNK_CELLS
+    substitute_index.MAX_CHUNK_CELLS = request.param
+    try:
+        yield build_substitute_index(catalog['matrix'], catalog['skus'], catalog['prices'], catalog['tiers'],
+                                     blocks=catalog['blocks'])
+    finally:
+        substitute_index.MAX_CHUNK_CELLS = original
+
+
+def brute_force(catalog, k, keep=lambda row, other: True):
+    """Top-k (positions, scores) by dense cosine similarity within the row's block."""
+    similarity = catalog['dense'] @ catalog['dense'].T
+    positions = np.full((N, k), -1)
+    scores = np.zeros((N, k), dtype=np.float32)
+    for row in range(N):
+        others = [o for o in np.argsort(-similarity[row], kind='stable')
+                  if o != row and catalog['blocks'][o] == catalog['blocks'][row] and keep(row, o)][:k]
+        positions[row, :len(others)] = others
+        scores[row, :len(others)] = similarity[row, others]
+    return positions, scores
+
+
+def check(index, catalog, k, keep=lambda row, other: True, **filters):
+    positions, scores = index.query_batch(catalog['skus'], k, **filters)
+    expected_positions, expected_scores = brute_force(catalog, k, keep)
+    np.testing.assert_allclose(scores, expected_scores, atol=1e-5)
+    # Ties may come in either order: check each returned substitute is admissible and
+    # carries its true similarity, so equal scores with different positions still pass
+    similarity = catalog['dense'] @ catalog['dense'].T
+    for row in range(N):
+        found = positions[row][positions[row] >= 0]
+        assert len(set(found)) == len(found) == (expected_positions[row] >= 0).sum()
+        assert all(o != row and catalog['blocks'][o] == catalog['blocks'][row] and keep(row, o) for o in found)
+        np.testing.assert_allclose(similarity[row, found], scores[row, :len(found)], atol=1e-5)
+    return positions
+
+
+def test_top_k_matches_brute_force(index, catalog):
+    positions = check(index, catalog, 5)
+    # The 3-product block has only 2 substitutes per product: padded with -1
+    assert (positions[:3, 2:] == -1).all() and (positions[3:] >= 0).all()
+
+
+def test_filters(index, catalog):
+    prices, tiers = catalog['prices'], catalog['tiers']
+    check(index, catalog, 4, lambda r, o: 0.8 <= prices[o] / prices[r] <= 1.5,
+          min_price_ratio=0.8, max_price_ratio=1.5)
+    check(index, catalog, 4, lambda r, o: tiers[o] in ('BUDGET', 'MID'), brand_tiers=['BUDGET', 'MID'])
+    check(index, catalog, 4, lambda r, o: tiers[o] == tiers[r], same_tier=True)
+
+
+def test_query_and_round_trip(index, catalog, tmp_path):
+    path = str(tmp_path / 'substitutes.npz')
+    index.save(path)
+    loaded = SubstituteIndex.load(path)
+    for sku in catalog['skus'][::7]:
+        assert loaded.query(sku, 3, same_tier=True) == index.query(sku, 3, same_tier=True)
+    positions, scores = index.query_batch([catalog['skus'][10]], 3)
+    assert index.query(catalog['skus'][10], 3) == [(index.sku_ids[p], float(s)) for p, s in
+                                                    zip(positions[0], scores[0])]
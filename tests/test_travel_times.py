@@ -0,0 +1,53 @@
+import os
+import numpy as np
+import pytest
+from conftest import PAYLOAD
+from city_config import DEFAULT_CONFIG, load_config
+from geo import haversine_km, load_stores
+from store_graph import EDGE_FILES, RouteTable, load_edges
+from travel_times import HOUR_BUCKETS, ROAD_CIRCUITY, VEHICLE_SPEEDS, TravelTimeTable
+
+
+@pytest.fixture(scope='module')
+def setup(tmp_path_factory):
+    routes = RouteTable.build(load_edges({os.path.join(PAYLOAD, path): columns
+                                          for path, columns in EDGE_FILES.items()}))
+    nodes = load_stores(os.path.join(PAYLOAD, 'blinkit_stores_master.csv'), store_type=None)
+    areas = [area for group in load_config(DEFAULT_CONFIG)['areas'].values() for area in group]
+    localities = {'latitude': np.array([a[1] for a in areas]), 'longitude': np.array([a[2] for a in areas])}
+    directory = tmp_path_factory.mktemp('travel')
+    times_path, grid_path = str(directory / 'travel_times.npy'), str(directory / 'grid.npz')
+    TravelTimeTable.build(routes, nodes, localities).save(times_path, grid_path)
+    return routes, nodes, TravelTimeTable.load(times_path, grid_path)
+
+
+def expected_seconds(routes, nodes, table, a, b, hour, vehicle):
+    """The travel-time formula, recomputed with haversine_km and RouteTable.distance."""
+    cells = table.cells(nodes['latitude'].iloc[[a, b]], nodes['longitude'].iloc[[a, b]])
+    lats, lngs = table.cell_lats[cells], table.cell_lngs[cells]
+    if cells[0] == cells[1]:
+        direct = haversine_km(0, 0, 0, table.tile) / 2
+    else:
+        direct = haversine_km(lats[0], lngs[0], lats[1], lngs[1])
+    to_node = haversine_km(lats[:, None], lngs[:, None], nodes['latitude'].to_numpy(), nodes['longitude'].to_numpy())
+    nearest = to_node.argmin(axis=1)
+    access = to_node[[0, 1], nearest] * ROAD_CIRCUITY
+    network = routes.distance(nodes['node_id'].iloc[nearest[0]], nodes['node_id'].iloc[nearest[1]])
+    road_km = min(direct * ROAD_CIRCUITY, access[0] + network + access[1])
+    bucket = next(m for first, last, m in HOUR_BUCKETS.values() if first <= hour <= last)
+    return road_km / (bucket * VEHICLE_SPEEDS[vehicle]) * 3600
+
+
+def test_table_is_memory_mapped_int16(setup):
+    _, _, table = setup
+    assert isinstance(table.times, np.memmap) and table.times.dtype == np.int16
+    assert table.times.shape[2:] == (len(HOUR_BUCKETS), len(VEHICLE_SPEEDS))
+
+
+@pytest.mark.parametrize('a, b, hour, vehicle', [(0, 1, 8, 'TRUCK'), (0, 5, 2, 'TRUCK'), (1, 2, 18, 'BIKE'),
+                                                 (3, 7, 13, 'CYCLE'), (4, 4, 23, 'SCOOTER')])
+def test_store_pairs_match_routes_and_formula(setup, a, b, hour, vehicle):
+    routes, nodes, table = setup
+    got = table.query(nodes['latitude'].iloc[a], nodes['longitude'].iloc[a],
+                      nodes['latitude'].iloc[b], nodes['longitude'].iloc[b], hour, vehicle)
+    assert got == pytest.approx(expected_seconds(routes, nodes, table, a, b, hour, vehicle), abs=1)
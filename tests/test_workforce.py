@@ -0,0 +1,58 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import PAYLOAD
+from geo import StoreLocator
+from update_stores_and_profiles import build_pickers, build_riders, load_dark_stores, store_headcounts
+
+
+@pytest.fixture(scope='module')
+def dark_stores():
+    return load_dark_stores(pd.read_csv(os.path.join(PAYLOAD, 'blinkit_darkstores_nodes.csv')))
+
+
+@pytest.fixture
+def headcounts_csv(tmp_path):
+    path = tmp_path / 'headcounts.csv'
+    pd.DataFrame({'store_id': ['HYD-DS-001', 'HYD-DS-002', 'HYD-DS-003'],
+                  'riders': [400, 0, None], 'pickers': [None, 5, 0]}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_headcount_overrides(dark_stores, headcounts_csv):
+    riders = store_headcounts(dark_stores, 20, 'riders', headcounts_csv)
+    pickers = store_headcounts(dark_stores, 10, 'pickers', headcounts_csv)
+    assert riders[:3].tolist() == [400, 0, 20] and (riders[3:] == 20).all()
+    assert pickers[:3].tolist() == [10, 5, 0] and (pickers[3:] == 10).all()
+
+
+def test_unknown_store_in_headcounts(dark_stores, tmp_path):
+    path = tmp_path / 'headcounts.csv'
+    pd.DataFrame({'store_id': ['HYD-XX-001'], 'riders': [10]}).to_csv(path, index=False)
+    with pytest.raises(ValueError):
+        store_headcounts(dark_stores, 20, 'riders', str(path))
+
+
+@pytest.mark.parametrize('per_store', [20, 150])
+def test_riders_match_headcounts(dark_stores, headcounts_csv, per_store):
+    headcounts = store_headcounts(dark_stores, per_store, 'riders', headcounts_csv)
+    riders = build_riders(dark_stores, headcounts, np.random.default_rng(0))
+
+    counts = riders['home_store_id'].value_counts().reindex(dark_stores['store_id'], fill_value=0)
+    assert counts.tolist() == headcounts.tolist()
+    assert riders['rider_id'].is_unique
+
+    # The home store is also the dark store nearest to where the rider lives
+    locator = StoreLocator(dark_stores['store_id'], dark_stores['lat'], dark_stores['lng'])
+    nearest = locator.store_ids[locator.nearest(riders['home_lat'], riders['home_lng'])[0][:, 0]]
+    assert (nearest == riders['home_store_id'].to_numpy()).all()
+
+
+def test_pickers_match_headcounts(dark_stores, headcounts_csv):
+    headcounts = store_headcounts(dark_stores, 30, 'pickers', headcounts_csv)
+    pickers = build_pickers(dark_stores, headcounts, np.random.default_rng(0))
+
+    counts = pickers['store_id'].value_counts().reindex(dark_stores['store_id'], fill_value=0)
+    assert counts.tolist() == headcounts.tolist()
+    assert pickers['picker_id'].is_unique
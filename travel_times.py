@@ -0,0 +1,178 @@
+"""
+Time-of-Day Travel-Time Lookup Tables
+Precomputes travel times between the cells of a lat/lng grid over the dark
+stores and customer localities, for every hour-of-day bucket and vehicle type,
+as one int16 array [origin cell, destination cell, hour bucket, vehicle type]
+that is memory-mapped at load and queried in vectorized batches
+Road distance between cells: the shorter of the direct distance times a
+circuity factor and the route through the dark-store road graph
+Outputs: travel_times.npy (seconds), travel_time_grid.npz (grid and labels)
+"""
+
+import numpy as np
+from geo import StoreLocator, distance_matrix, load_stores
+from store_graph import RouteTable, load_edges
+from city_config import DEFAULT_CONFIG, load_config
+
+TIMES_FILE = 'travel_times.npy'
+GRID_FILE = 'travel_time_grid.npz'
+
+TILE_DEG = 0.01  # ~1.1 km grid tiles
+LOCALITY_SPREAD_DEG = 0.008  # customers are placed within this of their locality centroid
+ROAD_CIRCUITY = 1.3  # road km per straight-line km off the store graph
+
+# Free-flow speeds (km/h)
+VEHICLE_SPEEDS = {
+    'BIKE': 28,
+    'SCOOTER': 25,
+    'ELECTRIC_SCOOTER': 22,
+    'CYCLE': 12,
+    'TRUCK': 30,  # warehouse replenishment
+}
+
+# Hour-of-day buckets: (first hour, last hour, speed multiplier for congestion)
+HOUR_BUCKETS = {
+    'NIGHT': (0, 5, 1.25),
+    'MORNING_PEAK': (6, 10, 0.70),
+    'MIDDAY': (11, 16, 0.90),
+    'EVENING_PEAK': (17, 21, 0.65),
+    'LATE_EVENING': (22, 23, 1.00),
+}
+
+
+def hour_bucket_index():
+    """Bucket position of each hour 0-23."""
+    buckets = np.full(24, -1, dtype=np.int8)
+    for i, (first, last, _) in enumerate(HOUR_BUCKETS.values()):
+        buckets[first:last + 1] = i
+    if (buckets < 0).any():
+        raise ValueError(f"HOUR_BUCKETS leave hours {np.flatnonzero(buckets < 0).tolist()} uncovered")
+    return buckets
+
+
+def active_tiles(store_lats, store_lngs, locality_lats, locality_lngs, tile=TILE_DEG, spread=LOCALITY_SPREAD_DEG):
+    """Sorted unique (row, col) tiles (as floor(coordinate / tile)) holding a store or a locality's customers."""
+    rows = [np.floor(np.asarray(store_lats) / tile).astype(np.int64)]
+    cols = [np.floor(np.asarray(store_lngs) / tile).astype(np.int64)]
+    for lat, lng in zip(locality_lats, locality_lngs):
+        r = np.arange(np.floor((lat - spread) / tile), np.floor((lat + spread) / tile) + 1, dtype=np.int64)
+        c = np.arange(np.floor((lng - spread) / tile), np.floor((lng + spread) / tile) + 1, dtype=np.int64)
+        rows.append(np.repeat(r, len(c)))
+        cols.append(np.tile(c, len(r)))
+    return np.unique(np.column_stack([np.concatenate(rows), np.concatenate(cols)]), axis=0)
+
+
+class TravelTimeTable:
+    """Travel seconds between grid cells by hour bucket and vehicle type.
+
+    Points map to cells through a dense tile -> cell lookup over the grid's
+    bounding box (tiles without a cell point to the nearest cell; points
+    outside the box are clamped to its edge), so every lookup is constant time.
+    """
+
+    def __init__(self, times, tile, row0, col0, tile_cell, cell_lats, cell_lngs, vehicle_types):
+        self.times = times
+        self.tile = tile
+        self.row0 = row0
+        self.col0 = col0
+        self.tile_cell = tile_cell
+        self.cell_lats = cell_lats
+        self.cell_lngs = cell_lngs
+        self.vehicle_types = vehicle_types
+        self.vehicle_index = {v: i for i, v in enumerate(vehicle_types)}
+        self.hour_buckets = hour_bucket_index()
+
+    @classmethod
+    def build(cls, routes, nodes, localities, tile=TILE_DEG):
+        """Build from a RouteTable, its nodes (node_id/latitude/longitude) and localities (latitude/longitude)."""
+        tiles = active_tiles(nodes['latitude'], nodes['longitude'], localities['latitude'], localities['longitude'],
+                             tile)
+        cell_lats, cell_lngs = (tiles[:, 0] + 0.5) * tile, (tiles[:, 1] + 0.5) * tile
+
+        # Road km: direct (x circuity) or via the nearest graph nodes and the shortest graph route
+        direct = distance_matrix(cell_lats, cell_lngs, cell_lats, cell_lngs)
+        np.fill_diagonal(direct, distance_matrix([0], [0], [0], [tile])[0, 0] / 2)  # trips within a cell
+        locator = StoreLocator(nodes['node_id'], nodes['latitude'], nodes['longitude'])
+        node_position, access = (a[:, 0] for a in locator.nearest(cell_lats, cell_lngs))
+        node_ids = nodes['node_id'].to_numpy()[node_position]
+        network = routes.distances_between(node_ids[:, None], node_ids[None, :])
+        access = access * ROAD_CIRCUITY
+        road_km = np.minimum(direct * ROAD_CIRCUITY, access[:, None] + network + access[None, :])
+
+        speeds = np.array(list(VEHICLE_SPEEDS.values()), dtype=np.float32)
+        congestion = np.array([m for _, _, m in HOUR_BUCKETS.values()], dtype=np.float32)
+        seconds = road_km[:, :, None, None] / (congestion[:, None] * speeds[None, :]) * 3600
+        times = np.minimum(np.round(seconds), np.iinfo(np.int16).max).astype(np.int16)
+
+        # Dense tile -> cell lookup over the bounding box
+        row0, col0 = tiles.min(axis=0)
+        n_rows, n_cols = tiles.max(axis=0) - (row0, col0) + 1
+        grid_rows, grid_cols = np.divmod(np.arange(n_rows * n_cols), n_cols)
+        nearest_cell = StoreLocator(np.arange(len(tiles)), cell_lats, cell_lngs).nearest(
+            (grid_rows + row0 + 0.5) * tile, (grid_cols + col0 + 0.5) * tile)[0][:, 0]
+        tile_cell = nearest_cell.reshape(n_rows, n_cols).astype(np.int32)
+        return cls(times, tile, int(row0), int(col0), tile_cell, cell_lats, cell_lngs,
+                   np.array(list(VEHICLE_SPEEDS)))
+
+    def save(self, times_path=TIMES_FILE, grid_path=GRID_FILE):
+        np.save(times_path, self.times)
+        np.savez(grid_path, tile=self.tile, row0=self.row0, col0=self.col0, tile_cell=self.tile_cell,
+                 cell_lats=self.cell_lats, cell_lngs=self.cell_lngs, vehicle_types=self.vehicle_types)
+
+    @classmethod
+    def load(cls, times_path=TIMES_FILE, grid_path=GRID_FILE):
+        """Load with the time table memory-mapped (read-only), so only queried pages are read."""
+        with np.load(grid_path) as grid:
+            return cls(np.load(times_path, mmap_mode='r'), float(grid['tile']), int(grid['row0']),
+                       int(grid['col0']), grid['tile_cell'], grid['cell_lats'], grid['cell_lngs'],
+                       grid['vehicle_types'])
+
+    def cells(self, lats, lngs):
+        """Cell of every point."""
+        rows = np.floor(np.asarray(lats, dtype=float) / self.tile).astype(np.int64) - self.row0
+        cols = np.floor(np.asarray(lngs, dtype=float) / self.tile).astype(np.int64) - self.col0
+        n_rows, n_cols = self.tile_cell.shape
+        return self.tile_cell[np.clip(rows, 0, n_rows - 1), np.clip(cols, 0, n_cols - 1)]
+
+    def query_cells(self, origin_cells, dest_cells, hours, vehicle_types):
+        """Travel seconds for batches of (origin cell, destination cell, hour 0-23, vehicle type name)."""
+        names, inverse = np.unique(np.asarray(vehicle_types), return_inverse=True)
+        vehicles = np.array([self.vehicle_index[v] for v in names])[inverse].reshape(np.shape(vehicle_types))
+        buckets = self.hour_buckets[np.asarray(hours) % 24]
+        return self.times[origin_cells, dest_cells, buckets, vehicles]
+
+    def query(self, origin_lats, origin_lngs, dest_lats, dest_lngs, hours, vehicle_types):
+        """Travel seconds for batches of coordinate pairs; arguments broadcast."""
+        return self.query_cells(self.cells(origin_lats, origin_lngs), self.cells(dest_lats, dest_lngs),
+                                hours, vehicle_types)
+
+
+def main():
+    print("="*70)
+    print("BUILDING TRAVEL-TIME LOOKUP TABLES")
+    print("="*70)
+
+    routes = RouteTable.build(load_edges())
+    nodes = load_stores('blinkit_stores_master.csv', store_type=None)
+    areas = [area for group in load_config(DEFAULT_CONFIG)['areas'].values() for area in group]
+    localities = {'latitude': np.array([a[1] for a in areas]), 'longitude': np.array([a[2] for a in areas])}
+
+    table = TravelTimeTable.build(routes, nodes, localities)
+    table.save()
+    n_cells = len(table.cell_lats)
+    print(f"\nCells: {n_cells} ({TILE_DEG} deg tiles), hour buckets: {len(HOUR_BUCKETS)}, "
+          f"vehicle types: {len(VEHICLE_SPEEDS)}")
+    print(f"Table: {table.times.shape}, {table.times.nbytes / 2**20:.1f} MB int16")
+
+    # Example: warehouse to every dark store by truck at 8:00 and 2:00
+    warehouse, stores = nodes.iloc[:1], nodes.iloc[1:]
+    for hour in (8, 2):
+        minutes = table.query(warehouse['latitude'].iloc[0], warehouse['longitude'].iloc[0],
+                              stores['latitude'], stores['longitude'], hour, 'TRUCK') / 60
+        print(f"Warehouse -> dark stores by truck at {hour:02d}:00: "
+              f"{minutes.mean():.0f} min avg, {minutes.max():.0f} min max")
+    print(f"\nSaved: {TIMES_FILE}, {GRID_FILE}")
+
+
+if __name__ == '__main__':
+    main()
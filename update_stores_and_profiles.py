@@ -4,35 +4,46 @@ Update Store System and Regenerate Profiles
 - Add a master warehouse outside the city
 - Update rider and picker profiles to use these stores
 - Create warehouse-to-darkstore connections
+- Cache store x store and store x locality distance matrices (geo_distances.npz)
+- Riders and pickers are generated column by column, with configurable
+  headcounts per dark store (--riders-per-store, --pickers-per-store, or a
+  --headcounts CSV of store_id plus riders and/or pickers columns)
+- Riders live in their home store's catchment, so it is also the dark store
+  nearest to where they live
 """
 
+import argparse
 import pandas as pd
 import numpy as np
-import hashlib
 import random
-from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
-
-np.random.seed(42)
-random.seed(42)
-
-print("="*70)
-print("STORE SYSTEM UPDATE & PROFILE REGENERATION")
-print("="*70)
+from id_allocator import allocate_ids
+from payload_io import save_payload
+from geo import DISTANCES_FILE, StoreLocator, haversine_km, save_distance_matrices
+from city_config import DEFAULT_CONFIG, load_config
+from draws import TWO_DIGITS, flatten, randint, to_str, uniform, uniform_index, weighted_index
+
+SEED = 42
+OUTPUT_FORMATS = ['csv', 'parquet']
+RIDERS_PER_STORE = 150
+PICKERS_PER_STORE = 80
+HOME_JITTER_DEG = 0.01  # riders live within ~1 km of their home store
+HOME_PLACEMENT_ROUNDS = 20  # redraws of homes that land nearer another store
+
+# Low-cardinality string columns, dictionary-encoded in Parquet output
+STORE_CATEGORICALS = ['store_type', 'zone', 'opening_time', 'closing_time']
+RIDER_CATEGORICALS = ['first_name', 'last_name', 'gender', 'community', 'vehicle_type', 'vehicle_model',
+                      'home_store_id', 'home_store_name', 'service_zone', 'store_location', 'rider_segment',
+                      'shift_type', 'shift_start', 'shift_end', 'join_date', 'status', 'last_active',
+                      'peak_hour_preference']
+PICKER_CATEGORICALS = ['first_name', 'last_name', 'gender', 'community', 'store_id', 'store_name',
+                       'store_location', 'service_zone', 'picker_segment', 'role', 'shift_type',
+                       'shift_start', 'shift_end', 'join_date', 'status', 'last_active',
+                       'multitask_ability', 'physical_fitness']
 
 # =============================================================================
-# LOAD EXISTING DARK STORE DATA
-# =============================================================================
-
-nodes_df = pd.read_csv('blinkit_darkstores_nodes.csv')
-edges_df = pd.read_csv('blinkit_darkstores_edges.csv')
-
-print(f"\nLoaded {len(nodes_df)} dark store locations")
-print(f"Loaded {len(edges_df)} store-to-store connections")
-
-# =============================================================================
-# CREATE MASTER WAREHOUSE (Outside city - Shamshabad near Airport)
+# MASTER WAREHOUSE (Outside city - Shamshabad near Airport)
 # =============================================================================
 
 MASTER_WAREHOUSE = {
@@ -48,121 +59,6 @@ MASTER_WAREHOUSE = {
     'daily_dispatch_capacity': 500000  # units
 }
 
-print(f"\nMaster Warehouse: {MASTER_WAREHOUSE['Location']}")
-print(f"  Coordinates: {MASTER_WAREHOUSE['Latitude']}, {MASTER_WAREHOUSE['Longitude']}")
-
-# =============================================================================
-# CREATE UNIFIED STORE MASTER TABLE
-# =============================================================================
-
-# Generate store IDs for all dark stores
-stores = []
-
-# Add Master Warehouse first
-stores.append({
-    'store_id': 'HYD-MW-001',
-    'node_id': 0,
-    'store_name': 'Shamshabad Master Warehouse',
-    'store_type': 'MASTER_WAREHOUSE',
-    'location': 'Shamshabad',
-    'zone': 'Master_Warehouse',
-    'latitude': 17.2403,
-    'longitude': 78.4294,
-    'capacity_sqft': 150000,
-    'cold_storage_sqft': 25000,
-    'loading_docks': 20,
-    'daily_order_capacity': 0,  # Doesn't fulfill orders directly
-    'is_active': True,
-    'opening_time': '00:00',
-    'closing_time': '23:59',
-    'operating_hours': 24,
-})
-
-# Add all dark stores from nodes
-for _, row in nodes_df.iterrows():
-    node_id = row['Node_ID']
-    location = row['Location']
-    zone = row['Zone']
-    
-    # Determine store capacity based on zone (IT hubs get larger stores)
-    if zone in ['West', 'Northwest']:
-        capacity = random.randint(3000, 5000)
-        order_capacity = random.randint(800, 1200)
-    elif zone in ['Central', 'Southwest']:
-        capacity = random.randint(2500, 4000)
-        order_capacity = random.randint(600, 1000)
-    else:
-        capacity = random.randint(2000, 3500)
-        order_capacity = random.randint(400, 800)
-    
-    stores.append({
-        'store_id': f'HYD-DS-{node_id:03d}',
-        'node_id': node_id,
-        'store_name': f'{location} Dark Store',
-        'store_type': 'DARK_STORE',
-        'location': location,
-        'zone': zone,
-        'latitude': row['Latitude'],
-        'longitude': row['Longitude'],
-        'capacity_sqft': capacity,
-        'cold_storage_sqft': int(capacity * 0.15),
-        'loading_docks': random.randint(2, 4),
-        'daily_order_capacity': order_capacity,
-        'is_active': True,
-        'opening_time': '06:00',
-        'closing_time': '00:00',
-        'operating_hours': 18,
-    })
-
-stores_df = pd.DataFrame(stores)
-stores_df.to_csv('blinkit_stores_master.csv', index=False)
-print(f"\nCreated store master with {len(stores_df)} stores")
-print(f"  - 1 Master Warehouse")
-print(f"  - {len(stores_df)-1} Dark Stores")
-
-# =============================================================================
-# CREATE WAREHOUSE TO DARKSTORE CONNECTIONS
-# =============================================================================
-
-# Calculate distances from master warehouse to each dark store
-def haversine_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance in km between two coordinates"""
-    R = 6371  # Earth's radius in km
-    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
-    c = 2 * np.arcsin(np.sqrt(a))
-    return R * c
-
-warehouse_connections = []
-mw_lat, mw_lon = MASTER_WAREHOUSE['Latitude'], MASTER_WAREHOUSE['Longitude']
-
-for _, row in nodes_df.iterrows():
-    distance = haversine_distance(mw_lat, mw_lon, row['Latitude'], row['Longitude'])
-    
-    # Estimate travel time (assuming avg 30 km/h for trucks in city traffic)
-    travel_time_mins = (distance / 30) * 60
-    
-    warehouse_connections.append({
-        'from_node_id': 0,
-        'to_node_id': row['Node_ID'],
-        'from_location': 'Shamshabad Master Warehouse',
-        'to_location': row['Location'],
-        'distance_km': round(distance, 2),
-        'travel_time_mins': round(travel_time_mins, 0),
-        'route_type': 'WAREHOUSE_TO_DARKSTORE',
-        'from_zone': 'Master_Warehouse',
-        'to_zone': row['Zone'],
-    })
-
-warehouse_edges_df = pd.DataFrame(warehouse_connections)
-warehouse_edges_df.to_csv('blinkit_warehouse_connections.csv', index=False)
-print(f"\nCreated {len(warehouse_edges_df)} warehouse-to-darkstore connections")
-print(f"  Avg distance: {warehouse_edges_df['distance_km'].mean():.1f} km")
-print(f"  Max distance: {warehouse_edges_df['distance_km'].max():.1f} km")
-print(f"  Min distance: {warehouse_edges_df['distance_km'].min():.1f} km")
-
 # =============================================================================
 # NAME DATABASE FOR PROFILES
 # =============================================================================
@@ -206,78 +102,214 @@ SCOOTER_MODELS = [('Honda Activa 6G', 'SCOOTER', 110), ('TVS Jupiter', 'SCOOTER'
 CYCLE_MODELS = [('Hero Sprint', 'CYCLE', 0), ('Hercules Roadsters', 'CYCLE', 0)]
 
 # =============================================================================
-# HELPER FUNCTIONS
+# HELPER FUNCTIONS (column-wise: each call fills a whole column)
 # =============================================================================
 
-def generate_rider_id():
-    return f"RDR-{hashlib.md5(str(random.random()).encode()).hexdigest()[:8].upper()}"
-
-def generate_picker_id():
-    return f"PKR-{hashlib.md5(str(random.random()).encode()).hexdigest()[:8].upper()}"
-
-def generate_phone():
-    prefixes = ['98', '97', '96', '95', '94', '93', '91', '90', '89', '88', '87', '86', '85', '84', '83', '82', '81', '80', '79', '78', '77', '76', '75', '74', '73', '72', '71', '70']
-    return f"+91{random.choice(prefixes)}{random.randint(10000000, 99999999)}"
-
-def generate_email(first_name, last_name, birth_year):
-    domains = ['gmail.com', 'gmail.com', 'gmail.com', 'yahoo.com', 'rediffmail.com']
-    patterns = [f"{first_name.lower()}{random.randint(1, 999)}", f"{first_name.lower()}.{last_name.lower()}", f"{first_name.lower()}{str(birth_year)[-2:]}"]
-    return f"{random.choice(patterns)}@{random.choice(domains)}"
-
-def get_name(gender, community):
-    if community == 'telugu':
-        return (random.choice(TELUGU_MALE_NAMES), random.choice(TELUGU_SURNAMES)) if gender == 'M' else (random.choice(TELUGU_FEMALE_NAMES), random.choice(TELUGU_SURNAMES))
-    elif community == 'muslim':
-        return (random.choice(MUSLIM_MALE_NAMES), random.choice(MUSLIM_SURNAMES)) if gender == 'M' else (random.choice(MUSLIM_FEMALE_NAMES), random.choice(MUSLIM_SURNAMES))
-    else:
-        return (random.choice(NORTH_INDIAN_MALE_NAMES), random.choice(NORTH_INDIAN_SURNAMES)) if gender == 'M' else (random.choice(NORTH_INDIAN_FEMALE_NAMES), random.choice(NORTH_INDIAN_SURNAMES))
-
-def generate_vehicle_number(vehicle_type):
-    districts = ['09', '10', '11', '12', '13', '14', '07', '08']
-    letters = 'ABCDEFGHJKLMNPQRSTUVWXYZ'
-    if vehicle_type == 'CYCLE':
-        return 'N/A'
-    return f"TS{random.choice(districts)}{random.choice(letters)}{random.choice(letters)}{random.randint(1000, 9999)}"
-
-def get_vehicle(vehicle_distribution):
-    vehicle_type = random.choices(list(vehicle_distribution.keys()), weights=list(vehicle_distribution.values()))[0]
-    if vehicle_type == 'BIKE':
-        model, vtype, cc = random.choice(BIKE_MODELS)
-    elif vehicle_type in ['SCOOTER', 'ELECTRIC_SCOOTER']:
-        if vehicle_type == 'ELECTRIC_SCOOTER':
-            model, vtype, cc = random.choice([m for m in SCOOTER_MODELS if m[1] == 'ELECTRIC_SCOOTER'])
-        else:
-            model, vtype, cc = random.choice([m for m in SCOOTER_MODELS if m[1] == 'SCOOTER'])
-    else:
-        model, vtype, cc = random.choice(CYCLE_MODELS)
-    return model, vtype, cc
-
-def generate_shift_times(shift_type):
-    if shift_type == 'FULL_TIME':
-        shifts = [('06:00', '14:00'), ('07:00', '15:00'), ('10:00', '18:00'), ('12:00', '20:00'), ('14:00', '22:00'), ('16:00', '00:00')]
-    elif shift_type == 'PART_TIME':
-        shifts = [('06:00', '10:00'), ('10:00', '14:00'), ('14:00', '18:00'), ('18:00', '22:00'), ('19:00', '23:00'), ('20:00', '00:00')]
-    else:
-        shifts = [('09:00', '13:00'), ('10:00', '14:00'), ('14:00', '18:00')]
-    return random.choice(shifts)
+COMMUNITIES = ['telugu', 'muslim', 'north']
+COMMUNITY_WEIGHTS = [0.55, 0.30, 0.15]
+
+# First names indexed by community * 2 + is_female, surnames by community
+FIRST_NAMES, FIRST_NAME_OFFSETS, FIRST_NAME_SIZES = flatten([
+    TELUGU_MALE_NAMES, TELUGU_FEMALE_NAMES, MUSLIM_MALE_NAMES, MUSLIM_FEMALE_NAMES,
+    NORTH_INDIAN_MALE_NAMES, NORTH_INDIAN_FEMALE_NAMES])
+SURNAMES, SURNAME_OFFSETS, SURNAME_SIZES = flatten([TELUGU_SURNAMES, MUSLIM_SURNAMES, NORTH_INDIAN_SURNAMES])
+FIRST_NAMES_LOWER = np.array([n.lower() for n in FIRST_NAMES], dtype=object)
+SURNAMES_LOWER = np.array([n.lower() for n in SURNAMES], dtype=object)
+
+PHONE_PREFIXES = np.array(['98', '97', '96', '95', '94', '93', '91', '90', '89', '88', '87', '86', '85', '84',
+                           '83', '82', '81', '80', '79', '78', '77', '76', '75', '74', '73', '72', '71', '70'],
+                          dtype=object)
+EMAIL_DOMAINS = np.array(['gmail.com', 'gmail.com', 'gmail.com', 'yahoo.com', 'rediffmail.com'], dtype=object)
+DISTRICTS = np.array(['09', '10', '11', '12', '13', '14', '07', '08'], dtype=object)
+PLATE_LETTERS = np.array(list('ABCDEFGHJKLMNPQRSTUVWXYZ'), dtype=object)
+
+# Vehicle models (model, vehicle type, engine cc) indexed by position in VEHICLE_TYPES
+VEHICLE_TYPES = ['BIKE', 'SCOOTER', 'ELECTRIC_SCOOTER', 'CYCLE']
+VEHICLE_MODELS, VEHICLE_MODEL_OFFSETS, VEHICLE_MODEL_SIZES = flatten(
+    [[m for m in BIKE_MODELS + SCOOTER_MODELS + CYCLE_MODELS if m[1] == t] for t in VEHICLE_TYPES])
+
+SHIFTS = {
+    'FULL_TIME': [('06:00', '14:00'), ('07:00', '15:00'), ('10:00', '18:00'), ('12:00', '20:00'), ('14:00', '22:00'), ('16:00', '00:00')],
+    'PART_TIME': [('06:00', '10:00'), ('10:00', '14:00'), ('14:00', '18:00'), ('18:00', '22:00'), ('19:00', '23:00'), ('20:00', '00:00')],
+    'TRAINING': [('09:00', '13:00'), ('10:00', '14:00'), ('14:00', '18:00')],
+}
+
+JOIN_REFERENCE = np.datetime64('2024-12-01')
+LAST_ACTIVE_REFERENCE = np.datetime64('2024-12-04T00:00')
+
+
+def get_names(draw, is_female, community):
+    """First and surname indices (into FIRST_NAMES / SURNAMES) per community and gender."""
+    table = community * 2 + is_female
+    first_idx = FIRST_NAME_OFFSETS[table] + uniform_index(draw(), FIRST_NAME_SIZES[table])
+    last_idx = SURNAME_OFFSETS[community] + uniform_index(draw(), SURNAME_SIZES[community])
+    return first_idx, last_idx
+
+
+def generate_phones(draw):
+    return '+91' + PHONE_PREFIXES[uniform_index(draw(), len(PHONE_PREFIXES))] + to_str(randint(draw(), 10000000, 99999999))
+
+
+def generate_emails(draw, first_idx, last_idx, birth_year):
+    first, last = FIRST_NAMES_LOWER[first_idx], SURNAMES_LOWER[last_idx]
+    patterns = [first + to_str(randint(draw(), 1, 999)), first + '.' + last, first + TWO_DIGITS[birth_year % 100]]
+    return np.choose(uniform_index(draw(), len(patterns)), patterns) + '@' + EMAIL_DOMAINS[uniform_index(draw(), len(EMAIL_DOMAINS))]
+
+
+def generate_vehicle_numbers(draw, vehicle_type):
+    plate = ('TS' + DISTRICTS[uniform_index(draw(), len(DISTRICTS))]
+             + PLATE_LETTERS[uniform_index(draw(), len(PLATE_LETTERS))]
+             + PLATE_LETTERS[uniform_index(draw(), len(PLATE_LETTERS))] + to_str(randint(draw(), 1000, 9999)))
+    return np.where(vehicle_type == 'CYCLE', 'N/A', plate).astype(object)
+
+
+def get_vehicles(draw, vehicle_distribution):
+    """(model, vehicle type, engine cc) columns; the type by the segment's weights, then a model of that type."""
+    type_codes = np.array([VEHICLE_TYPES.index(t) for t in vehicle_distribution])
+    code = type_codes[weighted_index(draw(), list(vehicle_distribution.values()))]
+    model = VEHICLE_MODELS[VEHICLE_MODEL_OFFSETS[code] + uniform_index(draw(), VEHICLE_MODEL_SIZES[code])]
+    return model[:, 0], model[:, 1], model[:, 2].astype(np.int64)
+
+
+def generate_shift_times(draw, shift_type):
+    shifts = np.array(SHIFTS[shift_type], dtype=object)[uniform_index(draw(), len(SHIFTS[shift_type]))]
+    return shifts[:, 0], shifts[:, 1]
+
+
+def join_dates(experience_months):
+    return np.datetime_as_string(JOIN_REFERENCE - experience_months * 30, unit='D').astype(object)
+
+
+def last_active_times(hours_ago):
+    stamps = np.datetime_as_string(LAST_ACTIVE_REFERENCE - hours_ago.astype('timedelta64[h]'), unit='m')
+    return np.char.replace(stamps, 'T', ' ').astype(object)
+
+
+def store_headcounts(dark_stores, per_store, column, path=None):
+    """Profiles per dark store (dark_stores order): per_store, or the store's `column` value in a headcount CSV."""
+    counts = pd.Series(per_store, index=dark_stores['store_id'].to_numpy())
+    if path is not None:
+        overrides = pd.read_csv(path, index_col='store_id')
+        if column in overrides:
+            values = overrides[column].dropna()
+            unknown = values.index.difference(counts.index)
+            if len(unknown):
+                raise ValueError(f"{path}: unknown dark stores {sorted(unknown)}")
+            counts[values.index] = values.astype(int)
+    if (counts < 0).any():
+        raise ValueError(f"Negative {column} headcounts for {counts.index[counts < 0].tolist()}")
+    return counts.to_numpy()
+
+
+def segment_counts(segments, total, remainder_segment):
+    """Profiles per segment in proportion to the weights; rounding leftovers go to remainder_segment."""
+    total_weight = sum(s['weight'] for s in segments.values())
+    counts = {name: int(total * seg['weight'] / total_weight) for name, seg in segments.items()}
+    counts[remainder_segment] += total - sum(counts.values())
+    return counts
+
 
 # =============================================================================
-# DARK STORES LIST (from nodes, excluding master warehouse)
+# DARK STORES (from nodes, excluding master warehouse)
 # =============================================================================
 
-DARK_STORES = []
-for _, row in nodes_df.iterrows():
-    DARK_STORES.append({
-        'store_id': f"HYD-DS-{row['Node_ID']:03d}",
-        'node_id': row['Node_ID'],
-        'name': f"{row['Location']} Dark Store",
-        'location': row['Location'],
-        'zone': row['Zone'],
-        'lat': row['Latitude'],
-        'lng': row['Longitude'],
+def load_dark_stores(nodes_df):
+    """One row per dark store: store_id, node_id, name, location, zone, lat, lng."""
+    return pd.DataFrame({
+        'store_id': [f"HYD-DS-{node_id:03d}" for node_id in nodes_df['Node_ID']],
+        'node_id': nodes_df['Node_ID'].to_numpy(),
+        'name': (nodes_df['Location'] + ' Dark Store').to_numpy(),
+        'location': nodes_df['Location'].to_numpy(),
+        'zone': nodes_df['Zone'].to_numpy(),
+        'lat': nodes_df['Latitude'].to_numpy(),
+        'lng': nodes_df['Longitude'].to_numpy(),
+    })
+
+
+def build_store_master(nodes_df):
+    """The master warehouse plus every dark store, with capacities drawn from `random`."""
+    stores = []
+
+    # Add Master Warehouse first
+    stores.append({
+        'store_id': 'HYD-MW-001',
+        'node_id': 0,
+        'store_name': 'Shamshabad Master Warehouse',
+        'store_type': 'MASTER_WAREHOUSE',
+        'location': 'Shamshabad',
+        'zone': 'Master_Warehouse',
+        'latitude': 17.2403,
+        'longitude': 78.4294,
+        'capacity_sqft': 150000,
+        'cold_storage_sqft': 25000,
+        'loading_docks': 20,
+        'daily_order_capacity': 0,  # Doesn't fulfill orders directly
+        'is_active': True,
+        'opening_time': '00:00',
+        'closing_time': '23:59',
+        'operating_hours': 24,
+    })
+
+    # Add all dark stores from nodes
+    for _, row in nodes_df.iterrows():
+        node_id = row['Node_ID']
+        location = row['Location']
+        zone = row['Zone']
+
+        # Determine store capacity based on zone (IT hubs get larger stores)
+        if zone in ['West', 'Northwest']:
+            capacity = random.randint(3000, 5000)
+            order_capacity = random.randint(800, 1200)
+        elif zone in ['Central', 'Southwest']:
+            capacity = random.randint(2500, 4000)
+            order_capacity = random.randint(600, 1000)
+        else:
+            capacity = random.randint(2000, 3500)
+            order_capacity = random.randint(400, 800)
+
+        stores.append({
+            'store_id': f'HYD-DS-{node_id:03d}',
+            'node_id': node_id,
+            'store_name': f'{location} Dark Store',
+            'store_type': 'DARK_STORE',
+            'location': location,
+            'zone': zone,
+            'latitude': row['Latitude'],
+            'longitude': row['Longitude'],
+            'capacity_sqft': capacity,
+            'cold_storage_sqft': int(capacity * 0.15),
+            'loading_docks': random.randint(2, 4),
+            'daily_order_capacity': order_capacity,
+            'is_active': True,
+            'opening_time': '06:00',
+            'closing_time': '00:00',
+            'operating_hours': 18,
+        })
+
+    return pd.DataFrame(stores)
+
+
+def build_warehouse_connections(nodes_df):
+    """One road from the master warehouse to every dark store."""
+    # Distances from master warehouse to every dark store at once
+    mw_lat, mw_lon = MASTER_WAREHOUSE['Latitude'], MASTER_WAREHOUSE['Longitude']
+    distance = haversine_km(mw_lat, mw_lon, nodes_df['Latitude'].to_numpy(), nodes_df['Longitude'].to_numpy())
+
+    # Estimate travel time (assuming avg 30 km/h for trucks in city traffic)
+    travel_time_mins = (distance / 30) * 60
+
+    return pd.DataFrame({
+        'from_node_id': 0,
+        'to_node_id': nodes_df['Node_ID'],
+        'from_location': 'Shamshabad Master Warehouse',
+        'to_location': nodes_df['Location'],
+        'distance_km': np.round(distance, 2),
+        'travel_time_mins': np.round(travel_time_mins, 0),
+        'route_type': 'WAREHOUSE_TO_DARKSTORE',
+        'from_zone': 'Master_Warehouse',
+        'to_zone': nodes_df['Zone'],
     })
 
-print(f"\nUsing {len(DARK_STORES)} dark stores for profiles")
 
 # =============================================================================
 # RIDER SEGMENTS - 97-99% MALE
@@ -364,251 +396,346 @@ PICKER_SEGMENTS = {
 }
 
 # =============================================================================
-# GENERATE RIDERS (~150 per store)
+# GENERATE RIDERS (150 per store unless configured)
 # =============================================================================
 
-NUM_RIDERS = len(DARK_STORES) * 150  # ~8550 riders
-print(f"\n{'='*70}")
-print(f"GENERATING {NUM_RIDERS:,} RIDER PROFILES")
-print(f"{'='*70}")
-
-total_weight = sum(s['weight'] for s in RIDER_SEGMENTS.values())
-rider_segment_counts = {name: int(NUM_RIDERS * seg['weight'] / total_weight) for name, seg in RIDER_SEGMENTS.items()}
-diff = NUM_RIDERS - sum(rider_segment_counts.values())
-rider_segment_counts['FULL_TIME_REGULAR'] += diff
-
-riders = []
-for segment_name, segment in RIDER_SEGMENTS.items():
-    count = rider_segment_counts[segment_name]
-    print(f"  Generating {segment_name}: {count} riders...")
-    
-    for _ in range(count):
-        gender = 'M' if random.random() < segment['gender_ratio'] else 'F'
-        age = random.randint(*segment['age_range'])
-        birth_year = 2024 - age
-        community = random.choices(['telugu', 'muslim', 'north'], weights=[0.55, 0.30, 0.15])[0]
-        first_name, last_name = get_name(gender, community)
-        experience_months = random.randint(*segment['experience_months_range'])
-        join_date = datetime(2024, 12, 1) - timedelta(days=experience_months * 30)
-        vehicle_model, vehicle_type, engine_cc = get_vehicle(segment['vehicle_distribution'])
-        vehicle_number = generate_vehicle_number(vehicle_type)
-        home_store = random.choice(DARK_STORES)
-        shift_start, shift_end = generate_shift_times(segment['shift_type'])
-        on_time_rate = round(random.uniform(*segment['on_time_rate_range']), 3)
-        acceptance_rate = round(random.uniform(*segment['acceptance_rate_range']), 3)
-        cancellation_rate = round(random.uniform(*segment['cancellation_rate_range']), 3)
-        avg_delivery_time = round(random.uniform(*segment['avg_delivery_time_range']), 1)
-        daily_orders = random.randint(*segment['daily_orders_range'])
-        rating = round(random.uniform(*segment['rating_range']), 2)
-        earnings_per_order = random.uniform(*segment['earnings_per_order_range'])
-        days_worked = int(experience_months * 22 * random.uniform(0.7, 0.95))
-        total_orders = int(days_worked * daily_orders * random.uniform(0.8, 1.1))
-        total_earnings = int(total_orders * earnings_per_order)
-        
-        if experience_months < 1: status = 'TRAINING'
-        elif cancellation_rate > 0.15 or on_time_rate < 0.70: status = 'PROBATION'
-        elif on_time_rate > 0.92 and rating > 4.5: status = 'STAR_PERFORMER'
-        else: status = 'ACTIVE'
-        
-        last_active = datetime(2024, 12, 4) - timedelta(hours=random.randint(0, 48)) if status in ['ACTIVE', 'STAR_PERFORMER'] else datetime(2024, 12, 4) - timedelta(days=random.randint(0, 7))
-        
-        riders.append({
-            'rider_id': generate_rider_id(),
-            'first_name': first_name,
-            'last_name': last_name,
-            'full_name': f"{first_name} {last_name}",
-            'gender': gender,
-            'age': age,
-            'phone_number': generate_phone(),
-            'email': generate_email(first_name, last_name, birth_year),
-            'community': community.upper(),
-            'vehicle_type': vehicle_type,
-            'vehicle_model': vehicle_model,
-            'vehicle_number': vehicle_number,
-            'engine_cc': engine_cc,
-            'home_store_id': home_store['store_id'],
-            'home_store_node_id': home_store['node_id'],
-            'home_store_name': home_store['name'],
-            'service_zone': home_store['zone'],
-            'store_location': home_store['location'],
-            'home_lat': round(home_store['lat'] + random.uniform(-0.01, 0.01), 6),
-            'home_lng': round(home_store['lng'] + random.uniform(-0.01, 0.01), 6),
-            'rider_segment': segment_name,
-            'shift_type': segment['shift_type'],
-            'shift_start': shift_start,
-            'shift_end': shift_end,
-            'experience_months': experience_months,
-            'join_date': join_date.strftime('%Y-%m-%d'),
-            'status': status,
-            'last_active': last_active.strftime('%Y-%m-%d %H:%M'),
-            'on_time_delivery_rate': on_time_rate,
-            'order_acceptance_rate': acceptance_rate,
-            'cancellation_rate': cancellation_rate,
-            'avg_delivery_time_mins': avg_delivery_time,
-            'customer_rating': rating,
-            'total_orders_delivered': total_orders,
-            'daily_avg_orders': daily_orders,
-            'total_earnings': total_earnings,
-            'avg_earnings_per_order': round(earnings_per_order, 2),
-            'peak_hour_preference': random.choice(['MORNING', 'AFTERNOON', 'EVENING', 'NIGHT']),
-            'weekend_availability': random.choice([True, True, True, False]),
-            'has_insulated_bag': random.choice([True, True, True, True, False]),
-            'has_rain_gear': random.choice([True, True, False]),
-            'knows_english': random.choice([True, True, False, False, False]),
-            'knows_hindi': True,
-            'knows_telugu': community == 'telugu' or random.random() < 0.6,
-        })
+def generate_riders(segment_name, segment, dark_stores, home_store, rng):
+    """Riders of one segment, column by column; home_store holds their dark_stores positions."""
+    n = len(home_store)
+
+    def draw():
+        return rng.random(n)
+
+    is_female = draw() >= segment['gender_ratio']
+    age = randint(draw(), *segment['age_range'])
+    birth_year = 2024 - age
+    community = weighted_index(draw(), COMMUNITY_WEIGHTS)
+    first_idx, last_idx = get_names(draw, is_female, community)
+    first_name, last_name = FIRST_NAMES[first_idx], SURNAMES[last_idx]
+    experience_months = randint(draw(), *segment['experience_months_range'])
+    vehicle_model, vehicle_type, engine_cc = get_vehicles(draw, segment['vehicle_distribution'])
+    shift_start, shift_end = generate_shift_times(draw, segment['shift_type'])
+    on_time_rate = np.round(uniform(draw(), *segment['on_time_rate_range']), 3)
+    acceptance_rate = np.round(uniform(draw(), *segment['acceptance_rate_range']), 3)
+    cancellation_rate = np.round(uniform(draw(), *segment['cancellation_rate_range']), 3)
+    avg_delivery_time = np.round(uniform(draw(), *segment['avg_delivery_time_range']), 1)
+    daily_orders = randint(draw(), *segment['daily_orders_range'])
+    rating = np.round(uniform(draw(), *segment['rating_range']), 2)
+    earnings_per_order = uniform(draw(), *segment['earnings_per_order_range'])
+    days_worked = (experience_months * 22 * uniform(draw(), 0.7, 0.95)).astype(np.int64)
+    total_orders = (days_worked * daily_orders * uniform(draw(), 0.8, 1.1)).astype(np.int64)
+    total_earnings = (total_orders * earnings_per_order).astype(np.int64)
+
+    status = np.select([experience_months < 1, (cancellation_rate > 0.15) | (on_time_rate < 0.70),
+                        (on_time_rate > 0.92) & (rating > 4.5)],
+                       ['TRAINING', 'PROBATION', 'STAR_PERFORMER'], default='ACTIVE').astype(object)
+    hours_ago = np.where(np.isin(status, ['ACTIVE', 'STAR_PERFORMER']), randint(draw(), 0, 48), randint(draw(), 0, 7) * 24)
+
+    return pd.DataFrame({
+        'first_name': first_name,
+        'last_name': last_name,
+        'full_name': first_name + ' ' + last_name,
+        'gender': np.where(is_female, 'F', 'M').astype(object),
+        'age': age,
+        'phone_number': generate_phones(draw),
+        'email': generate_emails(draw, first_idx, last_idx, birth_year),
+        'community': np.array([c.upper() for c in COMMUNITIES], dtype=object)[community],
+        'vehicle_type': vehicle_type,
+        'vehicle_model': vehicle_model,
+        'vehicle_number': generate_vehicle_numbers(draw, vehicle_type),
+        'engine_cc': engine_cc,
+        'home_lat': np.round(dark_stores['lat'].to_numpy()[home_store] + uniform(draw(), -HOME_JITTER_DEG, HOME_JITTER_DEG), 6),
+        'home_lng': np.round(dark_stores['lng'].to_numpy()[home_store] + uniform(draw(), -HOME_JITTER_DEG, HOME_JITTER_DEG), 6),
+        'rider_segment': segment_name,
+        'shift_type': segment['shift_type'],
+        'shift_start': shift_start,
+        'shift_end': shift_end,
+        'experience_months': experience_months,
+        'join_date': join_dates(experience_months),
+        'status': status,
+        'last_active': last_active_times(hours_ago),
+        'on_time_delivery_rate': on_time_rate,
+        'order_acceptance_rate': acceptance_rate,
+        'cancellation_rate': cancellation_rate,
+        'avg_delivery_time_mins': avg_delivery_time,
+        'customer_rating': rating,
+        'total_orders_delivered': total_orders,
+        'daily_avg_orders': daily_orders,
+        'total_earnings': total_earnings,
+        'avg_earnings_per_order': np.round(earnings_per_order, 2),
+        'peak_hour_preference': np.array(['MORNING', 'AFTERNOON', 'EVENING', 'NIGHT'], dtype=object)[uniform_index(draw(), 4)],
+        'weekend_availability': draw() < 3 / 4,
+        'has_insulated_bag': draw() < 4 / 5,
+        'has_rain_gear': draw() < 2 / 3,
+        'knows_english': draw() < 2 / 5,
+        'knows_hindi': True,
+        'knows_telugu': (community == COMMUNITIES.index('telugu')) | (draw() < 0.6),
+    })
+
+
+def place_homes(dark_stores, home_store, lats, lngs, rng, rounds=HOME_PLACEMENT_ROUNDS):
+    """Redraw the homes that lie nearer another dark store than their home store.
+
+    Redrawn homes keep the same jitter around the home store; homes still
+    misplaced after `rounds` move onto the store itself.
+    """
+    store_lats, store_lngs = dark_stores['lat'].to_numpy(), dark_stores['lng'].to_numpy()
+    locator = StoreLocator(dark_stores['store_id'], store_lats, store_lngs)
+    lats, lngs = lats.copy(), lngs.copy()
+    for _ in range(rounds):
+        misplaced = np.flatnonzero(locator.nearest(lats, lngs)[0][:, 0] != home_store)
+        if not len(misplaced):
+            return lats, lngs
+        stores = home_store[misplaced]
+        lats[misplaced] = np.round(store_lats[stores] + uniform(rng.random(len(stores)), -HOME_JITTER_DEG, HOME_JITTER_DEG), 6)
+        lngs[misplaced] = np.round(store_lngs[stores] + uniform(rng.random(len(stores)), -HOME_JITTER_DEG, HOME_JITTER_DEG), 6)
+    misplaced = np.flatnonzero(locator.nearest(lats, lngs)[0][:, 0] != home_store)
+    lats[misplaced], lngs[misplaced] = store_lats[home_store[misplaced]], store_lngs[home_store[misplaced]]
+    return lats, lngs
+
+
+def build_riders(dark_stores, headcounts, rng):
+    """Exactly headcounts[i] riders homed at dark store i, shuffled, with rider IDs."""
+    segment_sizes = segment_counts(RIDER_SEGMENTS, int(headcounts.sum()), 'FULL_TIME_REGULAR')
+
+    # Every store's headcount, spread over the segments at random
+    home_stores = rng.permutation(np.repeat(np.arange(len(dark_stores)), headcounts))
+    starts = np.concatenate([[0], np.cumsum(list(segment_sizes.values()))])
+
+    riders = []
+    for (segment_name, segment), start, end in zip(RIDER_SEGMENTS.items(), starts[:-1], starts[1:]):
+        print(f"  Generating {segment_name}: {end - start} riders...")
+        riders.append(generate_riders(segment_name, segment, dark_stores, home_stores[start:end], rng))
+    riders_df = pd.concat(riders, ignore_index=True)
+
+    riders_df['home_lat'], riders_df['home_lng'] = place_homes(
+        dark_stores, home_stores, riders_df['home_lat'].to_numpy(), riders_df['home_lng'].to_numpy(), rng)
+    home_position = riders_df.columns.get_loc('home_lat')
+    for offset, (column, key) in enumerate([('home_store_id', 'store_id'), ('home_store_node_id', 'node_id'),
+                                            ('home_store_name', 'name'), ('service_zone', 'zone'),
+                                            ('store_location', 'location')]):
+        riders_df.insert(home_position + offset, column, dark_stores[key].to_numpy()[home_stores])
+    riders_df.insert(0, 'rider_id', allocate_ids('RDR', np.arange(len(riders_df)), 'rider', SEED))
+    return riders_df.sample(frac=1, random_state=42).reset_index(drop=True)
 
-riders_df = pd.DataFrame(riders)
-riders_df = riders_df.sample(frac=1, random_state=42).reset_index(drop=True)
-riders_df.to_csv('rider_profiles_new.csv', index=False)
-print(f"\nSaved {len(riders_df):,} riders to rider_profiles_new.csv")
 
 # =============================================================================
-# GENERATE PICKERS (~80 per store)
+# GENERATE PICKERS (80 per store unless configured)
 # =============================================================================
 
-NUM_PICKERS = len(DARK_STORES) * 80  # ~4560 pickers
-print(f"\n{'='*70}")
-print(f"GENERATING {NUM_PICKERS:,} PICKER PROFILES")
-print(f"{'='*70}")
-
-total_weight = sum(s['weight'] for s in PICKER_SEGMENTS.values())
-picker_segment_counts = {name: int(NUM_PICKERS * seg['weight'] / total_weight) for name, seg in PICKER_SEGMENTS.items()}
-diff = NUM_PICKERS - sum(picker_segment_counts.values())
-picker_segment_counts['PART_TIME_STUDENT'] += diff
-
-pickers = []
-for segment_name, segment in PICKER_SEGMENTS.items():
-    count = picker_segment_counts[segment_name]
-    print(f"  Generating {segment_name}: {count} pickers...")
-    
-    for _ in range(count):
-        gender = 'M' if random.random() < segment['gender_ratio'] else 'F'
-        age = random.randint(*segment['age_range'])
-        birth_year = 2024 - age
-        community = random.choices(['telugu', 'muslim', 'north'], weights=[0.55, 0.30, 0.15])[0]
-        first_name, last_name = get_name(gender, community)
-        experience_months = random.randint(*segment['experience_months_range'])
-        join_date = datetime(2024, 12, 1) - timedelta(days=experience_months * 30)
-        assigned_store = random.choice(DARK_STORES)
-        shift_start, shift_end = generate_shift_times(segment['shift_type'])
-        
-        if experience_months >= 18 and segment_name == 'FULL_TIME_SENIOR':
-            role = random.choice(['SENIOR_PICKER', 'TEAM_LEAD', 'QUALITY_CHECKER'])
-        elif experience_months >= 6: role = 'PICKER'
-        else: role = 'TRAINEE_PICKER'
-        
-        avg_pick_time = round(random.uniform(*segment['avg_pick_time_range']), 1)
-        daily_orders = random.randint(*segment['daily_orders_range'])
-        accuracy_rate = round(random.uniform(*segment['accuracy_rate_range']), 4)
-        items_per_hour = random.randint(*segment['items_per_hour_range'])
-        days_worked = int(experience_months * 22 * random.uniform(0.7, 0.95))
-        total_orders = int(days_worked * daily_orders * random.uniform(0.8, 1.1))
-        avg_items_per_order = random.randint(4, 12)
-        total_items_picked = total_orders * avg_items_per_order
-        mispick_rate = round(1 - accuracy_rate, 4)
-        total_mispicks = int(total_items_picked * mispick_rate)
-        hourly_rate = random.uniform(*segment['hourly_rate'])
-        hours_per_day = 8 if segment['shift_type'] == 'FULL_TIME' else 4
-        total_hours = days_worked * hours_per_day
-        total_earnings = int(total_hours * hourly_rate)
-        
-        if experience_months < 1: status = 'TRAINING'
-        elif accuracy_rate < 0.94: status = 'PROBATION'
-        elif accuracy_rate > 0.995 and items_per_hour > 200: status = 'STAR_PERFORMER'
-        else: status = 'ACTIVE'
-        
-        last_active = datetime(2024, 12, 4) - timedelta(hours=random.randint(0, 72))
-        
-        pickers.append({
-            'picker_id': generate_picker_id(),
-            'first_name': first_name,
-            'last_name': last_name,
-            'full_name': f"{first_name} {last_name}",
-            'gender': gender,
-            'age': age,
-            'phone_number': generate_phone(),
-            'email': generate_email(first_name, last_name, birth_year),
-            'community': community.upper(),
-            'store_id': assigned_store['store_id'],
-            'store_node_id': assigned_store['node_id'],
-            'store_name': assigned_store['name'],
-            'store_location': assigned_store['location'],
-            'service_zone': assigned_store['zone'],
-            'picker_segment': segment_name,
-            'role': role,
-            'shift_type': segment['shift_type'],
-            'shift_start': shift_start,
-            'shift_end': shift_end,
-            'experience_months': experience_months,
-            'join_date': join_date.strftime('%Y-%m-%d'),
-            'status': status,
-            'last_active': last_active.strftime('%Y-%m-%d %H:%M'),
-            'avg_picking_time_sec': avg_pick_time,
-            'items_per_hour': items_per_hour,
-            'daily_orders_picked': daily_orders,
-            'accuracy_rate': accuracy_rate,
-            'mispick_rate': mispick_rate,
-            'total_orders_picked': total_orders,
-            'total_items_picked': total_items_picked,
-            'total_mispicks': total_mispicks,
-            'hourly_rate': round(hourly_rate, 2),
-            'total_earnings': total_earnings,
-            'total_hours_worked': int(total_hours),
-            'zone_familiarity': round(random.uniform(0.6, 0.99) if experience_months > 3 else random.uniform(0.3, 0.7), 2),
-            'multitask_ability': random.choice(['LOW', 'MEDIUM', 'HIGH']),
-            'physical_fitness': random.choice(['AVERAGE', 'GOOD', 'EXCELLENT']),
-            'temperature_zone_trained': random.choice([True, True, True, False]),
-            'fragile_handling_certified': random.choice([True, True, False]),
-        })
 
-pickers_df = pd.DataFrame(pickers)
-pickers_df = pickers_df.sample(frac=1, random_state=42).reset_index(drop=True)
-pickers_df.to_csv('picker_profiles_new.csv', index=False)
-print(f"\nSaved {len(pickers_df):,} pickers to picker_profiles_new.csv")
+PICKER_ROLES = np.array(['SENIOR_PICKER', 'TEAM_LEAD', 'QUALITY_CHECKER'], dtype=object)
+
+
+def generate_pickers(segment_name, segment, dark_stores, assigned_store, rng):
+    """Pickers of one segment, column by column; assigned_store holds their dark_stores positions."""
+    n = len(assigned_store)
+    stores = {key: dark_stores[key].to_numpy() for key in ('store_id', 'node_id', 'name', 'location', 'zone')}
+
+    def draw():
+        return rng.random(n)
+
+    is_female = draw() >= segment['gender_ratio']
+    age = randint(draw(), *segment['age_range'])
+    birth_year = 2024 - age
+    community = weighted_index(draw(), COMMUNITY_WEIGHTS)
+    first_idx, last_idx = get_names(draw, is_female, community)
+    first_name, last_name = FIRST_NAMES[first_idx], SURNAMES[last_idx]
+    experience_months = randint(draw(), *segment['experience_months_range'])
+    shift_start, shift_end = generate_shift_times(draw, segment['shift_type'])
+
+    senior = (experience_months >= 18) & (segment_name == 'FULL_TIME_SENIOR')
+    role = np.where(senior, PICKER_ROLES[uniform_index(draw(), len(PICKER_ROLES))],
+                    np.where(experience_months >= 6, 'PICKER', 'TRAINEE_PICKER')).astype(object)
+
+    avg_pick_time = np.round(uniform(draw(), *segment['avg_pick_time_range']), 1)
+    daily_orders = randint(draw(), *segment['daily_orders_range'])
+    accuracy_rate = np.round(uniform(draw(), *segment['accuracy_rate_range']), 4)
+    items_per_hour = randint(draw(), *segment['items_per_hour_range'])
+    days_worked = (experience_months * 22 * uniform(draw(), 0.7, 0.95)).astype(np.int64)
+    total_orders = (days_worked * daily_orders * uniform(draw(), 0.8, 1.1)).astype(np.int64)
+    total_items_picked = total_orders * randint(draw(), 4, 12)
+    mispick_rate = np.round(1 - accuracy_rate, 4)
+    total_mispicks = (total_items_picked * mispick_rate).astype(np.int64)
+    hourly_rate = uniform(draw(), *segment['hourly_rate'])
+    hours_per_day = 8 if segment['shift_type'] == 'FULL_TIME' else 4
+    total_hours = days_worked * hours_per_day
+    total_earnings = (total_hours * hourly_rate).astype(np.int64)
+
+    status = np.select([experience_months < 1, accuracy_rate < 0.94, (accuracy_rate > 0.995) & (items_per_hour > 200)],
+                       ['TRAINING', 'PROBATION', 'STAR_PERFORMER'], default='ACTIVE').astype(object)
+    zone_familiarity = np.where(experience_months > 3, uniform(draw(), 0.6, 0.99), uniform(draw(), 0.3, 0.7))
+
+    return pd.DataFrame({
+        'first_name': first_name,
+        'last_name': last_name,
+        'full_name': first_name + ' ' + last_name,
+        'gender': np.where(is_female, 'F', 'M').astype(object),
+        'age': age,
+        'phone_number': generate_phones(draw),
+        'email': generate_emails(draw, first_idx, last_idx, birth_year),
+        'community': np.array([c.upper() for c in COMMUNITIES], dtype=object)[community],
+        'store_id': stores['store_id'][assigned_store],
+        'store_node_id': stores['node_id'][assigned_store],
+        'store_name': stores['name'][assigned_store],
+        'store_location': stores['location'][assigned_store],
+        'service_zone': stores['zone'][assigned_store],
+        'picker_segment': segment_name,
+        'role': role,
+        'shift_type': segment['shift_type'],
+        'shift_start': shift_start,
+        'shift_end': shift_end,
+        'experience_months': experience_months,
+        'join_date': join_dates(experience_months),
+        'status': status,
+        'last_active': last_active_times(randint(draw(), 0, 72)),
+        'avg_picking_time_sec': avg_pick_time,
+        'items_per_hour': items_per_hour,
+        'daily_orders_picked': daily_orders,
+        'accuracy_rate': accuracy_rate,
+        'mispick_rate': mispick_rate,
+        'total_orders_picked': total_orders,
+        'total_items_picked': total_items_picked,
+        'total_mispicks': total_mispicks,
+        'hourly_rate': np.round(hourly_rate, 2),
+        'total_earnings': total_earnings,
+        'total_hours_worked': total_hours,
+        'zone_familiarity': np.round(zone_familiarity, 2),
+        'multitask_ability': np.array(['LOW', 'MEDIUM', 'HIGH'], dtype=object)[uniform_index(draw(), 3)],
+        'physical_fitness': np.array(['AVERAGE', 'GOOD', 'EXCELLENT'], dtype=object)[uniform_index(draw(), 3)],
+        'temperature_zone_trained': draw() < 3 / 4,
+        'fragile_handling_certified': draw() < 2 / 3,
+    })
+
 
-# =============================================================================
-# SUMMARY
-# =============================================================================
 
-print("\n" + "="*70)
-print("SUMMARY")
-print("="*70)
-
-print("\n--- STORE SYSTEM ---")
-print(f"Master Warehouse: 1 (Shamshabad)")
-print(f"Dark Stores: {len(DARK_STORES)}")
-print(f"Warehouse Connections: {len(warehouse_edges_df)}")
-print(f"Store-to-Store Edges: {len(edges_df)}")
-
-print("\n--- RIDERS ---")
-print(f"Total: {len(riders_df):,}")
-print(f"Male: {len(riders_df[riders_df['gender']=='M']):,} ({len(riders_df[riders_df['gender']=='M'])/len(riders_df)*100:.1f}%)")
-print(f"Female: {len(riders_df[riders_df['gender']=='F']):,} ({len(riders_df[riders_df['gender']=='F'])/len(riders_df)*100:.1f}%)")
-print(f"Per Store (avg): {len(riders_df)/len(DARK_STORES):.0f}")
-
-print("\n--- PICKERS ---")
-print(f"Total: {len(pickers_df):,}")
-print(f"Male: {len(pickers_df[pickers_df['gender']=='M']):,} ({len(pickers_df[pickers_df['gender']=='M'])/len(pickers_df)*100:.1f}%)")
-print(f"Female: {len(pickers_df[pickers_df['gender']=='F']):,} ({len(pickers_df[pickers_df['gender']=='F'])/len(pickers_df)*100:.1f}%)")
-print(f"Per Store (avg): {len(pickers_df)/len(DARK_STORES):.0f}")
-
-# Verify store alignment
-print("\n--- STORE ALIGNMENT CHECK ---")
-rider_stores = set(riders_df['home_store_id'].unique())
-picker_stores = set(pickers_df['store_id'].unique())
-node_stores = set([f"HYD-DS-{n:03d}" for n in nodes_df['Node_ID']])
-
-print(f"Stores in rider profiles: {len(rider_stores)}")
-print(f"Stores in picker profiles: {len(picker_stores)}")
-print(f"Stores in dark store nodes: {len(node_stores)}")
-print(f"All aligned: {rider_stores == picker_stores == node_stores}")
-
-print("="*70)
-print("FILES CREATED/UPDATED:")
-print("  - blinkit_stores_master.csv (new)")
-print("  - blinkit_warehouse_connections.csv (new)")
-print("  - rider_profiles_new.csv (updated)")
-print("  - picker_profiles_new.csv (updated)")
-print("="*70)
+def build_pickers(dark_stores, headcounts, rng):
+    """Exactly headcounts[i] pickers at dark store i, shuffled, with picker IDs."""
+    segment_sizes = segment_counts(PICKER_SEGMENTS, int(headcounts.sum()), 'PART_TIME_STUDENT')
+
+    # Every store gets its headcount, spread over the segments at random
+    assigned_stores = rng.permutation(np.repeat(np.arange(len(dark_stores)), headcounts))
+    starts = np.concatenate([[0], np.cumsum(list(segment_sizes.values()))])
+
+    pickers = []
+    for (segment_name, segment), start, end in zip(PICKER_SEGMENTS.items(), starts[:-1], starts[1:]):
+        print(f"  Generating {segment_name}: {end - start} pickers...")
+        pickers.append(generate_pickers(segment_name, segment, dark_stores, assigned_stores[start:end], rng))
+    pickers_df = pd.concat(pickers, ignore_index=True)
+    pickers_df.insert(0, 'picker_id', allocate_ids('PKR', np.arange(len(pickers_df)), 'picker', SEED))
+    return pickers_df.sample(frac=1, random_state=42).reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the store master and regenerate rider/picker profiles")
+    parser.add_argument('--riders-per-store', type=int, default=RIDERS_PER_STORE,
+                        help=f"Riders per dark store (default: {RIDERS_PER_STORE})")
+    parser.add_argument('--pickers-per-store', type=int, default=PICKERS_PER_STORE,
+                        help=f"Pickers per dark store (default: {PICKERS_PER_STORE})")
+    parser.add_argument('--headcounts', help="CSV overriding per-store headcounts: store_id, riders and/or pickers")
+    args = parser.parse_args(argv)
+
+    np.random.seed(SEED)
+    random.seed(SEED)
+
+    print("="*70)
+    print("STORE SYSTEM UPDATE & PROFILE REGENERATION")
+    print("="*70)
+
+    # Existing dark store data
+    nodes_df = pd.read_csv('blinkit_darkstores_nodes.csv')
+    edges_df = pd.read_csv('blinkit_darkstores_edges.csv')
+    print(f"\nLoaded {len(nodes_df)} dark store locations")
+    print(f"Loaded {len(edges_df)} store-to-store connections")
+
+    print(f"\nMaster Warehouse: {MASTER_WAREHOUSE['Location']}")
+    print(f"  Coordinates: {MASTER_WAREHOUSE['Latitude']}, {MASTER_WAREHOUSE['Longitude']}")
+
+    # Unified store master
+    stores_df = build_store_master(nodes_df)
+    save_payload(stores_df, 'blinkit_stores_master', OUTPUT_FORMATS, STORE_CATEGORICALS)
+    print(f"\nCreated store master with {len(stores_df)} stores")
+    print(f"  - 1 Master Warehouse")
+    print(f"  - {len(stores_df)-1} Dark Stores")
+
+    # Warehouse to dark store connections
+    warehouse_edges_df = build_warehouse_connections(nodes_df)
+    warehouse_edges_df.to_csv('blinkit_warehouse_connections.csv', index=False)
+    print(f"\nCreated {len(warehouse_edges_df)} warehouse-to-darkstore connections")
+    print(f"  Avg distance: {warehouse_edges_df['distance_km'].mean():.1f} km")
+    print(f"  Max distance: {warehouse_edges_df['distance_km'].max():.1f} km")
+    print(f"  Min distance: {warehouse_edges_df['distance_km'].min():.1f} km")
+
+    # Distance matrices (store x store, store x customer locality)
+    areas = [area[:3] for group in load_config(DEFAULT_CONFIG)['areas'].values() for area in group]
+    localities = pd.DataFrame(areas, columns=['name', 'latitude', 'longitude'])
+    save_distance_matrices(stores_df, localities, DISTANCES_FILE)
+    print(f"\nCached {len(stores_df)}x{len(stores_df)} store and {len(stores_df)}x{len(localities)} "
+          f"store-locality distance matrices to {DISTANCES_FILE}")
+
+    dark_stores = load_dark_stores(nodes_df)
+    print(f"\nUsing {len(dark_stores)} dark stores for profiles")
+    rng = np.random.default_rng(SEED)
+
+    rider_headcounts = store_headcounts(dark_stores, args.riders_per_store, 'riders', args.headcounts)
+    print(f"\n{'='*70}")
+    print(f"GENERATING {rider_headcounts.sum():,} RIDER PROFILES")
+    print(f"{'='*70}")
+    riders_df = build_riders(dark_stores, rider_headcounts, rng)
+    rider_files = save_payload(riders_df, 'rider_profiles_new', OUTPUT_FORMATS, RIDER_CATEGORICALS)
+    print(f"\nSaved {len(riders_df):,} riders to {', '.join(rider_files)}")
+
+    picker_headcounts = store_headcounts(dark_stores, args.pickers_per_store, 'pickers', args.headcounts)
+    print(f"\n{'='*70}")
+    print(f"GENERATING {picker_headcounts.sum():,} PICKER PROFILES")
+    print(f"{'='*70}")
+    pickers_df = build_pickers(dark_stores, picker_headcounts, rng)
+    picker_files = save_payload(pickers_df, 'picker_profiles_new', OUTPUT_FORMATS, PICKER_CATEGORICALS)
+    print(f"\nSaved {len(pickers_df):,} pickers to {', '.join(picker_files)}")
+
+    # Summary
+    print("\n" + "="*70)
+    print("SUMMARY")
+    print("="*70)
+
+    print("\n--- STORE SYSTEM ---")
+    print(f"Master Warehouse: 1 (Shamshabad)")
+    print(f"Dark Stores: {len(dark_stores)}")
+    print(f"Warehouse Connections: {len(warehouse_edges_df)}")
+    print(f"Store-to-Store Edges: {len(edges_df)}")
+
+    print("\n--- RIDERS ---")
+    print(f"Total: {len(riders_df):,}")
+    print(f"Male: {len(riders_df[riders_df['gender']=='M']):,} ({len(riders_df[riders_df['gender']=='M'])/len(riders_df)*100:.1f}%)")
+    print(f"Female: {len(riders_df[riders_df['gender']=='F']):,} ({len(riders_df[riders_df['gender']=='F'])/len(riders_df)*100:.1f}%)")
+    print(f"Per Store (avg): {len(riders_df)/len(dark_stores):.0f}")
+
+    print("\n--- PICKERS ---")
+    print(f"Total: {len(pickers_df):,}")
+    print(f"Male: {len(pickers_df[pickers_df['gender']=='M']):,} ({len(pickers_df[pickers_df['gender']=='M'])/len(pickers_df)*100:.1f}%)")
+    print(f"Female: {len(pickers_df[pickers_df['gender']=='F']):,} ({len(pickers_df[pickers_df['gender']=='F'])/len(pickers_df)*100:.1f}%)")
+    print(f"Per Store (avg): {len(pickers_df)/len(dark_stores):.0f}")
+
+    # Verify store alignment
+    print("\n--- STORE ALIGNMENT CHECK ---")
+    rider_stores = set(riders_df['home_store_id'].unique())
+    picker_stores = set(pickers_df['store_id'].unique())
+    node_stores = set([f"HYD-DS-{n:03d}" for n in nodes_df['Node_ID']])
+
+    print(f"Stores in rider profiles: {len(rider_stores)}")
+    print(f"Stores in picker profiles: {len(picker_stores)}")
+    print(f"Stores in dark store nodes: {len(node_stores)}")
+    print(f"All aligned: {rider_stores == picker_stores == node_stores}")
+
+    print("="*70)
+    print("FILES CREATED/UPDATED:")
+    print(f"  - blinkit_stores_master ({', '.join(OUTPUT_FORMATS)}) (new)")
+    print("  - blinkit_warehouse_connections.csv (new)")
+    print(f"  - {DISTANCES_FILE} (new)")
+    print(f"  - rider_profiles_new ({', '.join(OUTPUT_FORMATS)}) (updated)")
+    print(f"  - picker_profiles_new ({', '.join(OUTPUT_FORMATS)}) (updated)")
+    print("="*70)
+
+
+if __name__ == '__main__':
+    main()